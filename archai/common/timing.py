@@ -5,8 +5,12 @@ from __future__ import annotations
 
 import gc
 import timeit
+from collections import OrderedDict
+from contextlib import contextmanager
 from types import TracebackType
-from typing import Optional
+from typing import Dict, Generator, Optional, Union
+
+import torch
 
 
 class MeasureBlockTime:
@@ -50,3 +54,95 @@ class MeasureBlockTime:
         """Return the elapsed time in seconds."""
 
         return timeit.default_timer() - self.start_time
+
+
+class StepTimer:
+    """Accumulate the time spent in named phases (e.g., forward, backward) of training steps.
+
+    On CUDA devices, phases are delimited by CUDA events, so measuring them does not
+    synchronize the device. Events are only synchronized when `summary` is called, e.g.,
+    at logging steps. On other devices, the wall-clock time is used.
+
+    """
+
+    def __init__(self, device: Optional[Union[str, torch.device]] = "cpu") -> None:
+        """Initialize the timer.
+
+        Args:
+            device: Device where the measured operations run.
+
+        """
+
+        self.use_cuda_events = torch.device(device).type == "cuda" and torch.cuda.is_available()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the accumulated times."""
+
+        self._times = OrderedDict()
+        self._events = []
+        self._n_steps = 0
+
+    @contextmanager
+    def measure(self, name: str) -> Generator[None, None, None]:
+        """Measure the time spent in a block of code.
+
+        Args:
+            name: Name of the phase.
+
+        """
+
+        self._times.setdefault(name, 0.0)
+
+        if self.use_cuda_events:
+            start_event = torch.cuda.Event(enable_timing=True)
+            end_event = torch.cuda.Event(enable_timing=True)
+
+            start_event.record()
+            yield
+            end_event.record()
+
+            self._events.append((name, start_event, end_event))
+        else:
+            start_time = timeit.default_timer()
+            yield
+            self._times[name] += timeit.default_timer() - start_time
+
+    def add(self, name: str, elapsed: float) -> None:
+        """Add a time measured by the host (e.g., time waiting for data) to a phase.
+
+        Args:
+            name: Name of the phase.
+            elapsed: Elapsed time in seconds.
+
+        """
+
+        self._times[name] = self._times.get(name, 0.0) + elapsed
+
+    def step(self) -> None:
+        """Mark the end of a step."""
+
+        self._n_steps += 1
+
+    def summary(self, reset: Optional[bool] = True) -> Dict[str, float]:
+        """Return the average time (in seconds) spent in each phase per step.
+
+        Args:
+            reset: Whether the accumulated times should be reset.
+
+        Returns:
+            Average time per step of each phase.
+
+        """
+
+        for name, start_event, end_event in self._events:
+            end_event.synchronize()
+            self._times[name] += start_event.elapsed_time(end_event) / 1000
+        self._events = []
+
+        summary = OrderedDict((name, elapsed / max(self._n_steps, 1)) for name, elapsed in self._times.items())
+
+        if reset:
+            self.reset()
+
+        return summary
@@ -21,10 +21,14 @@ from transformers import AutoTokenizer, DataCollatorForLanguageModeling
 from archai.api.dataset_provider import DatasetProvider
 from archai.common.ordered_dict_logger import OrderedDictLogger
 from archai.datasets.nlp.fast_hf_dataset_provider_utils import (
+    SHARDED_CACHE_MANIFEST,
     FastHfDataset,
     SHMArray,
+    ShardedTokenArray,
+    get_tokenizer_fingerprint,
     process_with_memory_map_files,
     process_with_shared_memory,
+    process_with_sharded_cache,
     xor,
 )
 from archai.datasets.nlp.hf_dataset_provider_utils import tokenize_concatenated_dataset
@@ -51,9 +55,9 @@ class FastHfDatasetProvider(DatasetProvider):
         """Initialize Fast Hugging Face-based dataset provider.
 
         Args:
-            train_file: Path to the training array file (.npy).
-            validation_file: Path to the validation array file (.npy).
-            test_file: Path to the test array file (.npy).
+            train_file: Path to the training array file (.npy) or sharded cache directory.
+            validation_file: Path to the validation array file (.npy) or sharded cache directory.
+            test_file: Path to the test array file (.npy) or sharded cache directory.
             tokenizer: Instance of tokenizer to use.
 
         """
@@ -91,19 +95,14 @@ class FastHfDatasetProvider(DatasetProvider):
         return dataset_dict
 
     @staticmethod
-    def _encode_dataset(
-        dataset_dict: DatasetDict,
+    def _get_mapping_fn(
         tokenizer: AutoTokenizer,
         mapping_fn: Callable[[Any], Dict[str, Any]],
         mapping_fn_kwargs: Dict[str, Any],
         mapping_column_name: List[str],
         use_eos_token: bool,
         dtype: np.dtype,
-        num_workers: int,
-    ) -> DatasetDict:
-        logger.info("Encoding dataset ...")
-        logger.info(f"Number of workers: {num_workers} | EOS token: {use_eos_token}")
-
+    ) -> Tuple[Callable[[Any], Dict[str, Any]], Dict[str, Any]]:
         mapping_fn = mapping_fn or tokenize_concatenated_dataset
         mapping_fn_kwargs = mapping_fn_kwargs or {
             "tokenizer": tokenizer,
@@ -112,6 +111,26 @@ class FastHfDatasetProvider(DatasetProvider):
             "dtype": dtype,
         }
 
+        return mapping_fn, mapping_fn_kwargs
+
+    @staticmethod
+    def _encode_dataset(
+        dataset_dict: DatasetDict,
+        tokenizer: AutoTokenizer,
+        mapping_fn: Callable[[Any], Dict[str, Any]],
+        mapping_fn_kwargs: Dict[str, Any],
+        mapping_column_name: List[str],
+        use_eos_token: bool,
+        dtype: np.dtype,
+        num_workers: int,
+    ) -> DatasetDict:
+        logger.info("Encoding dataset ...")
+        logger.info(f"Number of workers: {num_workers} | EOS token: {use_eos_token}")
+
+        mapping_fn, mapping_fn_kwargs = FastHfDatasetProvider._get_mapping_fn(
+            tokenizer, mapping_fn, mapping_fn_kwargs, mapping_column_name, use_eos_token, dtype
+        )
+
         column_names = dataset_dict["train"].column_names
         encoded_dataset_dict = dataset_dict.map(
             mapping_fn,
@@ -173,6 +192,58 @@ class FastHfDatasetProvider(DatasetProvider):
 
         return cache_files
 
+    @staticmethod
+    def _save_sharded_dataset(
+        dataset_dict: DatasetDict,
+        tokenizer: AutoTokenizer,
+        mapping_fn: Callable[[Any], Dict[str, Any]],
+        mapping_fn_kwargs: Dict[str, Any],
+        mapping_column_name: List[str],
+        use_eos_token: bool,
+        dtype: np.dtype,
+        num_workers: int,
+        shard_size: int,
+        cache_dir: Path,
+    ) -> Dict[str, Path]:
+        logger.info(f"Encoding dataset to sharded cache: {cache_dir}")
+        logger.info(f"Number of workers: {num_workers} | EOS token: {use_eos_token} | Shard size: {shard_size}")
+
+        mapping_fn, mapping_fn_kwargs = FastHfDatasetProvider._get_mapping_fn(
+            tokenizer, mapping_fn, mapping_fn_kwargs, mapping_column_name, use_eos_token, dtype
+        )
+
+        # Tokens are written while encoding, so the encoded dataset is never materialized
+        split_dirs = process_with_sharded_cache(
+            dataset_dict,
+            cache_dir,
+            mapping_fn,
+            mapping_fn_kwargs,
+            dtype,
+            shard_size,
+            metadata={
+                "tokenizer_fingerprint": get_tokenizer_fingerprint(tokenizer),
+                "use_eos_token": use_eos_token,
+                "mapping_column_name": mapping_column_name,
+            },
+            num_proc=num_workers,
+        )
+
+        tokenizer.save_pretrained(cache_dir / "tokenizer")
+
+        return {f"{split}_file": split_dir for split, split_dir in split_dirs.items()}
+
+    @staticmethod
+    def _prepare_cache_dir(cache_dir: str, use_sharded_cache: bool) -> Path:
+        cache_dir = Path(cache_dir)
+        if cache_dir.is_dir():
+            if use_sharded_cache:
+                logger.warn(f"Cache: {cache_dir} already exists and compatible shards will be re-used.")
+            else:
+                logger.warn(f"Cache: {cache_dir} already exists and will be overritten.")
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        return cache_dir
+
     @classmethod
     def from_disk(
         cls: FastHfDatasetProvider,
@@ -189,6 +260,8 @@ class FastHfDatasetProvider(DatasetProvider):
         use_eos_token: Optional[bool] = True,
         use_shared_memory: Optional[bool] = True,
         cache_dir: Optional[str] = "cache",
+        use_sharded_cache: Optional[bool] = False,
+        shard_size: Optional[int] = 2**27,
     ) -> FastHfDatasetProvider:
         """Load a dataset provider by loading and encoding data from disk.
 
@@ -209,6 +282,10 @@ class FastHfDatasetProvider(DatasetProvider):
             use_eos_token: Whether to use EOS token to separate sequences.
             use_shared_memory: Whether to use shared memory for caching.
             cache_dir: Root path to the cache directory.
+            use_sharded_cache: Whether to write tokens to fixed-size shards while encoding,
+                instead of a single array file per split. Interrupted sharded caches are
+                resumed when called again with the same `cache_dir`.
+            shard_size: Number of tokens per shard, if `use_sharded_cache` is enabled.
 
         Returns:
             Dataset provider.
@@ -221,10 +298,7 @@ class FastHfDatasetProvider(DatasetProvider):
         dtype = np.uint16 if tokenizer.vocab_size < 64 * 1024 else np.int32
         use_shared_memory = use_shared_memory and ALLOW_SHARED_MEMORY
 
-        cache_dir = Path(cache_dir)
-        if cache_dir.is_dir():
-            logger.warn(f"Cache: {cache_dir} already exists and will be overritten.")
-        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir = FastHfDatasetProvider._prepare_cache_dir(cache_dir, use_sharded_cache)
 
         # Ensure that loaded dataset is always a dictionary
         logger.info(f"Loading dataset from: {dataset_file_path}")
@@ -235,25 +309,39 @@ class FastHfDatasetProvider(DatasetProvider):
         # Ensure that `validation` and `test` splits are available
         disk_dataset_dict = FastHfDatasetProvider._create_splits(disk_dataset_dict, validation_split, shuffle, seed)
 
-        encoded_dataset_dict = FastHfDatasetProvider._encode_dataset(
-            disk_dataset_dict,
-            tokenizer,
-            mapping_fn,
-            mapping_fn_kwargs,
-            mapping_column_name,
-            use_eos_token,
-            dtype,
-            num_workers,
-        )
-        processed_dataset_dict = FastHfDatasetProvider._process_dataset_to_memory(
-            encoded_dataset_dict, cache_dir, dtype, num_workers, use_shared_memory
-        )
+        if use_sharded_cache:
+            cache_files = FastHfDatasetProvider._save_sharded_dataset(
+                disk_dataset_dict,
+                tokenizer,
+                mapping_fn,
+                mapping_fn_kwargs,
+                mapping_column_name,
+                use_eos_token,
+                dtype,
+                num_workers,
+                shard_size,
+                cache_dir,
+            )
+        else:
+            encoded_dataset_dict = FastHfDatasetProvider._encode_dataset(
+                disk_dataset_dict,
+                tokenizer,
+                mapping_fn,
+                mapping_fn_kwargs,
+                mapping_column_name,
+                use_eos_token,
+                dtype,
+                num_workers,
+            )
+            processed_dataset_dict = FastHfDatasetProvider._process_dataset_to_memory(
+                encoded_dataset_dict, cache_dir, dtype, num_workers, use_shared_memory
+            )
 
-        cache_files = FastHfDatasetProvider._save_dataset(
-            processed_dataset_dict, tokenizer, cache_dir, use_shared_memory
-        )
+            cache_files = FastHfDatasetProvider._save_dataset(
+                processed_dataset_dict, tokenizer, cache_dir, use_shared_memory
+            )
 
-        FastHfDatasetProvider._close_mem_maps(processed_dataset_dict)
+            FastHfDatasetProvider._close_mem_maps(processed_dataset_dict)
 
         with open(cache_dir / "config.json", "w") as f:
             json.dump(
@@ -268,6 +356,8 @@ class FastHfDatasetProvider(DatasetProvider):
                     "shuffle": shuffle,
                     "seed": seed,
                     "use_eos_token": use_eos_token,
+                    "cache_format": "sharded" if use_sharded_cache else "npy",
+                    "shard_size": shard_size if use_sharded_cache else None,
                 },
                 f,
             )
@@ -293,6 +383,8 @@ class FastHfDatasetProvider(DatasetProvider):
         use_eos_token: Optional[bool] = True,
         use_shared_memory: Optional[bool] = True,
         cache_dir: Optional[str] = "cache",
+        use_sharded_cache: Optional[bool] = False,
+        shard_size: Optional[int] = 2**27,
     ) -> FastHfDatasetProvider:
         """Load a dataset provider by downloading and encoding data from Hugging Face Hub.
 
@@ -316,6 +408,10 @@ class FastHfDatasetProvider(DatasetProvider):
             use_eos_token: Whether to use EOS token to separate sequences.
             use_shared_memory: Whether to use shared memory for caching.
             cache_dir: Root path to the cache directory.
+            use_sharded_cache: Whether to write tokens to fixed-size shards while encoding,
+                instead of a single array file per split. Interrupted sharded caches are
+                resumed when called again with the same `cache_dir`.
+            shard_size: Number of tokens per shard, if `use_sharded_cache` is enabled.
 
         Returns:
             Dataset provider.
@@ -328,10 +424,7 @@ class FastHfDatasetProvider(DatasetProvider):
         dtype = np.uint16 if tokenizer.vocab_size < 64 * 1024 else np.int32
         use_shared_memory = use_shared_memory and ALLOW_SHARED_MEMORY
 
-        cache_dir = Path(cache_dir)
-        if cache_dir.is_dir():
-            logger.warn(f"Cache: {cache_dir} already exists and will be overritten.")
-        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir = FastHfDatasetProvider._prepare_cache_dir(cache_dir, use_sharded_cache)
 
         # Ensure that downloaded dataset is always a dictionary
         logger.info("Downloading dataset ...")
@@ -344,25 +437,39 @@ class FastHfDatasetProvider(DatasetProvider):
         # Ensure that `validation` and `test` splits are available
         hub_dataset_dict = FastHfDatasetProvider._create_splits(hub_dataset_dict, validation_split, shuffle, seed)
 
-        encoded_dataset_dict = FastHfDatasetProvider._encode_dataset(
-            hub_dataset_dict,
-            tokenizer,
-            mapping_fn,
-            mapping_fn_kwargs,
-            mapping_column_name,
-            use_eos_token,
-            dtype,
-            num_workers,
-        )
-        processed_dataset_dict = FastHfDatasetProvider._process_dataset_to_memory(
-            encoded_dataset_dict, cache_dir, dtype, num_workers, use_shared_memory
-        )
+        if use_sharded_cache:
+            cache_files = FastHfDatasetProvider._save_sharded_dataset(
+                hub_dataset_dict,
+                tokenizer,
+                mapping_fn,
+                mapping_fn_kwargs,
+                mapping_column_name,
+                use_eos_token,
+                dtype,
+                num_workers,
+                shard_size,
+                cache_dir,
+            )
+        else:
+            encoded_dataset_dict = FastHfDatasetProvider._encode_dataset(
+                hub_dataset_dict,
+                tokenizer,
+                mapping_fn,
+                mapping_fn_kwargs,
+                mapping_column_name,
+                use_eos_token,
+                dtype,
+                num_workers,
+            )
+            processed_dataset_dict = FastHfDatasetProvider._process_dataset_to_memory(
+                encoded_dataset_dict, cache_dir, dtype, num_workers, use_shared_memory
+            )
 
-        cache_files = FastHfDatasetProvider._save_dataset(
-            processed_dataset_dict, tokenizer, cache_dir, use_shared_memory
-        )
+            cache_files = FastHfDatasetProvider._save_dataset(
+                processed_dataset_dict, tokenizer, cache_dir, use_shared_memory
+            )
 
-        FastHfDatasetProvider._close_mem_maps(processed_dataset_dict)
+            FastHfDatasetProvider._close_mem_maps(processed_dataset_dict)
 
         with open(cache_dir / "config.json", "w") as f:
             json.dump(
@@ -380,6 +487,8 @@ class FastHfDatasetProvider(DatasetProvider):
                     "shuffle": shuffle,
                     "seed": seed,
                     "use_eos_token": use_eos_token,
+                    "cache_format": "sharded" if use_sharded_cache else "npy",
+                    "shard_size": shard_size if use_sharded_cache else None,
                 },
                 f,
             )
@@ -401,35 +510,53 @@ class FastHfDatasetProvider(DatasetProvider):
         logger.info(f"Loading dataset from: {cache_dir}")
 
         cache_dir = Path(cache_dir)
-        cache_train_file = cache_dir / "train.npy"
-        cache_validation_file = cache_dir / "validation.npy"
-        cache_test_file = cache_dir / "test.npy"
+        if (cache_dir / "train" / SHARDED_CACHE_MANIFEST).is_file():
+            cache_train_file = cache_dir / "train"
+            cache_validation_file = cache_dir / "validation"
+            cache_test_file = cache_dir / "test"
+        else:
+            cache_train_file = cache_dir / "train.npy"
+            cache_validation_file = cache_dir / "validation.npy"
+            cache_test_file = cache_dir / "test.npy"
 
+        tokenizer_dir = cache_dir / "tokenizer"
         tokenizer_file = cache_dir / "tokenizer.pkl"
-        if not tokenizer_file.is_file():
-            logger.warn(f"Could not find tokenizer in {cache_dir}.")
-            tokenizer = None
-        else:
+        if tokenizer_dir.is_dir():
+            tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+
+            fingerprint = ShardedTokenArray(cache_train_file).manifest["metadata"].get("tokenizer_fingerprint")
+            if fingerprint != get_tokenizer_fingerprint(tokenizer):
+                logger.warn(f"Tokenizer in {tokenizer_dir} does not match the one used to encode the cache.")
+        elif tokenizer_file.is_file():
             with open(tokenizer_file, "rb") as f:
                 tokenizer = pickle.load(f)
+        else:
+            logger.warn(f"Could not find tokenizer in {cache_dir}.")
+            tokenizer = None
 
         return FastHfDatasetProvider(cache_train_file, cache_validation_file, cache_test_file, tokenizer=tokenizer)
 
+    def _load_input_ids(self, file_path: Union[str, Path]) -> Union[np.ndarray, ShardedTokenArray]:
+        if Path(file_path).is_dir():
+            return ShardedTokenArray(file_path, mmap_mode=self.mmap_mode)
+
+        return np.load(file_path, mmap_mode=self.mmap_mode)
+
     @overrides
     def get_train_dataset(self, seq_len: Optional[int] = 1) -> FastHfDataset:
-        input_ids = np.load(self.train_file, mmap_mode=self.mmap_mode)
+        input_ids = self._load_input_ids(self.train_file)
 
         return FastHfDataset(input_ids, seq_len=seq_len)
 
     @overrides
     def get_val_dataset(self, seq_len: Optional[int] = 1) -> FastHfDataset:
-        input_ids = np.load(self.validation_file, mmap_mode=self.mmap_mode)
+        input_ids = self._load_input_ids(self.validation_file)
 
         return FastHfDataset(input_ids, seq_len=seq_len)
 
     @overrides
     def get_test_dataset(self, seq_len: Optional[int] = 1) -> FastHfDataset:
-        input_ids = np.load(self.test_file, mmap_mode=self.mmap_mode)
+        input_ids = self._load_input_ids(self.test_file)
 
         return FastHfDataset(input_ids, seq_len=seq_len)
 
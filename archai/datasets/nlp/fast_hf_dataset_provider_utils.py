@@ -7,17 +7,30 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import math
-import mmap
+import multiprocessing
+import os
 import sys
-from typing import Any, Dict, Optional, Tuple
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from types import TracebackType
 
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute
 import torch
+from datasets import Dataset as HfDataset
 from datasets.dataset_dict import DatasetDict
 from torch.utils.data import Dataset
 
+from archai.common.ordered_dict_logger import OrderedDictLogger
+
+logger = OrderedDictLogger(source=__name__)
+
 # `multiprocessing.shared_memory` is only available in Python 3.8+`
 if sys.version_info.major == 3 and sys.version_info.minor >= 8:
     from multiprocessing.shared_memory import SharedMemory
@@ -50,6 +63,8 @@ class FastHfDataset(Dataset):
     def __exit__(self, exc_type: type[BaseException], exc_val: BaseException, exc_tb: TracebackType) -> None:
         if isinstance(self.input_ids, np.memmap) and self.input_ids._mmap is not None:
             self.input_ids._mmap.close()
+        elif isinstance(self.input_ids, ShardedTokenArray):
+            self.input_ids.close()
 
     def __len__(self) -> int:
         return self.n_sequences
@@ -85,8 +100,405 @@ class SHMArray(np.ndarray):
         self.shm = getattr(obj, "shm", None)
 
 
+SHARDED_CACHE_MANIFEST = "index.json"
+
+
+def _shard_file_name(shard_idx: int) -> str:
+    return f"shard_{shard_idx:06d}.bin"
+
+
+def _load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.is_file():
+        return None
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def get_tokenizer_fingerprint(tokenizer: Any) -> str:
+    """Compute a fingerprint of a tokenizer, based on its vocabulary and special tokens.
+
+    The fingerprint is stored in sharded caches and allows checking whether a cache
+    was encoded with a given tokenizer.
+
+    Args:
+        tokenizer: Instance of tokenizer.
+
+    Returns:
+        Hexadecimal fingerprint.
+
+    """
+
+    state = {
+        "vocab": sorted(tokenizer.get_vocab().items(), key=lambda item: item[1]),
+        "special_tokens": sorted(str(token) for token in tokenizer.all_special_tokens),
+    }
+
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ShardedTokenArray:
+    """Read-only array of tokens stored across fixed-size shards.
+
+    Shards are raw binary files described by an index manifest (`index.json`) and are
+    only memory mapped when first accessed. Slices within a single shard are returned
+    as views of the memory map (zero-copy), while slices crossing shard boundaries
+    are concatenated.
+
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], mmap_mode: Optional[str] = "r") -> None:
+        """Initialize the array.
+
+        Args:
+            cache_dir: Path to the directory with the shards and the index manifest.
+            mmap_mode: Memory map mode used to open the shards. If `None`, shards are
+                loaded into memory when first accessed.
+
+        """
+
+        self.cache_dir = Path(cache_dir)
+        self.mmap_mode = mmap_mode
+
+        manifest = _load_manifest(self.cache_dir / SHARDED_CACHE_MANIFEST)
+        if manifest is None:
+            raise FileNotFoundError(f"Could not find {SHARDED_CACHE_MANIFEST} in {self.cache_dir}.")
+        if not manifest["complete"]:
+            raise ValueError(f"Sharded cache {self.cache_dir} is incomplete and should be resumed before loading.")
+
+        self.manifest = manifest
+        self.dtype = np.dtype(manifest["dtype"])
+
+        self._files = [shard["file"] for shard in manifest["shards"]]
+        self._offsets = np.array(
+            [shard["offset"] for shard in manifest["shards"]] + [manifest["num_tokens"]], dtype=np.int64
+        )
+        self._shards = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Memory maps are re-opened on demand, e.g., by data loader workers
+        state = self.__dict__.copy()
+        state["_shards"] = {}
+
+        return state
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    @property
+    def shape(self) -> Tuple[int]:
+        """Shape of the array."""
+
+        return (len(self),)
+
+    @property
+    def num_shards(self) -> int:
+        """Number of shards."""
+
+        return len(self._files)
+
+    def _get_shard(self, shard_idx: int) -> np.ndarray:
+        if shard_idx not in self._shards:
+            file_path = self.cache_dir / self._files[shard_idx]
+
+            if self.mmap_mode is None:
+                self._shards[shard_idx] = np.fromfile(file_path, dtype=self.dtype)
+            else:
+                self._shards[shard_idx] = np.memmap(file_path, dtype=self.dtype, mode=self.mmap_mode)
+
+        return self._shards[shard_idx]
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[np.generic, np.ndarray]:
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                raise ValueError("`ShardedTokenArray` only supports contiguous slices.")
+
+            return self._get_range(start, max(start, stop))
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Index {idx} is out of bounds for array with length {len(self)}.")
+
+        shard_idx = int(np.searchsorted(self._offsets, idx, side="right")) - 1
+
+        return self._get_shard(shard_idx)[idx - self._offsets[shard_idx]]
+
+    def _get_range(self, start: int, stop: int) -> np.ndarray:
+        if start == stop:
+            return np.empty((0,), dtype=self.dtype)
+
+        first_shard = int(np.searchsorted(self._offsets, start, side="right")) - 1
+        last_shard = int(np.searchsorted(self._offsets, stop - 1, side="right")) - 1
+
+        chunks = []
+        for shard_idx in range(first_shard, last_shard + 1):
+            shard_start = self._offsets[shard_idx]
+            chunk_start = max(start, shard_start) - shard_start
+            chunk_stop = min(stop, self._offsets[shard_idx + 1]) - shard_start
+
+            chunks.append(self._get_shard(shard_idx)[chunk_start:chunk_stop])
+
+        if len(chunks) == 1:
+            return chunks[0]
+
+        return np.concatenate(chunks)
+
+    def __array__(self, dtype: Optional[np.dtype] = None) -> np.ndarray:
+        array = self._get_range(0, len(self))
+
+        return np.asarray(array, dtype=dtype) if dtype is not None else np.asarray(array)
+
+    def close(self) -> None:
+        """Close the memory maps of all opened shards."""
+
+        for shard in self._shards.values():
+            if isinstance(shard, np.memmap) and shard._mmap is not None:
+                shard._mmap.close()
+
+        self._shards = {}
+
+
+class ShardedTokenWriter:
+    """Incremental writer of tokens into fixed-size shards.
+
+    Tokens are appended sequentially to raw binary shards with `shard_size` tokens each
+    (apart from the last one). The index manifest is updated every time a shard is completed,
+    recording the position (row of the source dataset and number of tokens of that row's batch
+    already written) where writing should be resumed if it is interrupted.
+
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        dtype: np.dtype,
+        shard_size: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the writer, resuming from an existing manifest if it is compatible.
+
+        Args:
+            cache_dir: Path to the directory where shards and index manifest are written.
+            dtype: Numpy data type of the tokens.
+            shard_size: Number of tokens per shard.
+            metadata: Additional information stored in the manifest (e.g., tokenizer fingerprint).
+                Existing shards are only re-used if their metadata matches.
+
+        """
+
+        assert shard_size > 0, "`shard_size` should be greater than zero."
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.dtype = np.dtype(dtype)
+        self.shard_size = shard_size
+        self.metadata = json.loads(json.dumps(metadata or {}))
+
+        self.manifest = {
+            "version": 1,
+            "dtype": self.dtype.name,
+            "shard_size": shard_size,
+            "num_tokens": 0,
+            "shards": [],
+            "complete": False,
+            "resume_row": 0,
+            "resume_skip_tokens": 0,
+            "metadata": self.metadata,
+        }
+
+        manifest = _load_manifest(self.cache_dir / SHARDED_CACHE_MANIFEST)
+        if manifest is not None and all(
+            manifest.get(key) == self.manifest[key] for key in ["version", "dtype", "shard_size", "metadata"]
+        ):
+            self.manifest = manifest
+
+        # Removes shards that are not tracked by the manifest, such as partially written ones
+        tracked_files = set(shard["file"] for shard in self.manifest["shards"])
+        for file_path in self.cache_dir.glob("shard_*.bin"):
+            if file_path.name not in tracked_files:
+                file_path.unlink()
+
+        self._file = None
+        self._file_tokens = 0
+        self._num_tokens = self.manifest["num_tokens"]
+
+        # Tokens of the batch starting at `resume_row` that were already written by a previous run
+        self._skip_row = self.manifest["resume_row"]
+        self._skip_tokens = self.manifest["resume_skip_tokens"]
+
+    @property
+    def num_tokens(self) -> int:
+        """Number of written tokens."""
+
+        return self._num_tokens
+
+    @property
+    def complete(self) -> bool:
+        """Whether all tokens have been written."""
+
+        return self.manifest["complete"]
+
+    @property
+    def resume_row(self) -> int:
+        """First row of the source dataset that should be written."""
+
+        return self.manifest["resume_row"]
+
+    @property
+    def resume_skip_tokens(self) -> int:
+        """Number of tokens of the batch starting at `resume_row` that were already written."""
+
+        return self.manifest["resume_skip_tokens"]
+
+    def _save_manifest(self) -> None:
+        manifest_path = self.cache_dir / SHARDED_CACHE_MANIFEST
+        tmp_manifest_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+
+        with open(tmp_manifest_path, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_manifest_path, manifest_path)
+
+    def _close_shard(self, resume_row: int, resume_skip_tokens: int) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        self.manifest["shards"].append(
+            {
+                "file": _shard_file_name(len(self.manifest["shards"])),
+                "offset": self.manifest["num_tokens"],
+                "num_tokens": self._file_tokens,
+            }
+        )
+        self.manifest["num_tokens"] += self._file_tokens
+        self.manifest["resume_row"] = resume_row
+        self.manifest["resume_skip_tokens"] = resume_skip_tokens
+        self._save_manifest()
+
+        self._file = None
+        self._file_tokens = 0
+
+    def write(self, tokens: np.ndarray, row: int) -> None:
+        """Append tokens to the shards.
+
+        If `row` is the row where writing is resumed from, the tokens that were already
+        written by the previous run are skipped.
+
+        Args:
+            tokens: Tokens to be appended.
+            row: First row of the source dataset that produced `tokens`, used to resume writing.
+
+        """
+
+        assert not self.complete, "Tokens can not be written to a complete cache."
+
+        tokens = np.asarray(tokens, dtype=self.dtype)
+
+        start = self._skip_tokens if row == self._skip_row else 0
+        self._skip_tokens = 0
+        batch_offset = self._num_tokens - start
+
+        while start < len(tokens):
+            if self._file is None:
+                self._file = open(self.cache_dir / _shard_file_name(len(self.manifest["shards"])), "wb")
+
+            end = min(len(tokens), start + self.shard_size - self._file_tokens)
+            self._file.write(tokens[start:end].tobytes())
+
+            self._file_tokens += end - start
+            self._num_tokens += end - start
+            start = end
+
+            if self._file_tokens == self.shard_size:
+                self._close_shard(row, self._num_tokens - batch_offset)
+
+    def close(self, num_rows: int) -> None:
+        """Write the last (partial) shard and mark the cache as complete.
+
+        Args:
+            num_rows: Number of rows of the source dataset.
+
+        """
+
+        if self._file is not None:
+            self._close_shard(num_rows, 0)
+
+        self.manifest["complete"] = True
+        self.manifest["resume_row"] = num_rows
+        self.manifest["resume_skip_tokens"] = 0
+        self._save_manifest()
+
+
+def _get_shards(lengths: np.ndarray, num_shards: int) -> List[Tuple[int, int, int]]:
+    # Splits rows into contiguous shards with (approximately) the same number of tokens,
+    # returning the first row, last row (exclusive) and the token offset of each shard
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    num_shards = max(1, min(num_shards, len(lengths)))
+
+    boundaries = np.searchsorted(offsets, np.linspace(0, offsets[-1], num_shards + 1), side="left")
+    boundaries[0], boundaries[-1] = 0, len(lengths)
+    boundaries = np.unique(boundaries)
+
+    return [(int(start), int(end), int(offsets[start])) for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+def _write_input_ids(
+    dataset: HfDataset, output_array: np.ndarray, start_row: int, end_row: int, offset: int, batch_size: int
+) -> int:
+    # Copies batches of rows at once, by flattening their `input_ids` with Arrow
+    arrow_dataset = dataset.with_format("arrow")
+
+    for batch_start in range(start_row, end_row, batch_size):
+        batch = arrow_dataset[batch_start : min(batch_start + batch_size, end_row)]
+        input_ids = pa.compute.list_flatten(batch.column("input_ids")).to_numpy()
+
+        output_array[offset : offset + len(input_ids)] = input_ids
+        offset += len(input_ids)
+
+    return offset
+
+
+def _write_shard_to_shared_memory(
+    dataset: HfDataset, shard: Tuple[int, int, int], name: str, length: int, dtype: np.dtype, batch_size: int
+) -> None:
+    shared_memory = SharedMemory(name=name)
+
+    shared_memory_array = np.ndarray((length,), dtype=dtype, buffer=shared_memory.buf)
+    _write_input_ids(dataset, shared_memory_array, *shard, batch_size)
+
+    del shared_memory_array
+    shared_memory.close()
+
+
+def _write_shard_to_memory_map_file(
+    dataset: HfDataset, shard: Tuple[int, int, int], file_path: str, length: int, dtype: np.dtype, batch_size: int
+) -> None:
+    memory_map_array = np.memmap(file_path, dtype=dtype, mode="r+", shape=(length,))
+    _write_input_ids(dataset, memory_map_array, *shard, batch_size)
+
+    memory_map_array.flush()
+    del memory_map_array
+
+
+def _write_dataset(
+    dataset: HfDataset, write_shard_fn: Callable[..., None], fn_kwargs: Dict[str, Any], num_proc: int
+) -> None:
+    # Each worker processes a contiguous shard and maps the output only once
+    shards = _get_shards(np.asarray(dataset["length"], dtype=np.int64), num_proc)
+
+    if num_proc > 1 and len(shards) > 1:
+        with multiprocessing.Pool(min(num_proc, len(shards))) as pool:
+            pool.starmap(partial(write_shard_fn, **fn_kwargs), [(dataset, shard) for shard in shards])
+    else:
+        for shard in shards:
+            write_shard_fn(dataset, shard, **fn_kwargs)
+
+
 def process_with_shared_memory(
-    dataset_dict: DatasetDict, dtype: np.dtype, num_proc: Optional[int] = 1
+    dataset_dict: DatasetDict, dtype: np.dtype, num_proc: Optional[int] = 1, batch_size: Optional[int] = 1000
 ) -> Dict[str, SHMArray]:
     """Process the dataset with a shared memory.
 
@@ -94,35 +506,23 @@ def process_with_shared_memory(
         dataset_dict: Dataset dictionary.
         dtype: Numpy data type.
         num_proc: Number of processes.
+        batch_size: Number of rows copied at once.
 
     Returns:
         Dictionary with shared memory-processed datasets.
 
     """
 
-    def _process_with_shared_memory(example: Dict[str, Any], name, length: int) -> None:
-        shared_memory = SharedMemory(name=name)
-
-        shared_memory_array = np.ndarray((length,), dtype=dtype, buffer=shared_memory.buf)
-        start_idx = example["offset"] - len(example["input_ids"])
-        shared_memory_array[start_idx : example["offset"]] = example["input_ids"]
-
-        shared_memory.close()
-
     processed_dataset_dict = {}
     for name, ds in dataset_dict.items():
-        dataset_dict[name] = ds.add_column("offset", np.cumsum(ds["length"]))
-        length = dataset_dict[name][-1]["offset"]
+        start_time = time.time()
+        length = int(np.sum(ds["length"], dtype=np.int64))
 
         shared_memory = SharedMemory(create=True, size=length * np.dtype(dtype).itemsize)
-        shared_memory_name = shared_memory.name
+        fn_kwargs = {"name": shared_memory.name, "length": length, "dtype": dtype, "batch_size": batch_size}
+        _write_dataset(ds, _write_shard_to_shared_memory, fn_kwargs, num_proc)
 
-        dataset_dict[name].map(
-            _process_with_shared_memory,
-            fn_kwargs={"name": shared_memory_name, "length": length},
-            batched=False,
-            num_proc=num_proc,
-        )
+        _log_throughput(name, length, time.time() - start_time)
 
         shared_memory_array = np.ndarray((length,), dtype=dtype, buffer=shared_memory.buf)
         processed_dataset_dict[name] = SHMArray(shared_memory_array, shm=shared_memory)
@@ -131,7 +531,11 @@ def process_with_shared_memory(
 
 
 def process_with_memory_map_files(
-    dataset_dict: DatasetDict, cache_dir: str, dtype: np.dtype, num_proc: Optional[int] = 1
+    dataset_dict: DatasetDict,
+    cache_dir: str,
+    dtype: np.dtype,
+    num_proc: Optional[int] = 1,
+    batch_size: Optional[int] = 1000,
 ) -> Dict[str, np.ndarray]:
     """Process the dataset with memory map files.
 
@@ -140,47 +544,143 @@ def process_with_memory_map_files(
         cache_dir: Cache directory.
         dtype: Numpy data type.
         num_proc: Number of processes.
+        batch_size: Number of rows copied at once.
 
     Returns:
         Dictionary with memory map file-processed datasets.
 
     """
 
-    def _process_with_memory_map_files(example: Dict[str, Any], file_path: str) -> None:
-        with open(file_path, "r+b") as f:
-            memory_map = mmap.mmap(f.fileno(), 0)
-
-            start_idx = example["offset"] - len(example["input_ids"])
-            length = len(example["input_ids"])
-
-            memory_map_array = np.ndarray(
-                (length,), dtype=dtype, buffer=memory_map, offset=np.dtype(dtype).itemsize * start_idx
-            )
-            memory_map_array[:] = example["input_ids"]
-
-            memory_map.flush()
-
     processed_dataset_dict = {}
     for split, dataset in dataset_dict.items():
-        dataset_dict[split] = dataset.add_column("offset", np.cumsum(dataset["length"]))
-        length = dataset_dict[split][-1]["offset"]
+        start_time = time.time()
+        length = int(np.sum(dataset["length"], dtype=np.int64))
 
-        file_path = cache_dir / f"{split}.bin"
+        file_path = Path(cache_dir) / f"{split}.bin"
         with open(file_path.as_posix(), "wb") as f:
             f.truncate(length * np.dtype(dtype).itemsize)
 
-        dataset_dict[split].map(
-            _process_with_memory_map_files,
-            fn_kwargs={"file_path": file_path},
-            batched=False,
-            num_proc=num_proc,
-        )
+        fn_kwargs = {"file_path": file_path.as_posix(), "length": length, "dtype": dtype, "batch_size": batch_size}
+        _write_dataset(dataset, _write_shard_to_memory_map_file, fn_kwargs, num_proc)
+
+        _log_throughput(split, length, time.time() - start_time)
 
         processed_dataset_dict[split] = np.memmap(file_path, dtype=dtype, mode="r", shape=(length,))
 
     return processed_dataset_dict
 
 
+_ENCODE_WORKER_STATE = {}
+
+
+def _encode_rows(
+    dataset: HfDataset,
+    mapping_fn: Callable[[Any], Dict[str, Any]],
+    mapping_fn_kwargs: Dict[str, Any],
+    dtype: np.dtype,
+    batch_size: int,
+    start_row: int,
+) -> Tuple[int, np.ndarray]:
+    outputs = mapping_fn(dataset[start_row : start_row + batch_size], **mapping_fn_kwargs)
+    input_ids = [np.asarray(ids, dtype=dtype) for ids in outputs["input_ids"]]
+
+    return start_row, np.concatenate(input_ids) if input_ids else np.empty((0,), dtype=dtype)
+
+
+def _init_encode_worker(*args) -> None:
+    _ENCODE_WORKER_STATE["args"] = args
+
+
+def _encode_rows_in_worker(start_row: int) -> Tuple[int, np.ndarray]:
+    return _encode_rows(*_ENCODE_WORKER_STATE["args"], start_row)
+
+
+def process_with_sharded_cache(
+    dataset_dict: DatasetDict,
+    cache_dir: str,
+    mapping_fn: Callable[[Any], Dict[str, Any]],
+    mapping_fn_kwargs: Dict[str, Any],
+    dtype: np.dtype,
+    shard_size: int,
+    metadata: Optional[Dict[str, Any]] = None,
+    num_proc: Optional[int] = 1,
+    batch_size: Optional[int] = 1000,
+) -> Dict[str, Path]:
+    """Encode the dataset and write its tokens to sharded caches.
+
+    Batches of rows are encoded (in parallel if `num_proc > 1`) and their tokens are appended
+    in order to fixed-size shards as soon as they are available, so no intermediate copy of the
+    encoded dataset is stored. If a previous run was interrupted, encoding is resumed from the
+    last completed shard, as long as `dtype`, `shard_size`, `batch_size`, `metadata` and the
+    dataset (fingerprint and number of rows) match.
+
+    Args:
+        dataset_dict: Dataset dictionary with raw (not encoded) data.
+        cache_dir: Cache directory, where each split is written to a sub-directory.
+        mapping_fn: Function that encodes a batch of rows into a dictionary with `input_ids`.
+        mapping_fn_kwargs: Keyword arguments to pass to `mapping_fn`.
+        dtype: Numpy data type.
+        shard_size: Number of tokens per shard.
+        metadata: Additional information stored in the manifests (e.g., tokenizer fingerprint).
+        num_proc: Number of processes.
+        batch_size: Number of rows encoded at once.
+
+    Returns:
+        Dictionary with the directories of the sharded caches.
+
+    """
+
+    metadata = {**(metadata or {}), "batch_size": batch_size}
+
+    processed_dataset_dict = {}
+    for split, dataset in dataset_dict.items():
+        split_dir = Path(cache_dir) / split
+        split_metadata = {
+            **metadata,
+            "dataset_fingerprint": getattr(dataset, "_fingerprint", None),
+            "num_rows": len(dataset),
+        }
+        writer = ShardedTokenWriter(split_dir, dtype, shard_size, metadata=split_metadata)
+
+        if writer.complete:
+            logger.info(f"Re-using sharded cache: {split_dir}")
+        else:
+            if writer.resume_row > 0:
+                logger.info(f"Resuming {split} split from row {writer.resume_row}/{len(dataset)} ...")
+
+            start_time = time.time()
+            start_tokens = writer.num_tokens
+
+            encode_args = (dataset, mapping_fn, mapping_fn_kwargs, dtype, batch_size)
+            start_rows = range(writer.resume_row, len(dataset), batch_size)
+
+            if num_proc > 1 and len(start_rows) > 1:
+                with multiprocessing.Pool(
+                    min(num_proc, len(start_rows)), initializer=_init_encode_worker, initargs=encode_args
+                ) as pool:
+                    for start_row, input_ids in pool.imap(_encode_rows_in_worker, start_rows):
+                        writer.write(input_ids, start_row)
+            else:
+                for start_row in start_rows:
+                    _, input_ids = _encode_rows(*encode_args, start_row)
+                    writer.write(input_ids, start_row)
+
+            writer.close(len(dataset))
+
+            _log_throughput(split, writer.num_tokens - start_tokens, time.time() - start_time)
+
+        processed_dataset_dict[split] = split_dir
+
+    return processed_dataset_dict
+
+
+def _log_throughput(split: str, n_tokens: int, elapsed_time: float) -> None:
+    logger.info(
+        f"Processed {split} split: {n_tokens} tokens in {elapsed_time:.2f}s "
+        f"({n_tokens / max(elapsed_time, 1e-9):.0f} tokens/s)."
+    )
+
+
 def xor(p: Any, q: Any) -> bool:
     """Implements the logical XOR operator.
 
@@ -2,7 +2,10 @@
 # Licensed under the Apache License, Version 2.0.
 # https://github.com/NVIDIA/DeepLearningExamples/blob/master/PyTorch/LanguageModeling/Transformer-XL/pytorch/data_utils.py
 
-from typing import Generator, Iterator, List, Optional, Tuple
+import queue
+import threading
+import time
+from typing import Any, Generator, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -16,16 +19,21 @@ class LMOrderedIterator:
 
     def __init__(
         self,
-        input_ids: torch.LongTensor,
+        input_ids: Union[torch.Tensor, np.ndarray],
         bsz: int,
         bptt: int,
         device: Optional[torch.device] = None,
         mem_len: Optional[int] = 0,
         ext_len: Optional[int] = 0,
         warmup: Optional[bool] = True,
+        num_prefetch_batches: Optional[int] = 0,
     ) -> None:
         """Initialize the iterator with the input sequence and batch parameters.
 
+        The input sequence can be a (memory-mapped) array with a compact data type, since
+        only the rows used by the current rank are copied to memory, and batches are only
+        converted to `torch.LongTensor` when they are retrieved.
+
         Args:
             input_ids: Input sequence of tokens.
             bsz: Batch size.
@@ -34,6 +42,8 @@ class LMOrderedIterator:
             mem_len: Length of memory (for Transformer-XL).
             ext_len: Length of extended context (for Transformer-XL).
             warmup: Whether warmup batches should be created.
+            num_prefetch_batches: Number of batches (and next roll of the data) prepared in a
+                background thread ahead of their use. If `0`, batches are prepared on demand.
 
         """
 
@@ -43,31 +53,46 @@ class LMOrderedIterator:
         self.ext_len = ext_len
         self.mem_len = mem_len
         self.warmup = warmup
+        self.num_prefetch_batches = num_prefetch_batches
         self.last_iter = None
 
-        # Divides cleanly the inputs into batches and trims the remaining elements
-        n_step = input_ids.size(0) // bsz
-        input_ids = input_ids[: n_step * bsz]
-        self.input_ids = input_ids.view(bsz, -1).contiguous()
-        if self.device.type != "cpu":
-            self.input_ids = self.input_ids.pin_memory()
+        # Time (in seconds) spent waiting for batches to be prepared
+        self.stall_time = 0.0
 
-        # Creates warmup batches if memory is being used
-        if mem_len and warmup:
-            self.warmup_batches = (mem_len + bptt - 1) // bptt
-            self.warmup_elems = self.warmup_batches * bptt
+        # Roll of the data that is being prepared in background, if any
+        self._next_roll = None
 
-            warmup_ids = self.input_ids.roll((self.warmup_elems, 1), (1, 0))[:, : self.warmup_elems]
-            self.input_ids = torch.cat((warmup_ids, self.input_ids), dim=-1)
+        if isinstance(input_ids, torch.Tensor):
+            input_ids = input_ids.cpu().numpy()
 
-        # Chunks the inputs for distributed training (if available)
+        # Divides cleanly the inputs into batches and trims the remaining elements,
+        # without copying (memory-mapped) inputs
+        n_step = input_ids.shape[0] // bsz
+        input_ids = input_ids[: n_step * bsz].reshape(bsz, -1)
+
+        # Selects the rows for distributed training (if available), following `torch.chunk`
         world_size = get_world_size()
         rank = get_rank()
-        self.input_ids = self.input_ids.chunk(world_size, dim=0)[rank]
 
-        self.n_batch = (self.input_ids.size(1) + self.bptt - 1) // self.bptt
+        chunk_size = (bsz + world_size - 1) // world_size
+        rows = np.arange(rank * chunk_size, min((rank + 1) * chunk_size, bsz))
+
+        # Copies the selected rows to memory, prepending warmup batches if memory is being used.
+        # Warmup elements of each row are the last elements of its previous row
+        self.input_ids = np.array(input_ids[rows[0] : rows[-1] + 1] if len(rows) else input_ids[:0])
 
-    def roll(self, seed: int) -> None:
+        if mem_len and warmup:
+            self.warmup_batches = (mem_len + bptt - 1) // bptt
+            self.warmup_elems = self.warmup_batches * bptt
+
+            n_warmup_cols = min(self.warmup_elems, input_ids.shape[1])
+            warmup_cols = (np.arange(n_warmup_cols) - self.warmup_elems) % input_ids.shape[1]
+            warmup_ids = input_ids[((rows - 1) % bsz)[:, None], warmup_cols[None, :]]
+            self.input_ids = np.concatenate((warmup_ids, self.input_ids), axis=1)
+
+        self.n_batch = (self.input_ids.shape[1] + self.bptt - 1) // self.bptt
+
+    def roll(self, seed: int, next_seed: Optional[int] = None) -> None:
         """Roll the data according to a random seed.
 
         This method shuffles the input sequence for each batch in the iterator by
@@ -76,19 +101,41 @@ class LMOrderedIterator:
 
         Args:
             seed: Seed used to roll/shift the data.
+            next_seed: Seed of the next roll, which is prepared in a background thread
+                if prefetching is enabled.
 
         """
 
-        rng = torch.Generator()
-        rng.manual_seed(seed)
+        if self._next_roll is not None and self._next_roll["seed"] == seed:
+            self._next_roll["thread"].join()
+            self.input_ids = self._next_roll["input_ids"]
+        else:
+            self.input_ids = _roll_rows(self.input_ids, seed)
+
+        self._next_roll = None
 
-        for i in range(self.input_ids.size(0)):
-            shift = torch.randint(0, self.input_ids.size(1), (1,), generator=rng)
+        if next_seed is not None and self.num_prefetch_batches > 0:
+            next_roll = {"seed": next_seed}
 
-            row = self.input_ids[i, :]
-            row = torch.cat((row[shift:], row[:shift]))
+            def _prepare_next_roll(input_ids: np.ndarray) -> None:
+                next_roll["input_ids"] = _roll_rows(input_ids, next_seed)
 
-            self.input_ids[i, :] = row
+            next_roll["thread"] = threading.Thread(target=_prepare_next_roll, args=(self.input_ids,), daemon=True)
+            next_roll["thread"].start()
+
+            self._next_roll = next_roll
+
+    def _get_batch_arrays(self, i: int, bptt: int) -> Tuple[np.ndarray, np.ndarray, int, bool]:
+        seq_len = min(bptt, self.input_ids.shape[1] - 1 - i)
+
+        start_idx = max(0, i - self.ext_len)
+        end_idx = i + seq_len
+
+        warmup = True
+        if self.mem_len and self.warmup:
+            warmup = i >= self.warmup_elems
+
+        return self.input_ids[:, start_idx:end_idx], self.input_ids[:, i + 1 : i + 1 + seq_len], seq_len, warmup
 
     def get_batch(self, i: int, bptt: Optional[int] = None) -> Tuple[torch.LongTensor, torch.LongTensor, int, bool]:
         """Get a batch of `bptt` size.
@@ -105,29 +152,32 @@ class LMOrderedIterator:
         if bptt is None:
             bptt = self.bptt
 
-        seq_len = min(bptt, self.input_ids.size(1) - 1 - i)
+        input_ids, labels, seq_len, warmup = self._get_batch_arrays(i, bptt)
 
-        start_idx = max(0, i - self.ext_len)
-        end_idx = i + seq_len
-
-        input_ids = self.input_ids[:, start_idx:end_idx].to(self.device, non_blocking=True)
-        labels = self.input_ids[:, i + 1 : i + 1 + seq_len].to(self.device, non_blocking=True)
-
-        warmup = True
-        if self.mem_len and self.warmup:
-            warmup = i >= self.warmup_elems
+        # Batches are only upcasted to `int64` when retrieved
+        input_ids = torch.from_numpy(input_ids.astype(np.int64)).to(self.device, non_blocking=True)
+        labels = torch.from_numpy(labels.astype(np.int64)).to(self.device, non_blocking=True)
 
         return input_ids, labels, seq_len, warmup
 
-    def get_fixlen_iter(self, start: Optional[int] = 0) -> Generator[Tuple, None, None]:
+    def get_fixlen_iter(
+        self, start: Optional[int] = 0, max_batches: Optional[int] = None
+    ) -> Generator[Tuple, None, None]:
         """Return a generator for generating fixed-length batches.
 
         This method returns a generator that yields fixed-length batches of the specified size,
         starting from the specified starting point. The batches are contiguous in the original
-        sequence.
+        sequence. If prefetching is enabled, the next batches are prepared in a background thread
+        (into pinned memory, if `device` is not CPU), and the time spent waiting for them is
+        accumulated in `stall_time`.
+
+        If `max_batches` is supplied, only that number of batches, evenly spaced over the
+        sequence, are yielded. The subsample does not depend on the rolls of the data, so it
+        is stable across evaluations.
 
         Args:
             start: Starting point for the generator.
+            max_batches: Maximum number of batches.
 
         Yields:
             Fixed-length batches.
@@ -142,9 +192,23 @@ class LMOrderedIterator:
         if start != 0:
             start += self.bptt
 
-        for i in range(start, self.input_ids.size(1) - 1, self.bptt):
+        positions = range(start, self.input_ids.shape[1] - 1, self.bptt)
+        if max_batches is not None and max_batches < len(positions):
+            subsample = np.linspace(0, len(positions) - 1, max(max_batches, 1)).round().astype(int)
+            positions = [positions[k] for k in subsample]
+
+        def _generate_batches() -> Generator[Tuple, None, None]:
+            for i in positions:
+                input_ids, labels, seq_len, warmup = self._get_batch_arrays(i, self.bptt)
+                yield (input_ids, labels), (seq_len, warmup, i)
+
+        prefetcher = _BatchPrefetcher(_generate_batches(), self.num_prefetch_batches, self.device)
+
+        for (input_ids, labels), (seq_len, warmup, i) in prefetcher:
+            self.stall_time += prefetcher.last_stall_time
             self.last_iter = i
-            yield self.get_batch(i)
+
+            yield input_ids, labels, seq_len, warmup
 
     def get_varlen_iter(
         self,
@@ -186,7 +250,7 @@ class LMOrderedIterator:
             i += seq_len
 
             yield input_ids, labels, seq_len
-            if i >= self.input_ids.size(1) - 2:
+            if i >= self.input_ids.shape[1] - 2:
                 break
 
     def __iter__(self) -> Generator[Tuple, None, None]:
@@ -210,6 +274,7 @@ class LMMultiFileIterator:
         ext_len: Optional[int] = 0,
         n_chunks: Optional[int] = 16,
         shuffle: Optional[bool] = False,
+        num_prefetch_batches: Optional[int] = 0,
     ) -> None:
         """Initialize by adding support to multi-file inputs and sharding files
             across GPUs, if distributed training is available.
@@ -224,6 +289,8 @@ class LMMultiFileIterator:
             ext_len: Length of extended context (for Transformer-XL).
             n_chunks: Number of chunks (to avoid out of memory).
             shuffle: Whether shuffling should be used.
+            num_prefetch_batches: Number of batches prepared in a background thread ahead
+                of their use. If `0`, batches are prepared on demand.
 
         """
 
@@ -234,8 +301,12 @@ class LMMultiFileIterator:
         self.ext_len = ext_len
         self.n_chunks = n_chunks
         self.shuffle = shuffle
+        self.num_prefetch_batches = num_prefetch_batches
         self.last_iter = None
 
+        # Time (in seconds) spent waiting for batches to be prepared
+        self.stall_time = 0.0
+
         # For compatibility with LMOrderedIterator
         self.n_batch = -1
 
@@ -247,7 +318,7 @@ class LMMultiFileIterator:
         paths_chunks = [paths[i : i + chunk_len] for i in range(0, len(paths), chunk_len)]
         self.paths = paths_chunks[rank]
 
-    def roll(self, seed: Optional[int] = 0) -> None:
+    def roll(self, seed: Optional[int] = 0, next_seed: Optional[int] = None) -> None:
         """Backward compatibility for using same API."""
 
         pass
@@ -269,61 +340,45 @@ class LMMultiFileIterator:
 
         return sequences
 
-    def stream_iterator(self, iterator: Iterator) -> Generator[Tuple, None, None]:
+    def stream_iterator(
+        self, sequences: Union[torch.Tensor, Iterator]
+    ) -> Generator[Tuple[torch.LongTensor, torch.LongTensor, int, bool], None, None]:
         """Create a streaming-based iterator.
 
+        Each row of a batch is filled with a contiguous block of `bptt + 1` tokens from
+        `sequences`, where the first `bptt` tokens are the inputs and the last `bptt` tokens
+        are the labels. Blocks are sliced with tensor operations, and incomplete batches
+        at the end of `sequences` are dropped.
+
         Args:
-            iterator: Iterator with chunks of sequences.
+            sequences: Tensor (or iterator) with chunks of sequences.
 
         Yields:
             Stream-based batch.
 
         """
 
-        input_ids = torch.LongTensor(self.bsz, self.bptt)
-        labels = torch.LongTensor(self.bsz, self.bptt)
-
-        n_retain = 0
-
-        while True:
-            # input_ids: [bsz x n_retain+bptt]
-            # labels: [bsz x bptt]
-            input_ids[:, n_retain:].fill_(-1)
-            labels.fill_(-1)
-
-            valid_batch = True
-            for i in range(self.bsz):
-                n_filled = 0
-                try:
-                    while n_filled < self.bptt:
-                        stream = torch.LongTensor([next(iterator) for _ in range(self.bptt + 1)])
-
-                        # Number of new tokens to be filled in
-                        n_tokens = min(len(stream) - 1, self.bptt - n_filled)
+        if not isinstance(sequences, torch.Tensor):
+            sequences = torch.LongTensor(list(sequences))
 
-                        # First n_tokens are retained from last batch
-                        input_ids[i, n_retain + n_filled : n_retain + n_filled + n_tokens] = stream[:n_tokens]
-                        labels[i, n_filled : n_filled + n_tokens] = stream[1 : n_tokens + 1]
+        block_len = self.bptt + 1
+        n_batch = sequences.size(0) // (self.bsz * block_len)
+        blocks = sequences[: n_batch * self.bsz * block_len].view(n_batch, self.bsz, block_len)
 
-                        n_filled += n_tokens
-                except StopIteration:
-                    valid_batch = False
-                    break
-
-            if not valid_batch:
-                return
+        retained_input_ids = None
+        for blocks_batch in blocks:
+            input_ids = blocks_batch[:, :-1].long()
+            labels = blocks_batch[:, 1:].long()
 
-            input_ids = input_ids.to(self.device)
-            labels = labels.to(self.device)
+            # Prepends the last `ext_len` inputs from previous batch
+            if retained_input_ids is not None:
+                input_ids = torch.cat((retained_input_ids, input_ids), dim=1)
+            if self.ext_len > 0:
+                retained_input_ids = input_ids[:, -min(self.bptt, self.ext_len) :]
 
             yield input_ids, labels, self.bptt, True
 
-            n_retain = min(input_ids.size(1), self.ext_len)
-            if n_retain > 0:
-                input_ids[:, :n_retain] = input_ids[:, -n_retain:]
-            input_ids.resize_(input_ids.size(0), n_retain + self.bptt)
-
-    def __iter__(self) -> Generator[Tuple, None, None]:
+    def _generate_batches(self) -> Generator[Tuple[int, Tuple], None, None]:
         if self.shuffle:
             np.random.shuffle(self.paths)
 
@@ -332,7 +387,186 @@ class LMMultiFileIterator:
             sequences_chunks = torch.chunk(sequences, self.n_chunks, 0)
 
             for i in range(self.n_chunks):
-                iterator = iter(sequences_chunks[i])
-                for idx, batch in enumerate(self.stream_iterator(iterator)):
-                    yield batch
-                    self.last_iter = idx
+                for idx, (input_ids, labels, seq_len, warmup) in enumerate(
+                    self.stream_iterator(sequences_chunks[i])
+                ):
+                    yield (input_ids.numpy(), labels.numpy()), (seq_len, warmup, idx)
+
+    def __iter__(self) -> Generator[Tuple, None, None]:
+        prefetcher = _BatchPrefetcher(self._generate_batches(), self.num_prefetch_batches, torch.device(self.device))
+
+        for (input_ids, labels), (seq_len, warmup, idx) in prefetcher:
+            self.stall_time += prefetcher.last_stall_time
+
+            yield input_ids, labels, seq_len, warmup
+            self.last_iter = idx
+
+
+def _roll_rows(input_ids: np.ndarray, seed: int) -> np.ndarray:
+    # Rolls each row into a new array (so batches being prefetched from the previous one are
+    # not modified), drawing all shifts at once, which consumes the random number generator
+    # in the same way as drawing one shift per row
+    n_rows, n_cols = input_ids.shape
+    if n_cols == 0:
+        return input_ids.copy()
+
+    rng = torch.Generator()
+    rng.manual_seed(seed)
+    shifts = torch.randint(0, n_cols, (n_rows,), generator=rng).tolist()
+
+    # Contiguous copies are faster than gathering with indices
+    rolled_input_ids = np.empty_like(input_ids)
+    for i, shift in enumerate(shifts):
+        rolled_input_ids[i, : n_cols - shift] = input_ids[i, shift:]
+        rolled_input_ids[i, n_cols - shift :] = input_ids[i, :shift]
+
+    return rolled_input_ids
+
+
+class _BatchPrefetcher:
+    """Iterate over batches of arrays, converting them to `torch.LongTensor` on `device`.
+
+    If `num_batches > 0`, batches are prepared in a background thread. When `device` is not CPU,
+    they are copied to a ring of pinned staging buffers, so host-to-device copies are
+    asynchronous and overlap with computation.
+
+    """
+
+    def __init__(
+        self,
+        generator: Generator[Tuple[Tuple[np.ndarray, ...], Any], None, None],
+        num_batches: int,
+        device: torch.device,
+    ) -> None:
+        self.generator = generator
+        self.num_batches = num_batches
+        self.device = device
+        self.pin_memory = device.type == "cuda" and torch.cuda.is_available()
+
+        # Time (in seconds) spent waiting for the last batch
+        self.last_stall_time = 0.0
+
+        # Staging buffers are re-used once their host-to-device copy has finished
+        n_slots = num_batches + 2
+        self._buffers = [[] for _ in range(n_slots)]
+        self._copy_events = [None] * n_slots
+
+    def _stage(self, slot: int, arrays: Tuple[np.ndarray, ...]) -> Tuple[torch.LongTensor, ...]:
+        if not self.pin_memory:
+            return tuple(torch.from_numpy(array.astype(np.int64)) for array in arrays)
+
+        if self._copy_events[slot] is not None:
+            self._copy_events[slot].synchronize()
+
+        buffers = self._buffers[slot]
+        staged = []
+
+        for k, array in enumerate(arrays):
+            if len(buffers) <= k:
+                buffers.append(torch.empty((0,), dtype=torch.long))
+            if buffers[k].numel() < array.size:
+                buffers[k] = torch.empty((array.size,), dtype=torch.long).pin_memory()
+
+            tensor = buffers[k][: array.size].view(array.shape)
+            tensor.numpy()[...] = array
+            staged.append(tensor)
+
+        return tuple(staged)
+
+    def _to_device(self, slot: int, tensors: Tuple[torch.LongTensor, ...]) -> Tuple[torch.LongTensor, ...]:
+        tensors = tuple(tensor.to(self.device, non_blocking=True) for tensor in tensors)
+
+        if self.pin_memory:
+            self._copy_events[slot] = torch.cuda.Event()
+            self._copy_events[slot].record()
+
+        return tensors
+
+    def __iter__(self) -> Generator[Tuple[Tuple[torch.LongTensor, ...], Any], None, None]:
+        if self.num_batches <= 0:
+            yield from self._iter_sync()
+        else:
+            yield from self._iter_async()
+
+    def _iter_sync(self) -> Generator[Tuple[Tuple[torch.LongTensor, ...], Any], None, None]:
+        while True:
+            start_time = time.perf_counter()
+
+            try:
+                arrays, meta = next(self.generator)
+            except StopIteration:
+                return
+
+            # Waits for the previous copy before re-using the single staging buffer
+            tensors = self._stage(0, arrays)
+            self.last_stall_time = time.perf_counter() - start_time
+
+            yield self._to_device(0, tensors), meta
+
+    def _iter_async(self) -> Generator[Tuple[Tuple[torch.LongTensor, ...], Any], None, None]:
+        ready_slots = queue.Queue()
+        free_slots = queue.Queue()
+        for slot in range(len(self._buffers)):
+            free_slots.put(slot)
+
+        stop_event = threading.Event()
+        end_of_stream = object()
+
+        def _get_free_slot() -> Optional[int]:
+            while not stop_event.is_set():
+                try:
+                    return free_slots.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+            return None
+
+        def _worker() -> None:
+            try:
+                # At most `num_batches` slots are ready at once, since one slot is being
+                # staged and another one is being copied to the device
+                while True:
+                    slot = _get_free_slot()
+                    if slot is None:
+                        return
+
+                    try:
+                        arrays, meta = next(self.generator)
+                    except StopIteration:
+                        break
+
+                    ready_slots.put((slot, self._stage(slot, arrays), meta))
+            except BaseException as e:
+                ready_slots.put(e)
+                return
+
+            ready_slots.put(end_of_stream)
+
+        thread = threading.Thread(target=_worker, daemon=True)
+        thread.start()
+
+        previous_slot = None
+        try:
+            while True:
+                start_time = time.perf_counter()
+                item = ready_slots.get()
+                self.last_stall_time = time.perf_counter() - start_time
+
+                # Releases the slot of the previous batch, whose copy has already been issued
+                if previous_slot is not None:
+                    free_slots.put(previous_slot)
+                    previous_slot = None
+
+                if item is end_of_stream:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                slot, tensors, meta = item
+                tensors = self._to_device(slot, tensors)
+                previous_slot = slot
+
+                yield tensors, meta
+        finally:
+            # Worker thread exits as soon as it waits for another slot
+            stop_event.set()
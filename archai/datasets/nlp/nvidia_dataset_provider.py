@@ -21,6 +21,7 @@ class NvidiaDatasetProvider(DatasetProvider):
         vocab_type: Optional[str] = "gpt2",
         vocab_size: Optional[int] = None,
         refresh_cache: Optional[bool] = False,
+        num_workers: Optional[int] = 1,
     ) -> None:
         """Initialize NVIDIA dataset provider.
 
@@ -31,13 +32,20 @@ class NvidiaDatasetProvider(DatasetProvider):
             vocab_type: Type of vocabulary/tokenizer.
             vocab_size: Vocabulary size.
             refresh_cache: Whether cache should be refreshed.
+            num_workers: Number of processes used to encode the dataset files.
 
         """
 
         super().__init__()
 
         self.corpus = Corpus(
-            dataset_name, dataset_dir, cache_dir, vocab_type, vocab_size=vocab_size, refresh_cache=refresh_cache
+            dataset_name,
+            dataset_dir,
+            cache_dir,
+            vocab_type,
+            vocab_size=vocab_size,
+            refresh_cache=refresh_cache,
+            num_workers=num_workers,
         )
 
         if not self.corpus.load():
@@ -6,7 +6,6 @@ import os
 from typing import Optional, Tuple
 
 import numpy as np
-import torch
 
 from archai.common.file_utils import get_full_path
 from archai.common.ordered_dict_logger import OrderedDictLogger
@@ -37,6 +36,7 @@ class Corpus:
         vocab_type: str,
         vocab_size: Optional[int] = None,
         refresh_cache: Optional[bool] = False,
+        num_workers: Optional[int] = 1,
     ) -> None:
         """Initialize the `Corpus` class by defining attributes and creating
         cache-related paths.
@@ -49,6 +49,7 @@ class Corpus:
                 Valid options are `word`, `bbpe`, `gpt2`, or `bpe`.
             vocab_size: Vocabulary size.
             refresh_cache: Whether to refresh the cache.
+            num_workers: Number of processes used to encode the dataset files.
 
         """
 
@@ -56,6 +57,7 @@ class Corpus:
         self.dataset_dir = dataset_dir
         self.vocab_type = vocab_type
         self.vocab_size = vocab_size
+        self.num_workers = num_workers
 
         # Corpus cache is created using dataset/vocab_type/vocab_size path
         self.corpus_cache_dir = get_full_path(
@@ -175,10 +177,10 @@ class Corpus:
         if self.dataset_name == "lm1b":
             self.train = train_filepath
         else:
-            self.train = self.vocab.encode_file(train_filepath)
+            self.train = self.vocab.encode_file_to_array(train_filepath, num_workers=self.num_workers)
 
-        self.valid = self.vocab.encode_file(valid_filepath)
-        self.test = self.vocab.encode_file(test_filepath)
+        self.valid = self.vocab.encode_file_to_array(valid_filepath, num_workers=self.num_workers)
+        self.test = self.vocab.encode_file_to_array(test_filepath, num_workers=self.num_workers)
 
     def train_and_encode(self) -> None:
         """Train the vocabulary/tokenizer and encodes the corpus."""
@@ -190,8 +192,8 @@ class Corpus:
         self._create_train_vocab()
         self._encode_files()
 
-        train_size = f"{len(self.train)} files" if isinstance(self.train, list) else self.train.size(0)
-        logger.debug(f"Size: train = {train_size} | valid = {self.valid.size(0)} | test = {self.test.size(0)}")
+        train_size = f"{len(self.train)} files" if isinstance(self.train, list) else len(self.train)
+        logger.debug(f"Size: train = {train_size} | valid = {len(self.valid)} | test = {len(self.test)}")
 
     def load(self) -> bool:
         """Load a pre-trained corpus.
@@ -218,13 +220,12 @@ class Corpus:
 
             self.vocab.load()
 
-            self.train = torch.from_numpy(np.load(self.train_cache_filepath))
-            self.valid = torch.from_numpy(np.load(self.valid_cache_filepath))
-            self.test = torch.from_numpy(np.load(self.test_cache_filepath))
+            # Encoded files are memory mapped, so they are only read when (and if) needed
+            self.train = np.load(self.train_cache_filepath, mmap_mode="r")
+            self.valid = np.load(self.valid_cache_filepath, mmap_mode="r")
+            self.test = np.load(self.test_cache_filepath, mmap_mode="r")
 
-            logger.debug(
-                f"Size: train = {self.train.size(0)} | valid = {self.valid.size(0)} | test = {self.test.size(0)}"
-            )
+            logger.debug(f"Size: train = {len(self.train)} | valid = {len(self.valid)} | test = {len(self.test)}")
 
             return True
 
@@ -242,6 +243,7 @@ class Corpus:
 
         assert self.vocab is not None and self.vocab.is_trained()
 
-        np.save(self.train_cache_filepath, self.train.numpy())
-        np.save(self.valid_cache_filepath, self.valid.numpy())
-        np.save(self.test_cache_filepath, self.test.numpy())
+        # Encoded files are stored with the smallest data type that fits the vocabulary
+        np.save(self.train_cache_filepath, self.train)
+        np.save(self.valid_cache_filepath, self.valid)
+        np.save(self.test_cache_filepath, self.test)
@@ -150,6 +150,20 @@ class BbpeTokenizer(TokenizerBase):
 
         return toks
 
+    @overrides
+    def encode_lines(self, lines: List[str]) -> List[List[int]]:
+        if len(lines) == 0:
+            return []
+
+        # Uses the batch API of the fast tokenizer, which encodes lines in parallel
+        text = [self._preprocess_text(line) for line in lines]
+        toks = self._tokenizer(text, add_special_tokens=False)["input_ids"]
+
+        if self.encode_special_tokens:
+            toks = [self.bos_id + t + self.eos_id for t in toks]
+
+        return toks
+
     @overrides
     def decode_text(self, ids: List[int]) -> str:
         return self._tokenizer.decode(ids, skip_special_tokens=self.decode_special_tokens)
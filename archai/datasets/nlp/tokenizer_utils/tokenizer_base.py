@@ -1,9 +1,14 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import io
+import multiprocessing
+import os
 from abc import abstractmethod
-from typing import List, Optional
+from itertools import chain
+from typing import List, Optional, Tuple
 
+import numpy as np
 import torch
 from overrides import EnforceOverrides
 
@@ -12,6 +17,9 @@ from archai.datasets.nlp.tokenizer_utils.token_config import SpecialTokenEnum
 
 logger = OrderedDictLogger(source=__name__)
 
+# Tokenizer used by the `encode_file` worker processes
+_ENCODE_WORKER_TOKENIZER = None
+
 
 class TokenizerBase(EnforceOverrides):
     """Abstract class for tokenizers.
@@ -161,17 +169,67 @@ class TokenizerBase(EnforceOverrides):
 
         return [self.id_to_token(id) for id in ids]
 
-    def encode_file(self, path: str, verbose: Optional[bool] = True) -> torch.Tensor:
+    def encode_lines(self, lines: List[str]) -> List[List[int]]:
+        """Encode a list of lines into tokens.
+
+        Tokenizers that support batched encoding should override this method,
+        which is used by `encode_file`.
+
+        Args:
+            lines: The input lines to encode.
+
+        Returns:
+            The encoded lines (tokens).
+
+        """
+
+        return [self.encode_text(line) for line in lines]
+
+    def encode_file(
+        self,
+        path: str,
+        verbose: Optional[bool] = True,
+        num_workers: Optional[int] = 1,
+        chunk_size: Optional[int] = 16 * 1024 * 1024,
+        dtype: Optional[torch.dtype] = torch.long,
+    ) -> torch.Tensor:
         """Encode text from an input file.
 
-        This method reads text from the specified file and encodes it using
-        the `encode_text` method. It also includes options for verbosity and
-        efficiently handling large datasets by converting the encoded tokens
-        to a `torch.Tensor` every 500k lines.
+        Args:
+            path: The path to the input file.
+            verbose: Whether to add verbosity to the logger.
+            num_workers: Number of processes used to encode the file.
+            chunk_size: Approximate size (in bytes) of the chunks encoded at once.
+            dtype: Data type of the encoded tokens.
+
+        Returns:
+            The encoded tokens.
+
+        """
+
+        encoded = self.encode_file_to_array(path, verbose=verbose, num_workers=num_workers, chunk_size=chunk_size)
+
+        return torch.from_numpy(encoded.astype(_to_numpy_dtype(dtype)))
+
+    def encode_file_to_array(
+        self,
+        path: str,
+        verbose: Optional[bool] = True,
+        num_workers: Optional[int] = 1,
+        chunk_size: Optional[int] = 16 * 1024 * 1024,
+    ) -> np.ndarray:
+        """Encode text from an input file into an array with the smallest data type that fits the vocabulary.
+
+        The file is split into chunks of approximately `chunk_size` bytes (aligned to line breaks),
+        which are encoded with `encode_lines` (in parallel if `num_workers > 1`). Tokens are
+        stored in a compact buffer (`uint16` or `int32`, depending on the vocabulary size) that
+        grows as chunks are encoded.
 
         Args:
             path: The path to the input file.
             verbose: Whether to add verbosity to the logger.
+            num_workers: Number of processes used to encode the chunks.
+            chunk_size: Approximate size (in bytes) of the chunks.
 
         Returns:
             The encoded tokens.
@@ -180,24 +238,98 @@ class TokenizerBase(EnforceOverrides):
 
         logger.info(f"Encoding file: {path}")
 
-        encoded = []
-        tensor_encoded = torch.LongTensor()
+        chunks = _get_file_chunks(path, chunk_size)
+        buffer = _TokenBuffer(_get_compact_dtype(len(self)), capacity=os.path.getsize(path) // 4)
+
+        if num_workers > 1 and len(chunks) > 1:
+            with multiprocessing.Pool(
+                min(num_workers, len(chunks)), initializer=_init_encode_worker, initargs=(self,)
+            ) as pool:
+                encoded_chunks = pool.imap(_encode_file_chunk_in_worker, [(path, *chunk) for chunk in chunks])
+                for idx, encoded_chunk in enumerate(encoded_chunks):
+                    buffer.extend(encoded_chunk)
+
+                    if verbose:
+                        logger.debug(f"Completed chunk: {idx + 1}/{len(chunks)}")
+        else:
+            for idx, chunk in enumerate(chunks):
+                buffer.extend(_encode_file_chunk(self, path, *chunk))
+
+                if verbose:
+                    logger.debug(f"Completed chunk: {idx + 1}/{len(chunks)}")
+
+        return buffer.to_numpy()
+
+
+class _TokenBuffer:
+    """Growable buffer of tokens, which avoids re-copying the encoded prefix on every append."""
+
+    def __init__(self, dtype: np.dtype, capacity: Optional[int] = 1024) -> None:
+        self.dtype = dtype
+        self._array = np.empty((max(capacity, 1),), dtype=dtype)
+        self._size = 0
+
+    def extend(self, tokens: np.ndarray) -> None:
+        if self._size + len(tokens) > len(self._array):
+            new_array = np.empty((max(2 * len(self._array), self._size + len(tokens)),), dtype=self.dtype)
+            new_array[: self._size] = self._array[: self._size]
+            self._array = new_array
+
+        self._array[self._size : self._size + len(tokens)] = tokens
+        self._size += len(tokens)
+
+    def to_numpy(self) -> np.ndarray:
+        return self._array[: self._size]
+
+
+def _get_compact_dtype(vocab_size: int) -> np.dtype:
+    return np.dtype(np.uint16) if vocab_size <= np.iinfo(np.uint16).max + 1 else np.dtype(np.int32)
+
+
+def _to_numpy_dtype(dtype: torch.dtype) -> np.dtype:
+    return torch.empty((0,), dtype=dtype).numpy().dtype
+
+
+def _get_file_chunks(path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    # Splits the file into byte ranges that start and end at line breaks
+    file_size = os.path.getsize(path)
+    chunks, start = [], 0
+
+    with open(path, "rb") as f:
+        while start < file_size:
+            f.seek(min(start + chunk_size, file_size))
+            f.readline()
+
+            end = min(f.tell(), file_size)
+            chunks.append((start, end))
+            start = end
+
+    return chunks
+
+
+def _encode_file_chunk(
+    tokenizer: TokenizerBase, path: str, start: int, end: int, lines_per_batch: Optional[int] = 10000
+) -> np.ndarray:
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Lines are read with the same newline handling as `open(path, "r", encoding="utf-8")`
+    lines = list(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"))
+    dtype = _get_compact_dtype(len(tokenizer))
+
+    encoded = []
+    for i in range(0, len(lines), lines_per_batch):
+        encoded_lines = tokenizer.encode_lines(lines[i : i + lines_per_batch])
+        encoded.append(np.fromiter(chain.from_iterable(encoded_lines), dtype=dtype))
 
-        with open(path, "r", encoding="utf-8") as f:
-            for idx, line in enumerate(f):
-                # Converts to tensor.Tensor every 500k lines,
-                # otherwise Python list uses a lot of RAM
-                if idx > 0 and idx % 500000 == 0:
-                    tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
-                    encoded = []
+    return np.concatenate(encoded) if encoded else np.empty((0,), dtype=dtype)
 
-                if verbose and idx > 0 and idx % 500000 == 0:
-                    logger.debug(f"Completed line: {format(idx)}")
 
-                tokens = self.encode_text(line)
-                encoded.extend(tokens)
+def _init_encode_worker(tokenizer: TokenizerBase) -> None:
+    global _ENCODE_WORKER_TOKENIZER
+    _ENCODE_WORKER_TOKENIZER = tokenizer
 
-        if len(encoded) > 0:
-            tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
 
-        return tensor_encoded
+def _encode_file_chunk_in_worker(args: Tuple[str, int, int]) -> np.ndarray:
+    return _encode_file_chunk(_ENCODE_WORKER_TOKENIZER, *args)
@@ -138,6 +138,14 @@ class WordTokenizer(TokenizerBase):
 
         return toks
 
+    @overrides
+    def encode_lines(self, lines: List[str]) -> List[List[int]]:
+        # Avoids the per-token method calls of `encode_text`
+        get_idx, unk_idx = self.sym2idx.get, self.unk_idx
+        bos, eos = (self._bos, self._eos) if self.encode_special_tokens else ([], [])
+
+        return [[get_idx(sym, unk_idx) for sym in bos + self._tokenize_text(line) + eos] for line in lines]
+
     @overrides
     def decode_text(self, ids: List[int]) -> str:
         syms = self.ids_to_tokens(ids)
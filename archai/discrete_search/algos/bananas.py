@@ -20,6 +20,7 @@ from archai.discrete_search.api.search_space import (
 from archai.discrete_search.api.searcher import Searcher
 from archai.discrete_search.predictors.dnn_ensemble import PredictiveDNNEnsemble
 from archai.discrete_search.utils.multi_objective import get_non_dominated_sorting
+from archai.discrete_search.utils.mutation import mutate_parents
 
 logger = OrderedDictLogger(source=__name__)
 
@@ -49,6 +50,7 @@ class MoBananasSearch(Searcher):
         clear_evaluated_models: bool = True,
         save_pareto_weights: bool = False,
         seed: Optional[int] = 1,
+        append_search_state: Optional[bool] = False,
     ) -> None:
         """Initialize the multi-objective BANANAS.
 
@@ -68,6 +70,9 @@ class MoBananasSearch(Searcher):
                 of `ArchaiModel` after each iteration. Defaults to True
             save_pareto_model_weights: If `False`, saves the weights of the pareto models.
             seed: Random seed.
+            append_search_state: If `True`, saves the search state to `{output_dir}/search_state/` in an
+                append-only format instead of rewriting `search_state_*.csv` every iteration.
+                Defaults to False.
 
         """
 
@@ -100,6 +105,7 @@ class MoBananasSearch(Searcher):
         self.save_pareto_weights = save_pareto_weights
         self.seen_archs = set()
         self.seed = seed
+        self.append_search_state = append_search_state
         self.rng = np.random.RandomState(self.seed)
         self.surrogate_dataset = []
         self.search_state = SearchResults(search_space, search_objectives)
@@ -118,7 +124,7 @@ class MoBananasSearch(Searcher):
 
         """
 
-        encoded_archs = np.vstack([self.search_space.encode(m) for m in all_pop])
+        encoded_archs = self.search_space.encode_many(all_pop)
         target = np.array([self.search_state.all_evaluated_objs[obj] for obj in self.so.expensive_objectives]).T
 
         return encoded_archs, target
@@ -142,48 +148,47 @@ class MoBananasSearch(Searcher):
 
             _, valid_indices = self.so.validate_constraints(sample)
             valid_sample += [sample[i] for i in valid_indices]
+            nb_tries += 1
 
         return valid_sample[:num_models]
 
     def mutate_parents(
-        self, parents: List[ArchaiModel], mutations_per_parent: Optional[int] = 1, patience: Optional[int] = 30
+        self,
+        parents: List[ArchaiModel],
+        mutations_per_parent: Optional[int] = 1,
+        patience: Optional[int] = 30,
+        batch_size: Optional[int] = None,
     ) -> List[ArchaiModel]:
         """Mutate parents to generate new models.
 
+        Mutations are generated in batches and validated with a single constraint evaluation per batch.
+
         Args:
             parents: List of parent models.
             mutations_per_parent: Number of mutations to apply to each parent.
-            patience: Number of tries to sample a valid model.
+            patience: Maximum number of mutations tried for each parent.
+            batch_size: Number of mutations tried for each parent per batch.
+                If `None`, uses `mutations_per_parent`.
 
         Returns:
             List of mutated models.
 
         """
 
-        mutations = {}
-
-        for p in parents:
-            candidates = {}
-            nb_tries = 0
-
-            while len(candidates) < mutations_per_parent and nb_tries < patience:
-                mutated_model = self.search_space.mutate(p)
-                mutated_model.metadata["parent"] = p.archid
-
-                if not self.so.is_model_valid(mutated_model):
-                    continue
-
-                if mutated_model.archid not in self.seen_archs:
-                    candidates[mutated_model.archid] = mutated_model
-
-                nb_tries += 1
-
-            mutations.update(candidates)
+        mutations = mutate_parents(
+            parents,
+            self.search_space.mutate,
+            self.so,
+            mutations_per_parent=mutations_per_parent,
+            patience=patience,
+            batch_size=batch_size,
+            seen_archids=self.seen_archs,
+        )
 
         if len(mutations) == 0:
             logger.warn(f"No mutations found after {patience} tries for each one of the {len(parents)} parents.")
 
-        return list(mutations.values())
+        return mutations
 
     def predict_expensive_objectives(self, archs: List[ArchaiModel]) -> Dict[str, MeanVar]:
         """Predict expensive objectives for `archs` using surrogate model.
@@ -196,7 +201,7 @@ class MoBananasSearch(Searcher):
 
         """
 
-        encoded_archs = np.vstack([self.search_space.encode(m) for m in archs])
+        encoded_archs = self.search_space.encode_many(archs)
         pred_results = self.surrogate_model.predict(encoded_archs)
 
         return {
@@ -306,6 +311,9 @@ class MoBananasSearch(Searcher):
 
             # Save plots and reports
             self.search_state.save_all_2d_pareto_evolution_plots(self.output_dir)
-            self.search_state.save_search_state(self.output_dir / f"search_state_{i}.csv")
+            if self.append_search_state:
+                self.search_state.append_search_state(self.output_dir / "search_state")
+            else:
+                self.search_state.save_search_state(self.output_dir / f"search_state_{i}.csv")
 
         return self.search_state
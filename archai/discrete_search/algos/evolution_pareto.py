@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import List, Optional
 
 from overrides import overrides
-from tqdm import tqdm
 
 from archai.common.ordered_dict_logger import OrderedDictLogger
 from archai.discrete_search.api.archai_model import ArchaiModel
@@ -14,6 +13,10 @@ from archai.discrete_search.api.search_objectives import SearchObjectives
 from archai.discrete_search.api.search_results import SearchResults
 from archai.discrete_search.api.search_space import EvolutionarySearchSpace
 from archai.discrete_search.api.searcher import Searcher
+from archai.discrete_search.utils.mutation import (
+    generate_valid_candidates,
+    mutate_parents,
+)
 
 logger = OrderedDictLogger(source=__name__)
 
@@ -44,6 +47,7 @@ class EvolutionParetoSearch(Searcher):
         clear_evaluated_models: bool = True,
         save_pareto_model_weights: bool = True,
         seed: Optional[int] = 1,
+        append_search_state: Optional[bool] = False,
     ):
         """Initialize the evolutionary search algorithm.
 
@@ -63,6 +67,9 @@ class EvolutionParetoSearch(Searcher):
                 of `ArchaiModel` after each iteration. Defaults to True
             save_pareto_model_weights: If `True`, saves the weights of the pareto models. Defaults to True
             seed: Random seed.
+            append_search_state: If `True`, saves the search state to `{output_dir}/search_state/` in an
+                append-only format instead of rewriting `search_state_*.csv` every iteration.
+                Defaults to False.
 
         """
 
@@ -90,6 +97,7 @@ class EvolutionParetoSearch(Searcher):
         self.save_pareto_model_weights = save_pareto_model_weights
         self.search_state = SearchResults(search_space, self.so)
         self.seed = seed
+        self.append_search_state = append_search_state
         self.rng = random.Random(seed)
         self.seen_archs = set()
         self.num_sampled_archs = 0
@@ -118,44 +126,47 @@ class EvolutionParetoSearch(Searcher):
 
             _, valid_indices = self.so.validate_constraints(sample)
             valid_sample += [sample[i] for i in valid_indices]
+            nb_tries += 1
 
         return valid_sample[:num_models]
 
     def mutate_parents(
-        self, parents: List[ArchaiModel], mutations_per_parent: Optional[int] = 1, patience: Optional[int] = 20
+        self,
+        parents: List[ArchaiModel],
+        mutations_per_parent: Optional[int] = 1,
+        patience: Optional[int] = 20,
+        batch_size: Optional[int] = None,
     ) -> List[ArchaiModel]:
         """Mutate parents to generate new models.
 
+        Mutations are generated in batches and validated with a single constraint evaluation per batch.
+
         Args:
             parents: List of parent models.
             mutations_per_parent: Number of mutations to apply to each parent.
-            patience: Number of tries to sample a valid model.
+            patience: Maximum number of mutations tried for each parent.
+            batch_size: Number of mutations tried for each parent per batch.
+                If `None`, uses `mutations_per_parent`.
 
         Returns:
             List of mutated models.
 
         """
 
-        mutations = {}
-
-        for p in tqdm(parents, desc="Mutating parents"):
-            candidates = {}
-            nb_tries = 0
+        mutations = mutate_parents(
+            parents,
+            self.search_space.mutate,
+            self.so,
+            mutations_per_parent=mutations_per_parent,
+            patience=patience,
+            batch_size=batch_size,
+            seen_archids=self.seen_archs,
+        )
 
-            while len(candidates) < mutations_per_parent and nb_tries < patience:
-                mutated_model = self.search_space.mutate(p)
-                mutated_model.metadata["parent"] = p.archid
+        for mutated_model in mutations:
+            mutated_model.metadata["generation"] = self.iter_num
 
-                if not self.so.is_model_valid(mutated_model):
-                    continue
-
-                if mutated_model.archid not in self.seen_archs:
-                    mutated_model.metadata["generation"] = self.iter_num
-                    candidates[mutated_model.archid] = mutated_model
-                nb_tries += 1
-            mutations.update(candidates)
-
-        return list(mutations.values())
+        return mutations
 
     def crossover_parents(
         self, parents: List[ArchaiModel], num_crossovers: Optional[int] = 1, patience: Optional[int] = 30
@@ -165,7 +176,7 @@ class EvolutionParetoSearch(Searcher):
         Args:
             parents: List of parent models.
             num_crossovers: Number of crossovers to apply.
-            patience: Number of tries to sample a valid model.
+            patience: Maximum number of crossovers tried for each pair of parents.
 
         Returns:
             List of crossovered models.
@@ -173,24 +184,23 @@ class EvolutionParetoSearch(Searcher):
         """
 
         # Randomly samples k distinct pairs from `parents`
-        children, children_ids = [], set()
+        children = []
 
         if len(parents) >= 2:
             pairs = [random.sample(parents, 2) for _ in range(num_crossovers)]
-            for p1, p2 in pairs:
-                child = self.search_space.crossover([p1, p2])
-                nb_tries = 0
-
-                while not self.so.is_model_valid(child) and nb_tries < patience:
-                    child = self.search_space.crossover([p1, p2])
-                    nb_tries += 1
+            pair_children = generate_valid_candidates(
+                [lambda p1=p1, p2=p2: self.search_space.crossover([p1, p2]) for p1, p2 in pairs],
+                self.so,
+                num_candidates=1,
+                patience=patience,
+                seen_archids=self.seen_archs,
+            )
 
-                if child and self.so.is_model_valid(child):
-                    if child.archid not in children_ids and child.archid not in self.seen_archs:
-                        child.metadata["generation"] = self.iter_num
-                        child.metadata["parents"] = f"{p1.archid},{p2.archid}"
-                        children.append(child)
-                        children_ids.add(child.archid)
+            for (p1, p2), pair_child in zip(pairs, pair_children):
+                for child in pair_child:
+                    child.metadata["generation"] = self.iter_num
+                    child.metadata["parents"] = f"{p1.archid},{p2.archid}"
+                    children.append(child)
 
         return children
 
@@ -261,7 +271,10 @@ class EvolutionParetoSearch(Searcher):
 
             # Saves search iteration results
             # NOTE: There is a dependency on these file naming schemas on archai.common.notebook_helper
-            self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
+            if self.append_search_state:
+                self.search_state.append_search_state(self.output_dir / "search_state")
+            else:
+                self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
             self.search_state.save_pareto_frontier_models(
                 str(self.output_dir / f"pareto_models_iter_{self.iter_num}"),
                 save_weights=self.save_pareto_model_weights
@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import List, Optional
 
 from overrides import overrides
-from tqdm import tqdm
 
 from archai.common.ordered_dict_logger import OrderedDictLogger
 from archai.discrete_search.api.archai_model import ArchaiModel
@@ -14,6 +13,7 @@ from archai.discrete_search.api.search_objectives import SearchObjectives
 from archai.discrete_search.api.search_results import SearchResults
 from archai.discrete_search.api.search_space import EvolutionarySearchSpace
 from archai.discrete_search.api.searcher import Searcher
+from archai.discrete_search.utils.mutation import mutate_parents
 
 logger = OrderedDictLogger(source=__name__)
 
@@ -31,6 +31,7 @@ class LocalSearch(Searcher):
         clear_evaluated_models: bool = True,
         save_pareto_model_weights: bool = True,
         seed: Optional[int] = 1,
+        append_search_state: Optional[bool] = False,
     ):
         """Local search algorithm. In each iteration, the algorithm generates a new population by
         mutating the current Pareto frontier. The process is repeated until `num_iters` is reached.
@@ -48,6 +49,9 @@ class LocalSearch(Searcher):
                 of `ArchaiModel` after each iteration. Defaults to True.
             save_pareto_model_weights: If `True`, saves the weights of the pareto models.
             seed (int, optional): Random seed. Defaults to 1.
+            append_search_state: If `True`, saves the search state to `{output_dir}/search_state/` in an
+                append-only format instead of rewriting `search_state_*.csv` every iteration.
+                Defaults to False.
         """
         assert isinstance(
             search_space, EvolutionarySearchSpace
@@ -70,6 +74,7 @@ class LocalSearch(Searcher):
         self.save_pareto_model_weights = save_pareto_model_weights
         self.search_state = SearchResults(search_space, self.so)
         self.seed = seed
+        self.append_search_state = append_search_state
         self.rng = random.Random(seed)
         self.seen_archs = set()
         self.num_sampled_archs = 0
@@ -96,44 +101,47 @@ class LocalSearch(Searcher):
 
             _, valid_indices = self.so.validate_constraints(sample)
             valid_sample += [sample[i] for i in valid_indices]
+            nb_tries += 1
 
         return valid_sample[:num_models]
 
     def mutate_parents(
-        self, parents: List[ArchaiModel], mutations_per_parent: Optional[int] = 1, patience: Optional[int] = 20
+        self,
+        parents: List[ArchaiModel],
+        mutations_per_parent: Optional[int] = 1,
+        patience: Optional[int] = 20,
+        batch_size: Optional[int] = None,
     ) -> List[ArchaiModel]:
         """Mutate parents to generate new models.
 
+        Mutations are generated in batches and validated with a single constraint evaluation per batch.
+
         Args:
             parents: List of parent models.
             mutations_per_parent: Number of mutations to apply to each parent.
-            patience: Number of tries to sample a valid model.
+            patience: Maximum number of mutations tried for each parent.
+            batch_size: Number of mutations tried for each parent per batch.
+                If `None`, uses `mutations_per_parent`.
 
         Returns:
             List of mutated models.
 
         """
 
-        mutations = {}
-
-        for p in tqdm(parents, desc="Mutating parents"):
-            candidates = {}
-            nb_tries = 0
-
-            while len(candidates) < mutations_per_parent and nb_tries < patience:
-                mutated_model = self.search_space.mutate(p)
-                mutated_model.metadata["parent"] = p.archid
-
-                if not self.so.is_model_valid(mutated_model):
-                    continue
+        mutations = mutate_parents(
+            parents,
+            self.search_space.mutate,
+            self.so,
+            mutations_per_parent=mutations_per_parent,
+            patience=patience,
+            batch_size=batch_size,
+            seen_archids=self.seen_archs,
+        )
 
-                if mutated_model.archid not in self.seen_archs:
-                    mutated_model.metadata["generation"] = self.iter_num
-                    candidates[mutated_model.archid] = mutated_model
-                nb_tries += 1
-            mutations.update(candidates)
+        for mutated_model in mutations:
+            mutated_model.metadata["generation"] = self.iter_num
 
-        return list(mutations.values())
+        return mutations
 
     @overrides
     def search(self) -> SearchResults:
@@ -178,7 +186,10 @@ class LocalSearch(Searcher):
             logger.info(f"Found {len(pareto)} members.")
 
             # Saves search iteration results
-            self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
+            if self.append_search_state:
+                self.search_state.append_search_state(self.output_dir / "search_state")
+            else:
+                self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
             self.search_state.save_pareto_frontier_models(
                 str(self.output_dir / f"pareto_models_iter_{self.iter_num}"), 
                 save_weights=self.save_pareto_model_weights
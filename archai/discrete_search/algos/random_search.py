@@ -35,6 +35,7 @@ class RandomSearch(Searcher):
         clear_evaluated_models: Optional[bool] = True,
         save_pareto_model_weights: bool = True,
         seed: Optional[int] = 1,
+        append_search_state: Optional[bool] = False,
     ):
         """Initialize the random search algorithm.
 
@@ -48,6 +49,9 @@ class RandomSearch(Searcher):
                 of `ArchaiModel` after each iteration. Defaults to True.
             save_pareto_model_weights: If `True`, saves the weights of the pareto models. Defaults to True.
             seed: Random seed.
+            append_search_state: If `True`, saves the search state to `{output_dir}/search_state/` in an
+                append-only format instead of rewriting `search_state_*.csv` every iteration.
+                Defaults to False.
         """
 
         assert isinstance(
@@ -69,6 +73,7 @@ class RandomSearch(Searcher):
         self.save_pareto_model_weights = save_pareto_model_weights
         self.search_state = SearchResults(search_space, self.so)
         self.seed = seed
+        self.append_search_state = append_search_state
         self.rng = random.Random(seed)
         self.seen_archs = set()
         self.num_sampled_archs = 0
@@ -122,7 +127,10 @@ class RandomSearch(Searcher):
             logger.info(f"Found {len(pareto)} members.")
 
             # Saves search iteration results
-            self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
+            if self.append_search_state:
+                self.search_state.append_search_state(self.output_dir / "search_state")
+            else:
+                self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
             self.search_state.save_pareto_frontier_models(
                 str(self.output_dir / f"pareto_models_iter_{self.iter_num}"),
                 save_weights=self.save_pareto_model_weights
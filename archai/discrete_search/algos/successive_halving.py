@@ -32,6 +32,7 @@ class SuccessiveHalvingSearch(Searcher):
         init_budget: Optional[float] = 1.0,
         budget_multiplier: Optional[float] = 2.0,
         seed: Optional[int] = 1,
+        append_search_state: Optional[bool] = False,
     ) -> None:
         """Initialize the Successive Halving.
 
@@ -45,6 +46,9 @@ class SuccessiveHalvingSearch(Searcher):
             init_budget: Initial budget.
             budget_multiplier: Budget multiplier.
             seed: Random seed.
+            append_search_state: If `True`, saves the search state to `{output_dir}/search_state/` in an
+                append-only format instead of rewriting `search_state_*.csv` every iteration.
+                Defaults to False.
 
         """
 
@@ -66,6 +70,7 @@ class SuccessiveHalvingSearch(Searcher):
         self.iter_num = 0
         self.num_sampled_models = 0
         self.seed = seed
+        self.append_search_state = append_search_state
         self.search_state = SearchResults(search_space, objectives)
         self.rng = random.Random(seed)
 
@@ -103,7 +108,10 @@ class SuccessiveHalvingSearch(Searcher):
             for model in selected_models:
                 self.search_space.save_arch(model, str(models_dir / f"{model.archid}"))
 
-            self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
+            if self.append_search_state:
+                self.search_state.append_search_state(self.output_dir / "search_state")
+            else:
+                self.search_state.save_search_state(str(self.output_dir / f"search_state_{self.iter_num}.csv"))
             self.search_state.save_all_2d_pareto_evolution_plots(self.output_dir)
 
             # Keeps only the best `1/self.budget_multiplier` NDS frontiers
@@ -1,13 +1,19 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 
 class ArchaiModel:
     """Model wrapper with an architecture identifier and an optional metadata dictionary."""
 
-    def __init__(self, arch: Any, archid: str, metadata: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        arch: Any,
+        archid: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        arch_builder: Optional[Callable[[], Any]] = None,
+    ):
         """Initialize the Archai-based model.
 
         Args:
@@ -16,19 +22,43 @@ class ArchaiModel:
                 of the same architecture, so architecture hashes are prefered. `archid` should
                 only identify neural network architectures and not model weight information.
             metadata: Optional model metadata dictionary.
+            arch_builder: Optional function that builds the model object. If `arch` is `None`,
+                the model object is lazily built on the first access to `arch`. Evaluators that
+                only rely on `archid` or `metadata` never build the model object.
 
         """
 
-        self.arch = arch
+        self._arch = arch
+        self.arch_builder = arch_builder
         self.archid = archid
         self.metadata = metadata or {}
 
     def __repr__(self) -> str:
-        return f"ArchaiModel(\n\tarchid={self.archid}, \n\t" f"metadata={self.metadata}, \n\tarch={self.arch}\n)"
+        arch = self._arch if self.is_built else "<not built>"
+        return f"ArchaiModel(\n\tarchid={self.archid}, \n\t" f"metadata={self.metadata}, \n\tarch={arch}\n)"
 
     def __str__(self) -> str:
         return repr(self)
 
+    @property
+    def arch(self) -> Any:
+        """Model object, which is built on the first access if an `arch_builder` was provided."""
+
+        if self._arch is None and self.arch_builder is not None:
+            self._arch = self.arch_builder()
+
+        return self._arch
+
+    @arch.setter
+    def arch(self, arch: Any) -> None:
+        self._arch = arch
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the model object is available without calling `arch_builder`."""
+
+        return self._arch is not None or self.arch_builder is None
+
     def clear(self) -> None:
         """Clear architecture from memory.
 
@@ -37,4 +67,5 @@ class ArchaiModel:
 
         """
 
-        self.arch = None
+        self._arch = None
+        self.arch_builder = None
@@ -12,6 +12,10 @@ from archai.discrete_search.api.model_evaluator import (
     AsyncModelEvaluator,
     ModelEvaluator,
 )
+from archai.discrete_search.utils.objective_cache import (
+    InMemoryObjectiveCache,
+    ObjectiveCache,
+)
 
 
 class SearchConstraint:
@@ -33,7 +37,9 @@ class SearchObjective:
 class SearchObjectives:
     """Search objectives and constraints."""
 
-    def __init__(self, cache_objective_evaluation: Optional[bool] = True) -> None:
+    def __init__(
+        self, cache_objective_evaluation: Optional[bool] = True, cache: Optional[ObjectiveCache] = None
+    ) -> None:
         """Create, evaluate and cache search objectives and constraints for search algorithms.
 
         Besides objectives, this class also supports registering search constraints,
@@ -54,7 +60,7 @@ class SearchObjectives:
         self._extra_constraints = {}
 
         # Cache key: (obj_name, archid, budget)
-        self._cache: Dict[Tuple[str, str, Optional[float]], Optional[float]] = {}
+        self._cache = cache if cache is not None else InMemoryObjectiveCache()
 
     @property
     def objective_names(self) -> List[str]:
@@ -170,10 +176,9 @@ class SearchObjectives:
 
         # Initializes evaluation results with cached results
         eval_results = {
-            obj_name: [
-                self._cache.get((obj_name, model.archid, budget))
-                for model, budget in zip(models, budgets[obj_name])
-            ]
+            obj_name: self._cache.get_many(
+                [(obj_name, model.archid, budget) for model, budget in zip(models, budgets[obj_name])]
+            )
             for obj_name in objs
         }
 
@@ -222,17 +227,15 @@ class SearchObjectives:
             for result_i, eval_i in enumerate(eval_indices[obj_name]):
                 eval_results[obj_name][eval_i] = results[result_i]
 
-        # Updates cache
+        # Updates cache with a single batched write
         if self._cache_objective_evaluation:
-            for obj_name in objs:
-                for i in eval_indices[obj_name]:
-                    cache_tuple = (
-                        obj_name,
-                        models[i].archid,
-                        budgets[obj_name][i],
-                    )
-
-                    self._cache[cache_tuple] = eval_results[obj_name][i]
+            self._cache.update(
+                {
+                    (obj_name, models[i].archid, budgets[obj_name][i]): eval_results[obj_name][i]
+                    for obj_name in objs
+                    for i in eval_indices[obj_name]
+                }
+            )
 
         assert len(set(len(r) for r in eval_results.values())) == 1
 
@@ -368,18 +371,29 @@ class SearchObjectives:
         """
 
         with open(file_path, "w", encoding="utf-8") as f:
-            yaml.dump(self._cache, f)
+            yaml.dump(self._cache.to_dict(), f)
 
     def load_cache(self, file_path: str) -> None:
         """Load the state of the `SearchObjectives` object from a YAML file.
 
+        Entries are loaded into the current cache backend, replacing its contents.
+
         Args:
             file_path: Path to YAML file.
 
         """
 
         with open(file_path, "r", encoding="utf-8") as f:
-            self._cache = yaml.load(f)
+            entries = yaml.load(f, Loader=yaml.Loader)
+
+        self._cache.clear()
+        self._cache.update(entries or {})
+
+    @property
+    def cache(self) -> ObjectiveCache:
+        """Return the objective evaluation cache."""
+
+        return self._cache
 
     def lookup_cache(self, obj_name: str, arch_id: str, budget: Optional[int]) -> Optional[float]:
         """Look up the cache for a specific objective, architecture and budget.
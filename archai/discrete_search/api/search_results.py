@@ -15,11 +15,52 @@ from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.search_objectives import SearchObjectives
 from archai.discrete_search.api.search_space import DiscreteSearchSpace
 from archai.discrete_search.utils.multi_objective import (
-    _find_pareto_frontier_points,
+    ParetoArchive,
     get_pareto_frontier,
 )
 
 
+class _GrowableColumn:
+    """Preallocated NumPy column that grows geometrically when appending values."""
+
+    def __init__(self, dtype: Any, fill_value: Optional[Any] = None, size: Optional[int] = 0) -> None:
+        self._data = np.empty(max(size, 1024), dtype=dtype)
+        self._size = 0
+
+        # Backfills rows that were added before the column existed
+        if size > 0:
+            self.extend(np.full(size, fill_value, dtype=dtype))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, values: Any) -> None:
+        if self._data.dtype == object:
+            # Avoids NumPy converting nested sequences into multi-dimensional arrays
+            object_values = np.empty(len(values), dtype=object)
+            for i, value in enumerate(values):
+                object_values[i] = value
+
+            values = object_values
+
+        values = np.asarray(values)
+        new_size = self._size + len(values)
+
+        if new_size > len(self._data):
+            data = np.empty(max(new_size, 2 * len(self._data)), dtype=self._data.dtype)
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+
+        self._data[self._size : new_size] = values
+        self._size = new_size
+
+    def view(self) -> np.ndarray:
+        view = self._data[: self._size]
+        view.flags.writeable = False
+
+        return view
+
+
 class SearchResults:
     """Discrete search results.
 
@@ -42,17 +83,35 @@ class SearchResults:
 
         self.iteration_num = 0
         self.init_time = time()
-        self.search_walltimes = []
         self.results = []
 
+        # Search state is also stored in append-only columns (one row per evaluated model),
+        # so accessing the whole search history does not require walking through `results`
+        self._models = []
+        self._columns: Dict[str, _GrowableColumn] = {
+            "archid": _GrowableColumn(object),
+            "iteration_num": _GrowableColumn(np.int64),
+            "search_walltime_hours": _GrowableColumn(np.float64),
+        }
+        self._num_saved_iterations = 0
+
+        # Non-dominated archives are updated with each iteration results, so pareto-frontier
+        # queries do not need to go through the whole search history
+        self._iteration_offsets = [0]
+        self._pareto_archive = ParetoArchive()
+        self._pareto_2d_archives: Dict[Tuple[str, str], ParetoArchive] = {}
+
     @property
     def all_evaluated_objs(self) -> Dict[str, np.array]:
-        """Return all evaluated objectives."""
+        """Return all evaluated objectives (read-only arrays)."""
 
-        return {
-            obj_name: np.array([r for iter_results in self.results for r in iter_results[obj_name]], dtype=np.float32)
-            for obj_name in self.objectives.objectives
-        }
+        return {obj_name: self._columns[obj_name].view() for obj_name in self.objectives.objectives}
+
+    @property
+    def search_walltimes(self) -> np.ndarray:
+        """Return the search duration (in hours) when each model was added."""
+
+        return self._columns["search_walltime_hours"].view()
 
     def add_iteration_results(
         self,
@@ -89,10 +148,65 @@ class SearchResults:
             }
         )
 
+        self._models.extend(models)
+        self._columns["archid"].extend([m.archid for m in models])
+        self._columns["iteration_num"].extend(np.full(len(models), self.iteration_num))
+
         # Adds current search duration in hours
-        self.search_walltimes += [(time() - self.init_time) / 3600] * len(models)
+        self._columns["search_walltime_hours"].extend(np.full(len(models), (time() - self.init_time) / 3600))
+
+        num_rows = self._iteration_offsets[-1]
+        for col_name, values in evaluation_results.items():
+            if col_name not in self._columns:
+                is_objective = col_name in self.objectives.objectives
+                self._columns[col_name] = _GrowableColumn(
+                    np.float64 if is_objective else object, fill_value=np.nan, size=num_rows
+                )
+
+            self._columns[col_name].extend(values)
+
+        # Fills columns that are missing from the current iteration
+        for col_name, column in self._columns.items():
+            if len(column) < num_rows + len(models):
+                column.extend(np.full(len(models), np.nan, dtype=object))
+
         self.iteration_num += 1
 
+        self._iteration_offsets.append(self._iteration_offsets[-1] + len(models))
+        self._update_pareto_archive(self._pareto_archive, self.objectives.objective_names, self.iteration_num - 1)
+
+        for objective_names, archive in self._pareto_2d_archives.items():
+            self._update_pareto_archive(archive, objective_names, self.iteration_num - 1)
+
+    def _update_pareto_archive(self, archive: ParetoArchive, objective_names: List[str], iteration: int) -> None:
+        indices = np.arange(self._iteration_offsets[iteration], self._iteration_offsets[iteration + 1])
+
+        # Inverts maximization objectives
+        points = np.vstack(
+            [
+                -self._columns[obj_name].view()[indices]
+                if self.objectives.objectives[obj_name].higher_is_better
+                else self._columns[obj_name].view()[indices]
+                for obj_name in objective_names
+            ]
+        ).T
+
+        archive.update(points, indices)
+
+    def _get_2d_pareto_archive(self, objective_names: Tuple[str, str]) -> ParetoArchive:
+        objective_names = tuple(objective_names)
+
+        if objective_names not in self._pareto_2d_archives:
+            archive = ParetoArchive()
+
+            # Replays previous iterations once, next ones are added by `add_iteration_results`
+            for iteration in range(self.iteration_num):
+                self._update_pareto_archive(archive, objective_names, iteration)
+
+            self._pareto_2d_archives[objective_names] = archive
+
+        return self._pareto_2d_archives[objective_names]
+
     def get_pareto_frontier(
         self, start_iteration: Optional[int] = 0, end_iteration: Optional[int] = None
     ) -> Dict[str, Any]:
@@ -111,18 +225,26 @@ class SearchResults:
 
         end_iteration = end_iteration or self.iteration_num
 
-        all_models = [model for it in range(start_iteration, end_iteration) for model in self.results[it]["models"]]
+        # Frontiers starting at the first iteration are read from the incremental archive
+        if start_iteration == 0 and end_iteration > 0:
+            indices = self._pareto_archive.history[end_iteration - 1]
+
+            return {
+                "models": [self._models[idx] for idx in indices],
+                "evaluation_results": {
+                    obj_name: self._columns[obj_name].view()[indices] for obj_name in self.objectives.objective_names
+                },
+                "indices": indices,
+                "iteration_nums": self._columns["iteration_num"].view()[indices],
+            }
+
+        start, end = self._iteration_offsets[start_iteration], self._iteration_offsets[end_iteration]
 
+        all_models = self._models[start:end]
         all_results = {
-            obj_name: np.concatenate(
-                [self.results[it][obj_name] for it in range(start_iteration, end_iteration)], axis=0
-            )
-            for obj_name in self.objectives.objective_names
+            obj_name: self._columns[obj_name].view()[start:end] for obj_name in self.objectives.objective_names
         }
-
-        all_iteration_nums = np.array(
-            [it for it in range(start_iteration, end_iteration) for _ in range(len(self.results[it]["models"]))]
-        )
+        all_iteration_nums = self._columns["iteration_num"].view()[start:end]
 
         pareto_frontier = get_pareto_frontier(all_models, all_results, self.objectives)
         pareto_frontier.update({"iteration_nums": all_iteration_nums[pareto_frontier["indices"]]})
@@ -137,17 +259,23 @@ class SearchResults:
 
         """
 
-        state_df = pd.concat(
-            [pd.DataFrame(it_results).assign(iteration_num=it) for it, it_results in enumerate(self.results)], axis=0
-        ).reset_index(drop=True)
-        state_df["search_walltime_hours"] = self.search_walltimes
-
-        pareto_frontier = self.get_pareto_frontier()
+        state_df = self._get_state_df(0, self._iteration_offsets[-1])
 
         state_df["is_pareto"] = False
-        state_df.loc[pareto_frontier["indices"], "is_pareto"] = True
+        if self.iteration_num > 0:
+            state_df.loc[self._pareto_archive.indices, "is_pareto"] = True
+
+        return state_df
+
+    def _get_state_df(self, start: int, end: int) -> pd.DataFrame:
+        # Keeps the same column order as the search state file
+        col_names = [c for c in self._columns if c not in {"iteration_num", "search_walltime_hours"}]
+        col_names += ["iteration_num", "search_walltime_hours"]
 
-        return state_df.drop(["models"], axis=1)
+        state_df = pd.DataFrame({c: self._columns[c].view()[start:end] for c in col_names})
+        state_df.index = pd.RangeIndex(start, end)
+
+        return state_df
 
     def save_search_state(self, file_path: Union[str, Path]) -> None:
         """Save the search state to a .csv file.
@@ -160,6 +288,55 @@ class SearchResults:
         state_df = self.get_search_state_df()
         state_df.to_csv(file_path, index=False)
 
+    def append_search_state(self, directory: Union[str, Path]) -> None:
+        """Save the search state to a directory using an append-only format.
+
+        Each iteration not saved yet is written to its own `iteration_{n}.csv` chunk,
+        and the pareto-frontier indices are written to `pareto.csv`, so the cost of
+        each call only depends on the number of new rows and the pareto-frontier size.
+        Use `SearchResults.load_search_state()` to load the search state data frame.
+
+        Args:
+            directory: Directory to save the search state.
+
+        """
+
+        path = Path(directory)
+        path.mkdir(exist_ok=True, parents=True)
+
+        for it in range(self._num_saved_iterations, self.iteration_num):
+            state_df = self._get_state_df(self._iteration_offsets[it], self._iteration_offsets[it + 1])
+            state_df.to_csv(path / f"iteration_{it}.csv", index=False)
+
+        self._num_saved_iterations = self.iteration_num
+
+        pareto_df = pd.DataFrame({"index": self._pareto_archive.indices})
+        pareto_df.to_csv(path / "pareto.csv", index=False)
+
+    @staticmethod
+    def load_search_state(directory: Union[str, Path]) -> pd.DataFrame:
+        """Load a search state saved with `SearchResults.append_search_state()`.
+
+        Args:
+            directory: Directory with the search state.
+
+        Returns:
+            Search state data frame.
+
+        """
+
+        path = Path(directory)
+        chunk_paths = sorted(path.glob("iteration_*.csv"), key=lambda x: int(x.stem.split("_")[-1]))
+        chunk_dfs = [pd.read_csv(p, dtype={"archid": str}, float_precision="round_trip") for p in chunk_paths]
+
+        # Columns are only added throughout the search, so the last chunk has all of them
+        state_df = pd.concat(chunk_dfs, axis=0).reset_index(drop=True)[chunk_dfs[-1].columns]
+
+        state_df["is_pareto"] = False
+        state_df.loc[pd.read_csv(path / "pareto.csv")["index"].values, "is_pareto"] = True
+
+        return state_df
+
     def save_pareto_frontier_models(self, directory: str, save_weights: Optional[bool] = False) -> None:
         """Save the pareto-frontier models to a directory.
 
@@ -193,31 +370,25 @@ class SearchResults:
         """
 
         obj_x, obj_y = objective_names
-        status_df = self.get_search_state_df().copy()
+        archive = self._get_2d_pareto_archive((obj_x, obj_y))
 
         fig, ax = plt.subplots(figsize=figsize)
         fig.patch.set_facecolor('white')
         status_range = range(0, self.iteration_num + 1)
 
-        # Transforms dimensions to be decreasing if necessary
-        max_x, max_y = status_df[obj_x].max(), status_df[obj_y].max()
-        status_df["x"], status_df["y"] = status_df[obj_x], status_df[obj_y]
-
-        if self.objectives.objectives[obj_x].higher_is_better:
-            status_df["x"] = max_x - status_df["x"]
-
-        if self.objectives.objectives[obj_y].higher_is_better:
-            status_df["y"] = max_y - status_df["y"]
-
         colors = plt.cm.plasma(np.linspace(0, 1, self.iteration_num + 1))
         sm = plt.cm.ScalarMappable(cmap=plt.cm.plasma, norm=plt.Normalize(vmin=0, vmax=self.iteration_num + 1))
 
         for s in status_range:
-            generation_df = status_df.query(f"iteration_num <= {s}").copy()
+            # Pareto-frontier of iterations `<= s`
+            indices = archive.history[min(s, len(archive.history) - 1)] if archive.history else []
+
+            pareto_df = pd.DataFrame(
+                {obj_x: self._columns[obj_x].view()[indices], obj_y: self._columns[obj_y].view()[indices]}
+            )
 
-            points = generation_df[["x", "y"]].values
-            pareto_df = generation_df.iloc[_find_pareto_frontier_points(points)].copy()
-            pareto_df = pareto_df.sort_values("x")
+            # Sorts by `x` in the decreasing direction if necessary
+            pareto_df = pareto_df.sort_values(obj_x, ascending=not self.objectives.objectives[obj_x].higher_is_better)
 
             ax.step(pareto_df[obj_x], pareto_df[obj_y], where="post", color=colors[s])
             ax.plot(pareto_df[obj_x], pareto_df[obj_y], "o", color=colors[s])
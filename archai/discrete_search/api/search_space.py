@@ -178,3 +178,18 @@ class BayesOptSearchSpace(DiscreteSearchSpace, EnforceOverrides):
         """
 
         pass
+
+    def encode_many(self, archs: List[ArchaiModel]) -> np.ndarray:
+        """Encode a list of architectures into a matrix of fixed-length vector representations.
+
+        Search spaces that can encode architectures in batch should override this method.
+
+        Args:
+            archs: Models from the search space.
+
+        Returns:
+            Array with the vector representation of each architecture in `archs`.
+
+        """
+
+        return np.vstack([self.encode(arch) for arch in archs])
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.evaluators.local_parallel import LocalParallelEvaluator
 from archai.discrete_search.evaluators.onnx_model import AvgOnnxLatency
 from archai.discrete_search.evaluators.progressive_training import (
     ProgressiveTraining, RayProgressiveTraining
@@ -15,5 +16,5 @@ __all__ = [
     'EvaluationFunction', 'AvgOnnxLatency', 'ProgressiveTraining', 
     'RayProgressiveTraining', 'TorchFlops', 'TorchLatency', 
     'TorchPeakCpuMemory', 'TorchPeakCudaMemory',
-    'TorchNumParameters', 'RayParallelEvaluator'
+    'TorchNumParameters', 'RayParallelEvaluator', 'LocalParallelEvaluator'
 ]
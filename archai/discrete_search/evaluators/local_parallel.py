@@ -0,0 +1,134 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import multiprocessing
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Dict, List, Optional, Union
+
+from overrides import overrides
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.model_evaluator import (
+    AsyncModelEvaluator,
+    ModelEvaluator,
+)
+
+
+class LocalParallelEvaluator(AsyncModelEvaluator):
+    """Wraps a `ModelEvaluator` object into an `AsyncModelEvaluator` with parallel execution
+    using a local pool of threads or processes.
+
+    Differently from `RayParallelEvaluator`, it does not require a Ray cluster, which makes it
+    suitable to fan out cheap synchronous evaluators (e.g., `TorchNumParameters`, `TorchFlops`,
+    `AvgOnnxLatency`) across the cores of a single machine. Results are returned in the same
+    order as the architectures were sent.
+
+    Thread pools are preferable for thread-safe evaluators that release the GIL (e.g., ONNX Runtime
+    sessions and most PyTorch operators), while process pools avoid the GIL entirely at the cost of
+    pickling the evaluator and each architecture. Evaluators that rely on global state, such as the
+    PyTorch profiler-based `TorchFlops` and `TorchLatency`, must use a process pool.
+
+    `LocalParallelEvaluator` expects a stateless objective function as input, meaning that any
+    `ModelEvaluator.evaluate(arch, ...)` will not alter the state of `obj` or `arch` in any way.
+
+    Examples:
+        >>> search_objectives.add_objective(
+        >>>     "FLOPs",
+        >>>     LocalParallelEvaluator(TorchFlops(forward_args=sample_input), num_workers=8, use_processes=True),
+        >>>     higher_is_better=False,
+        >>>     compute_intensive=False,
+        >>>     constraint=(0, 1e9),
+        >>> )
+
+    """
+
+    def __init__(
+        self,
+        obj: ModelEvaluator,
+        num_workers: Optional[int] = None,
+        use_processes: Optional[bool] = False,
+        timeout: Optional[float] = None,
+        mp_start_method: Optional[str] = None,
+    ) -> None:
+        """Initialize the evaluator.
+
+        Args:
+            obj: A `ModelEvaluator` object.
+            num_workers: Number of workers. If `None`, uses the number of CPUs.
+            use_processes: Whether to use a process pool instead of a thread pool.
+            timeout: Timeout for receiving results. If `None`, waits indefinitely for results.
+                If timeout is reached, incomplete tasks are canceled and returned as `None`.
+            mp_start_method: Start method used by the process pool (e.g., `spawn`, `fork`).
+                If `None`, uses the default start method of the platform.
+
+        """
+
+        assert isinstance(obj, ModelEvaluator)
+
+        self.obj = obj
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.use_processes = use_processes
+        self.timeout = timeout
+        self.mp_start_method = mp_start_method
+
+        self.futures = []
+        self._executor = None
+
+    def _get_executor(self) -> Executor:
+        # Workers are created once and re-used across batches
+        if self._executor is None:
+            if self.use_processes:
+                mp_context = multiprocessing.get_context(self.mp_start_method) if self.mp_start_method else None
+                self._executor = ProcessPoolExecutor(max_workers=self.num_workers, mp_context=mp_context)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+
+        return self._executor
+
+    @overrides
+    def send(self, arch: ArchaiModel, budget: Optional[float] = None) -> None:
+        self.futures.append(self._get_executor().submit(self.obj.evaluate, arch, budget))
+
+    @overrides
+    def fetch_all(self) -> List[Union[float, None]]:
+        results = [None] * len(self.futures)
+        done, not_done = wait(self.futures, timeout=self.timeout)
+
+        try:
+            for i, future in enumerate(self.futures):
+                if future in done:
+                    results[i] = future.result()
+        finally:
+            # Cancels incomplete jobs
+            for future in not_done:
+                future.cancel()
+
+            # Resets evaluator state, even if an evaluation raised an exception
+            self.futures = []
+
+        return results
+
+    def shutdown(self, wait: Optional[bool] = True) -> None:
+        """Shut down the pool of workers.
+
+        Args:
+            wait: Whether to wait for pending tasks to finish.
+
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Executors can not be pickled, so they are re-created on demand
+        state = self.__dict__.copy()
+        state["futures"] = []
+        state["_executor"] = None
+
+        return state
@@ -0,0 +1,323 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+from overrides import overrides
+from transformers.models.auto.configuration_auto import AutoConfig
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.model_evaluator import ModelEvaluator
+from archai.discrete_search.api.search_space import DiscreteSearchSpace
+from archai.discrete_search.search_spaces.config import ArchConfig
+from archai.discrete_search.search_spaces.nlp.tfpp.backbones import CONFIGS
+from archai.discrete_search.search_spaces.nlp.tfpp.search_space import (
+    TfppSearchSpace,
+)
+from archai.discrete_search.search_spaces.nlp.transformer_flex.search_space import (
+    TransformerFlexSearchSpace,
+)
+
+
+@dataclass
+class ModelSizeEstimate:
+    """Analytical estimate of the size and cost of a language model.
+
+    FLOPs count a multiply-accumulate as two operations and only include matrix
+    multiplications, attention scores/contexts and convolutions (including the
+    language modeling head), i.e., normalization layers, biases and activations are ignored.
+
+    """
+
+    non_embedding_params: int
+    total_params: int
+    flops_per_token: float
+
+
+def _linear_params(in_features: int, out_features: int, bias: Optional[bool] = True) -> int:
+    return in_features * out_features + (out_features if bias else 0)
+
+
+def _fft_conv_flops(n_channels: int, seq_len: int) -> float:
+    # Forward and inverse real FFTs of size `2 * seq_len` (~2.5 N log2(N) FLOPs each),
+    # followed by the complex product and the skip connection, averaged per token
+    fft_size = 2 * seq_len
+    return n_channels * (2 * 2.5 * fft_size * math.log2(fft_size) / seq_len + 8)
+
+
+def _get_num_scales(l_max: int, kernel_size: int) -> int:
+    return 1 + math.ceil(math.log2(l_max / kernel_size))
+
+
+def estimate_transformer_flex(
+    config: Dict[str, Any], arch_type: str, seq_len: Optional[int] = None
+) -> ModelSizeEstimate:
+    """Estimate the size and cost of a Transformer-Flex model from its configuration.
+
+    Args:
+        config: Configuration of the architecture, as stored in `ArchaiModel.metadata["config"]`
+            by `TransformerFlexSearchSpace`.
+        arch_type: Type of Transformer architecture (`codegen`, `gpt2` or `gpt2-flex`).
+        seq_len: Context length used to estimate the attention FLOPs. If `None`, uses
+            the maximum sequence length of the model.
+
+    Returns:
+        Estimated parameters and FLOPs per token.
+
+    """
+
+    assert arch_type in ["codegen", "gpt2", "gpt2-flex"], "`arch_type` must be `codegen`, `gpt2` or `gpt2-flex`."
+
+    # Configurations only store hyperparameters, so they are cheap to create
+    param_map = TransformerFlexSearchSpace._DEFAULT_MODELS[arch_type]
+    hf_config = AutoConfig.for_model(arch_type, **{param_map.get(k, k): v for k, v in config.items()})
+
+    d_model = hf_config.n_embd
+    vocab_size = hf_config.vocab_size
+    n_layer = hf_config.n_layer
+    seq_len = seq_len or hf_config.n_positions
+
+    d_inner = hf_config.n_inner if hf_config.n_inner is not None else 4 * d_model
+    d_inner = d_inner if isinstance(d_inner, list) else [d_inner] * n_layer
+
+    non_embedding_params, flops_per_token = 0, 0.0
+
+    for layer_d_inner in d_inner[:n_layer]:
+        if arch_type == "codegen":
+            attn_params = _linear_params(d_model, 3 * d_model, bias=False)
+            attn_params += _linear_params(d_model, d_model, bias=False)
+            norm_params = 2 * d_model
+        else:
+            attn_params = _linear_params(d_model, 3 * d_model) + _linear_params(d_model, d_model)
+            norm_params = 4 * d_model
+
+        mlp_params = _linear_params(d_model, layer_d_inner) + _linear_params(layer_d_inner, d_model)
+        non_embedding_params += attn_params + mlp_params + norm_params
+
+        flops_per_token += 2 * (4 * d_model * d_model + 2 * d_model * layer_d_inner) + 4 * seq_len * d_model
+
+    # Final layer normalization
+    non_embedding_params += 2 * d_model
+
+    embedding_params = vocab_size * d_model
+    if arch_type != "codegen":
+        embedding_params += hf_config.n_positions * d_model
+
+    # Tied output embeddings are counted only once, as embedding parameters
+    if not hf_config.tie_word_embeddings:
+        non_embedding_params += _linear_params(d_model, vocab_size, bias=arch_type == "codegen")
+
+    flops_per_token += 2 * d_model * vocab_size
+
+    return ModelSizeEstimate(
+        non_embedding_params=non_embedding_params,
+        total_params=non_embedding_params + embedding_params,
+        flops_per_token=flops_per_token,
+    )
+
+
+def _estimate_tfpp_op(
+    op_name: str,
+    op_config: Dict[str, Any],
+    hidden_size: int,
+    total_heads: int,
+    op_heads: int,
+    hf_config: Any,
+    seq_len: int,
+) -> ModelSizeEstimate:
+    head_size = hidden_size // total_heads
+    op_size = op_heads * head_size
+
+    if op_name in ["mha", "flash_mha"]:
+        params = _linear_params(hidden_size, 3 * op_size)
+        flops = 2 * hidden_size * 3 * op_size + 4 * seq_len * op_size
+
+    elif op_name == "local_attn":
+        # Queries attend to their own window and to the previous one
+        n_keys = min(seq_len, 2 * op_config["window_size"])
+
+        params = _linear_params(hidden_size, 3 * op_size, bias=False)
+        flops = 2 * hidden_size * 3 * op_size + 4 * n_keys * op_size
+
+    elif op_name == "lsh_attn":
+        # Queries attend to their own chunk and to the previous one (for every hash round)
+        n_keys = min(seq_len, 2 * op_config["bucket_size"]) * op_config["num_hashes"]
+
+        params = 2 * _linear_params(hidden_size, op_size, bias=False) + 2 * hidden_size
+        flops = 2 * hidden_size * 2 * op_size + 4 * n_keys * op_size
+
+    elif op_name == "sep_conv1d":
+        kernel_size = op_config["kernel_size"]
+
+        params = _linear_params(hidden_size, op_size) + op_size * kernel_size + op_size
+        flops = 2 * hidden_size * op_size + 2 * kernel_size * op_size
+
+    elif op_name == "sgconv":
+        num_scales = _get_num_scales(hf_config.max_position_embeddings, op_config["kernel_size"])
+
+        params = (
+            _linear_params(hidden_size, 2 * op_size)
+            + _linear_params(op_size, op_size)
+            + num_scales * op_size * op_config["kernel_size"]
+            + op_size
+        )
+        flops = 2 * hidden_size * 2 * op_size + 2 * op_size * op_size + _fft_conv_flops(op_size, seq_len)
+
+    elif op_name == "sgconv3":
+        num_scales = _get_num_scales(hf_config.max_position_embeddings, op_config["kernel_size"])
+
+        # `GConv3` uses the number of heads of the operation as its head dimension
+        head_dim = op_heads
+        n_conv_heads = op_size // head_dim
+
+        params = (
+            _linear_params(hidden_size, 2 * op_size)
+            + 5 * _linear_params(op_size, op_size)
+            + num_scales * (op_size + n_conv_heads) * op_config["kernel_size"]
+            + op_size
+            + n_conv_heads
+        )
+        flops = (
+            2 * hidden_size * 2 * op_size
+            + 2 * 4 * op_size * op_size
+            + _fft_conv_flops(op_size, seq_len)
+            + _fft_conv_flops(op_size * head_dim, seq_len)
+            + 3 * op_size * head_dim
+        )
+
+    else:
+        raise ValueError(f"Operation `{op_name}` is not supported.")
+
+    return ModelSizeEstimate(non_embedding_params=params, total_params=params, flops_per_token=flops)
+
+
+def estimate_tfpp(
+    arch_config: Union[ArchConfig, Dict[str, Any]], seq_len: Optional[int] = None, **hf_config_kwargs
+) -> ModelSizeEstimate:
+    """Estimate the size and cost of a Transformer++ model from its configuration.
+
+    Args:
+        arch_config: Architecture configuration sampled from `TfppSearchSpace`.
+        seq_len: Context length used to estimate the attention and convolution FLOPs.
+            If `None`, uses the maximum sequence length of the model.
+        hf_config_kwargs: Keyword arguments of the Hugging Face configuration, as passed
+            to `TfppSearchSpace`.
+
+    Returns:
+        Estimated parameters and FLOPs per token.
+
+    """
+
+    if isinstance(arch_config, ArchConfig):
+        arch_config = arch_config.to_dict(remove_metadata_info=True)
+
+    backbone = arch_config.get("backbone", "codegen")
+    hf_config = CONFIGS[backbone](**hf_config_kwargs)
+
+    hidden_size = arch_config["hidden_size"]
+    vocab_size = hf_config.vocab_size
+    seq_len = seq_len or hf_config.max_position_embeddings
+
+    non_embedding_params, flops_per_token = 0, 0.0
+
+    for layer_config in arch_config["hidden_layers"]:
+        total_heads = layer_config["total_heads"]
+        d_inner = layer_config["d_inner"]
+
+        for op_name, op_prop in layer_config["op_allocation"]:
+            op_heads = round(total_heads * op_prop)
+            if op_heads == 0:
+                continue
+
+            op_estimate = _estimate_tfpp_op(
+                op_name, layer_config.get(op_name, {}), hidden_size, total_heads, op_heads, hf_config, seq_len
+            )
+            non_embedding_params += op_estimate.non_embedding_params
+            flops_per_token += op_estimate.flops_per_token
+
+        # Output projection of the mixed operations, MLP and layer normalization(s)
+        non_embedding_params += _linear_params(hidden_size, hidden_size)
+        non_embedding_params += _linear_params(hidden_size, d_inner) + _linear_params(d_inner, hidden_size)
+        non_embedding_params += (2 if backbone == "codegen" else 4) * hidden_size
+
+        flops_per_token += 2 * hidden_size * hidden_size + 4 * hidden_size * d_inner
+
+    # Final layer normalization
+    non_embedding_params += 2 * hidden_size
+
+    embedding_params = vocab_size * hidden_size
+    if backbone == "gpt2":
+        embedding_params += hf_config.max_position_embeddings * hidden_size
+
+    # Tied output embeddings are counted only once, as embedding parameters
+    if not hf_config.tie_word_embeddings:
+        non_embedding_params += _linear_params(hidden_size, vocab_size, bias=backbone == "codegen")
+
+    flops_per_token += 2 * hidden_size * vocab_size
+
+    return ModelSizeEstimate(
+        non_embedding_params=non_embedding_params,
+        total_params=non_embedding_params + embedding_params,
+        flops_per_token=flops_per_token,
+    )
+
+
+class AnalyticalModelSizeProxy(ModelEvaluator):
+    """Analytical estimate of the size or cost of a language model.
+
+    The estimate is computed from the architecture configuration, so models do not
+    need to be instantiated (e.g., when using `lazy_model_build`).
+
+    """
+
+    def __init__(
+        self,
+        search_space: DiscreteSearchSpace,
+        metric: Optional[str] = "non_embedding_params",
+        seq_len: Optional[int] = None,
+    ) -> None:
+        """Initialize the evaluator.
+
+        Args:
+            search_space: Search space of the architectures. Must be a `TransformerFlexSearchSpace`
+                (with `codegen`, `gpt2` or `gpt2-flex` architectures) or a `TfppSearchSpace`.
+            metric: Estimated quantity (`non_embedding_params`, `total_params` or `flops_per_token`).
+            seq_len: Context length used to estimate FLOPs. If `None`, uses the maximum
+                sequence length of the models.
+
+        """
+
+        assert isinstance(
+            search_space, (TransformerFlexSearchSpace, TfppSearchSpace)
+        ), "`search_space` must be a `TransformerFlexSearchSpace` or a `TfppSearchSpace`."
+        assert metric in [
+            "non_embedding_params",
+            "total_params",
+            "flops_per_token",
+        ], "`metric` must be `non_embedding_params`, `total_params` or `flops_per_token`."
+
+        self.search_space = search_space
+        self.metric = metric
+        self.seq_len = seq_len
+
+    def estimate(self, arch: ArchaiModel) -> ModelSizeEstimate:
+        """Estimate the size and cost of an architecture.
+
+        Args:
+            arch: Architecture.
+
+        Returns:
+            Estimated parameters and FLOPs per token.
+
+        """
+
+        if isinstance(self.search_space, TransformerFlexSearchSpace):
+            return estimate_transformer_flex(arch.metadata["config"], self.search_space.arch_type, seq_len=self.seq_len)
+
+        return estimate_tfpp(arch.metadata["config"], seq_len=self.seq_len, **self.search_space.model_kwargs)
+
+    @overrides
+    def evaluate(self, arch: ArchaiModel, budget: Optional[float] = None) -> float:
+        return float(getattr(self.estimate(arch), self.metric))
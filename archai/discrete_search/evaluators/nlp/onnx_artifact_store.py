@@ -0,0 +1,180 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import torch
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.utils.file_cache import LRUFileCache
+from archai.onnx.config_utils.onnx_config_base import OnnxConfig
+from archai.onnx.export import export_to_onnx
+from archai.onnx.optimization import optimize_onnx
+
+
+class OnnxArtifactStore:
+    """Store of exported (and optimized) ONNX models, shared between evaluators.
+
+    Artifacts are identified by the architecture identifier and the export settings, so
+    evaluators that measure different objectives (e.g., latency and memory) of the same
+    architecture only export it once. Exports and optimizations are performed in unique
+    working directories, so evaluators can run concurrently (in threads or processes).
+
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_size: Optional[int] = None) -> None:
+        """Initialize the store.
+
+        Args:
+            cache_dir: Directory used to store the artifacts. If `None`, a temporary
+                directory is used and removed when the store is garbage collected.
+            max_size: Maximum size (in bytes) of the stored ONNX models. Least recently
+                used models are evicted when it is exceeded. If `None`, models are never evicted.
+
+        """
+
+        self._finalizer = None
+        if cache_dir is None:
+            cache_dir = tempfile.mkdtemp(prefix="archai-onnx-")
+            self._finalizer = weakref.finalize(self, shutil.rmtree, cache_dir, ignore_errors=True)
+
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+
+        self._models = LRUFileCache(self.cache_dir, max_size=max_size, suffix=".onnx")
+        self._configs = LRUFileCache(self.cache_dir, suffix=".config.pkl")
+
+        self._onnx_configs = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Temporary directory is only removed by the store that created it
+        state = self.__dict__.copy()
+        state["_finalizer"] = None
+        state["_onnx_configs"] = {}
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _export(
+        self,
+        export_key: str,
+        load_model_fn: Callable[[], torch.nn.Module],
+        validate: bool,
+        export_kwargs: Dict[str, Any],
+    ) -> Path:
+        def _create_model(onnx_path: str) -> None:
+            model = load_model_fn()
+            onnx_config = export_to_onnx(model, onnx_path, task="causal-lm", validate=validate, **export_kwargs)
+
+            # Configuration is stored before the model is moved into the cache, so it is
+            # always available for cached models
+            self._configs.get_or_create(export_key, lambda config_path: _save_onnx_config(onnx_config, config_path))
+            with self._lock:
+                self._onnx_configs[export_key] = onnx_config
+
+        return self._models.get_or_create(export_key, _create_model)
+
+    def _optimize(self, optimize_key: str, onnx_path: Path, onnx_config: OnnxConfig, only_ort: bool) -> Path:
+        def _create_optimized_model(opt_onnx_path: str) -> None:
+            # `optimize_onnx` writes the optimized model next to its input, so it is
+            # performed in a unique working directory
+            work_dir = tempfile.mkdtemp(prefix="opt-", dir=self.cache_dir)
+
+            try:
+                work_onnx_path = os.path.join(work_dir, "model.onnx")
+                try:
+                    os.link(onnx_path, work_onnx_path)
+                except OSError:
+                    shutil.copy(onnx_path, work_onnx_path)
+
+                work_opt_onnx_path = optimize_onnx(work_onnx_path, onnx_config, opt_level=0, only_ort=only_ort)
+                os.replace(work_opt_onnx_path, opt_onnx_path)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return self._models.get_or_create(optimize_key, _create_optimized_model)
+
+    def _get_onnx_config(self, export_key: str) -> OnnxConfig:
+        with self._lock:
+            if export_key in self._onnx_configs:
+                return self._onnx_configs[export_key]
+
+        with open(self._configs.get_path(export_key), "rb") as f:
+            onnx_config = pickle.load(f)
+
+        with self._lock:
+            self._onnx_configs[export_key] = onnx_config
+
+        return onnx_config
+
+    def get(
+        self,
+        arch: ArchaiModel,
+        load_model_fn: Callable[[], torch.nn.Module],
+        use_past: Optional[bool] = True,
+        validate: Optional[bool] = True,
+        share_weights: Optional[bool] = True,
+        opset: Optional[int] = 11,
+        optimize: Optional[bool] = True,
+        only_ort: Optional[bool] = False,
+    ) -> Tuple[Path, OnnxConfig]:
+        """Get the ONNX model of an architecture, exporting (and optimizing) it if necessary.
+
+        Models are validated when they are exported, so artifacts exported without
+        validation are re-used even if `validate=True`.
+
+        Args:
+            arch: Architecture.
+            load_model_fn: Function that loads the model of the architecture, prepared for ONNX.
+                It is only called if the architecture has not been exported yet.
+            use_past: Whether to include past key/values in the model.
+            validate: Whether to validate the exported model.
+            share_weights: Whether to share the embedding and softmax weights.
+            opset: Set of operations to use with ONNX.
+            optimize: Whether to optimize the ONNX model.
+            only_ort: Whether to only apply ORT optimization.
+
+        Returns:
+            Path to the ONNX model and its configuration.
+
+        """
+
+        export_kwargs = {"use_past": use_past, "share_weights": share_weights, "opset": opset}
+        export_key = f"{arch.archid}|" + "|".join(f"{k}={v}" for k, v in sorted(export_kwargs.items()))
+        optimize_key = f"{export_key}|only_ort={only_ort}"
+
+        # Optimized models are re-used without requiring the exported model to be cached
+        if optimize and export_key in self._configs:
+            opt_onnx_path = self._models.get_path(optimize_key)
+
+            try:
+                # Marks the model as recently used
+                os.utime(opt_onnx_path)
+                return opt_onnx_path, self._get_onnx_config(export_key)
+            except FileNotFoundError:
+                pass
+
+        onnx_path = self._export(export_key, load_model_fn, validate, export_kwargs)
+        onnx_config = self._get_onnx_config(export_key)
+
+        if optimize:
+            onnx_path = self._optimize(optimize_key, onnx_path, onnx_config, only_ort)
+
+        return onnx_path, onnx_config
+
+
+def _save_onnx_config(onnx_config: OnnxConfig, config_path: str) -> None:
+    with open(config_path, "wb") as f:
+        pickle.dump(onnx_config, f)
@@ -2,8 +2,6 @@
 # Licensed under the MIT license.
 
 import copy
-import pathlib
-import shutil
 import timeit
 from typing import Any, Dict, List, Optional
 
@@ -14,16 +12,15 @@ from overrides import overrides
 
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.model_evaluator import ModelEvaluator
+from archai.discrete_search.evaluators.nlp.onnx_artifact_store import (
+    OnnxArtifactStore,
+)
 from archai.discrete_search.search_spaces.nlp.transformer_flex.search_space import (
     TransformerFlexSearchSpace,
 )
 from archai.onnx.config_utils.onnx_config_base import OnnxConfig
-from archai.onnx.export import export_to_onnx
 from archai.onnx.export_utils import prepare_model_for_onnx
 from archai.onnx.onnx_loader import load_from_onnx
-from archai.onnx.optimization import optimize_onnx
-
-TMP_FOLDER = pathlib.Path("tmp")
 
 
 class TransformerFlexOnnxLatency(ModelEvaluator):
@@ -44,6 +41,7 @@ class TransformerFlexOnnxLatency(ModelEvaluator):
         opset: Optional[int] = 11,
         optimize: Optional[bool] = True,
         only_ort: Optional[bool] = False,
+        artifact_store: Optional[OnnxArtifactStore] = None,
     ) -> None:
         """Initialize the evaluator.
 
@@ -66,6 +64,9 @@ class TransformerFlexOnnxLatency(ModelEvaluator):
             opset: Set of operations to use with ONNX.
             optimize: Whether to optimize the ONNX model.
             only_ort: Whether to only apply ORT optimization.
+            artifact_store: Store of exported ONNX models, which can be shared with other
+                evaluators to avoid exporting the same architecture multiple times. If `None`,
+                a private store that only keeps the last evaluated model is used.
 
         """
 
@@ -86,6 +87,8 @@ class TransformerFlexOnnxLatency(ModelEvaluator):
         self.optimize = optimize
         self.only_ort = only_ort
 
+        self.artifact_store = artifact_store or OnnxArtifactStore(max_size=0)
+
     def _load_and_prepare(self, config: Dict[str, Any]) -> torch.nn.Module:
         config = copy.deepcopy(config)
         if self.use_past:
@@ -119,29 +122,18 @@ class TransformerFlexOnnxLatency(ModelEvaluator):
 
     @overrides
     def evaluate(self, arch: ArchaiModel, budget: Optional[float] = None) -> float:
-        model = self._load_and_prepare(arch.metadata["config"])
-
-        # There is a bug for Python < 3.10 when using TemporaryFile with Windows,
-        # thus, we opted to manually save and remove the temporary file
-        TMP_FOLDER.mkdir(parents=True, exist_ok=True)
-        onnx_path = TMP_FOLDER / "model.onnx"
-
-        onnx_config = export_to_onnx(
-            model,
-            onnx_path.as_posix(),
-            task="causal-lm",
+        onnx_path, onnx_config = self.artifact_store.get(
+            arch,
+            lambda: self._load_and_prepare(arch.metadata["config"]),
             use_past=self.use_past,
             validate=self.validate,
             share_weights=self.share_weights,
             opset=self.opset,
+            optimize=self.optimize,
+            only_ort=self.only_ort,
         )
 
-        if self.optimize:
-            onnx_path = optimize_onnx(onnx_path.as_posix(), onnx_config, opt_level=0, only_ort=self.only_ort)
-
-        session = load_from_onnx(onnx_path, providers=self.providers)
+        session = load_from_onnx(str(onnx_path), providers=self.providers)
         latency = self._benchmark_model(session, onnx_config)
 
-        shutil.rmtree(TMP_FOLDER)
-
         return latency
@@ -1,8 +1,12 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import threading
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import onnxruntime as rt
 import torch
 from overrides import overrides
@@ -10,8 +14,19 @@ from overrides import overrides
 from archai.common.timing import MeasureBlockTime
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.model_evaluator import ModelEvaluator
+from archai.discrete_search.utils.file_cache import LRUFileCache
 from archai.common.file_utils import TemporaryFiles
 
+# `torch.onnx.export` relies on global state, so concurrent exports (e.g., when using
+# `LocalParallelEvaluator` with threads) need to be serialized
+_EXPORT_LOCK = threading.Lock()
+
+_LATENCY_METRICS = {
+    "mean": np.mean,
+    "median": np.median,
+    "p90": lambda x: np.percentile(x, 90),
+}
+
 
 class AvgOnnxLatency(ModelEvaluator):
     """Evaluate the average ONNX Latency (in seconds) of an architecture.
@@ -19,6 +34,10 @@ class AvgOnnxLatency(ModelEvaluator):
     The latency is measured by running the model on random inputs and averaging the latency over
     `num_trials` trials.
 
+    Exported models can be stored in a content-addressed cache (keyed by architecture identifier
+    and input shapes), and inference sessions of recently evaluated architectures are re-used,
+    so re-evaluating an architecture does not export it again.
+
     """
 
     def __init__(
@@ -30,6 +49,12 @@ class AvgOnnxLatency(ModelEvaluator):
         export_kwargs: Optional[Dict[str, Any]] = None,
         device: Optional[str] = 'cpu',
         inf_session_kwargs: Optional[Dict[str, Any]] = None,
+        num_warmups: Optional[int] = 0,
+        metric: Optional[str] = "mean",
+        num_threads: Optional[int] = None,
+        export_cache_dir: Optional[Union[str, Path]] = None,
+        max_export_cache_size: Optional[int] = None,
+        session_cache_size: Optional[int] = 1,
     ) -> None:
         """Initialize the evaluator.
 
@@ -41,9 +66,20 @@ class AvgOnnxLatency(ModelEvaluator):
             rand_range: Range of random values to use for the input.
             export_kwargs: Keyword arguments to pass to `torch.onnx.export`.
             inf_session_kwargs: Keyword arguments to pass to `onnxruntime.InferenceSession`.
+            num_warmups: Number of untimed runs before the trials.
+            metric: Statistic computed over the trials (`mean`, `median` or `p90`).
+            num_threads: Number of intra-op threads used by the inference session. If `None`,
+                uses the ONNX Runtime default. Ignored if `sess_options` is in `inf_session_kwargs`.
+            export_cache_dir: Directory used to cache exported models. If `None`, models
+                are exported to temporary files.
+            max_export_cache_size: Maximum size (in bytes) of the export cache. Least recently
+                used models are evicted when it is exceeded. If `None`, models are never evicted.
+            session_cache_size: Number of inference sessions kept in memory for re-use.
 
         """
 
+        assert metric in _LATENCY_METRICS, f"`metric` should be one of {list(_LATENCY_METRICS.keys())}."
+
         input_shapes = [input_shape] if isinstance(input_shape, tuple) else input_shape
 
         rand_min, rand_max = rand_range
@@ -60,14 +96,42 @@ class AvgOnnxLatency(ModelEvaluator):
         self.export_kwargs = export_kwargs or dict()
         self.inf_session_kwargs = inf_session_kwargs or dict()
         self.device = device
+        self.num_warmups = num_warmups
+        self.metric = metric
+        self.num_threads = num_threads
+        self.session_cache_size = session_cache_size
+
+        self.export_cache = (
+            LRUFileCache(export_cache_dir, max_size=max_export_cache_size, suffix=".onnx")
+            if export_cache_dir is not None
+            else None
+        )
 
-    @overrides
-    def evaluate(self, model: ArchaiModel, budget: Optional[float] = None) -> float:
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Inference sessions can not be pickled, so they are re-created on demand
+        state = self.__dict__.copy()
+        state["_sessions"] = OrderedDict()
+        del state["_sessions_lock"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._sessions_lock = threading.Lock()
+
+    def _get_cache_key(self, model: ArchaiModel) -> str:
+        input_shapes = [tuple(inp.shape) for inp in self.sample_input]
+        export_kwargs = sorted((k, repr(v)) for k, v in self.export_kwargs.items())
+
+        return f"{model.archid}|{input_shapes}|{self.input_dtype}|{export_kwargs}"
+
+    def _export(self, model: ArchaiModel, onnx_file: str) -> None:
         model.arch.to("cpu")
 
-        # Exports model to ONNX
-        with TemporaryFiles() as tmp_file:
-            onnx_file = tmp_file.get_temp_file()
+        with _EXPORT_LOCK:
             torch.onnx.export(
                 model.arch,
                 self.sample_input,
@@ -76,15 +140,59 @@ class AvgOnnxLatency(ModelEvaluator):
                 **self.export_kwargs,
             )
 
-            # Benchmarks ONNX model
-            onnx_device = "CUDAExecutionProvider" if self.device == 'gpu' else "CPUExecutionProvider"
-            onnx_session = rt.InferenceSession(onnx_file, providers=[onnx_device], **self.inf_session_kwargs)
-            sample_input = {f"input_{i}": inp.numpy() for i, inp in enumerate(self.sample_input)}
-            inf_times = []
+    def _create_session(self, onnx_file: str) -> rt.InferenceSession:
+        onnx_device = "CUDAExecutionProvider" if self.device == 'gpu' else "CPUExecutionProvider"
+        inf_session_kwargs = dict(self.inf_session_kwargs)
+
+        if self.num_threads is not None and "sess_options" not in inf_session_kwargs:
+            sess_options = rt.SessionOptions()
+            sess_options.intra_op_num_threads = self.num_threads
+            sess_options.inter_op_num_threads = 1
+            inf_session_kwargs["sess_options"] = sess_options
+
+        return rt.InferenceSession(str(onnx_file), providers=[onnx_device], **inf_session_kwargs)
+
+    def _get_session(self, model: ArchaiModel) -> rt.InferenceSession:
+        key = self._get_cache_key(model)
+
+        with self._sessions_lock:
+            if key in self._sessions:
+                self._sessions.move_to_end(key)
+                return self._sessions[key]
+
+        if self.export_cache is not None:
+            onnx_file = self.export_cache.get_or_create(key, lambda path: self._export(model, path))
+            onnx_session = self._create_session(onnx_file)
+        else:
+            # Sessions hold the model in memory, so the exported file can be safely removed
+            with TemporaryFiles() as tmp_file:
+                onnx_file = tmp_file.get_temp_file()
+                self._export(model, onnx_file)
+                onnx_session = self._create_session(onnx_file)
+
+        if self.session_cache_size > 0:
+            with self._sessions_lock:
+                self._sessions[key] = onnx_session
+
+                while len(self._sessions) > self.session_cache_size:
+                    self._sessions.popitem(last=False)
+
+        return onnx_session
+
+    @overrides
+    def evaluate(self, model: ArchaiModel, budget: Optional[float] = None) -> float:
+        onnx_session = self._get_session(model)
+
+        # Benchmarks ONNX model
+        sample_input = {f"input_{i}": inp.numpy() for i, inp in enumerate(self.sample_input)}
+        inf_times = []
+
+        for _ in range(self.num_warmups):
+            onnx_session.run(None, input_feed=sample_input)
 
-            for _ in range(self.num_trials):
-                with MeasureBlockTime("onnx_inference") as t:
-                    onnx_session.run(None, input_feed=sample_input)
-                inf_times.append(t.elapsed)
+        for _ in range(self.num_trials):
+            with MeasureBlockTime("onnx_inference") as t:
+                onnx_session.run(None, input_feed=sample_input)
+            inf_times.append(t.elapsed)
 
-        return sum(inf_times) / self.num_trials
+        return float(_LATENCY_METRICS[self.metric](inf_times))
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import math
 from typing import Optional
 
 import numpy as np
@@ -17,6 +18,8 @@ class PredictiveDNNEnsemble(Predictor):
     """Deep Neural Network Ensemble predictor.
 
     Predicts the outcome of a set of expensive objectives using an ensemble of MLP models.
+    Weights of all members are stacked into batched tensors, so that the whole ensemble is
+    trained with a single forward/backward pass per step.
 
     """
 
@@ -28,7 +31,9 @@ class PredictiveDNNEnsemble(Predictor):
         lr: Optional[float] = 1e-4,
         num_tr_steps: Optional[int] = 2_000,
         replace_nan_value: float = -1.0,
-        device: Optional[str] = "cuda",
+        device: Optional[str] = None,
+        warm_start: Optional[bool] = False,
+        num_warm_start_tr_steps: Optional[int] = None,
     ) -> None:
         """Initialize the predictor.
 
@@ -41,7 +46,10 @@ class PredictiveDNNEnsemble(Predictor):
             replace_nan_value: Value to replace NaNs (often used to represent an unused 
                 architecture parameters). Default to -1.0.
 
-            device: Device to use for training.
+            device: Device to use for training. If `None`, uses CUDA if available.
+            warm_start: Whether to initialize the ensemble with the weights of the previous fit.
+            num_warm_start_tr_steps: Number of training steps when warm starting. If `None`,
+                uses `num_tr_steps`.
 
         """
 
@@ -51,24 +59,27 @@ class PredictiveDNNEnsemble(Predictor):
         self.lr = lr
         self.num_tr_steps = num_tr_steps
         self.replace_nan_value = replace_nan_value
+        self.warm_start = warm_start
+        self.num_warm_start_tr_steps = num_warm_start_tr_steps
 
         self.is_fit = False
-        self.device = device
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.ensemble = None
         self.X_meanvar = None
         self.y_meanvar = None
 
     def to_cuda(self) -> None:
         """Moves the predictor to CUDA."""
 
-        for m in self.ensemble:
-            m.cuda()
+        if self.ensemble is not None:
+            self.ensemble.cuda()
         self.device = "cuda"
 
     def to_cpu(self) -> None:
         """Moves the predictor to CPU."""
 
-        for m in self.ensemble:
-            m.cpu()
+        if self.ensemble is not None:
+            self.ensemble.cpu()
         self.device = "cpu"
 
     @overrides
@@ -84,11 +95,20 @@ class PredictiveDNNEnsemble(Predictor):
         self.X_meansd = np.mean(X, axis=0), np.std(X, axis=0)
         self.y_meansd = np.mean(y, axis=0), np.std(y, axis=0)
 
-        # Initialize ensemble models
-        self.ensemble = [
-            FFEnsembleMember(num_objectives, num_features, self.num_layers, self.width).to(self.device)
-            for _ in range(self.num_ensemble_members)
-        ]
+        # Initialize ensemble models, possibly re-using the weights from the previous fit
+        num_tr_steps = self.num_tr_steps
+        can_warm_start = (
+            self.ensemble is not None
+            and self.ensemble.input_feat_len == num_features
+            and self.ensemble.num_objectives == num_objectives
+        )
+
+        if self.warm_start and can_warm_start:
+            num_tr_steps = self.num_warm_start_tr_steps if self.num_warm_start_tr_steps is not None else num_tr_steps
+        else:
+            self.ensemble = FFEnsemble(
+                self.num_ensemble_members, num_objectives, num_features, self.num_layers, self.width
+            ).to(self.device)
 
         # Normalizes features and targets
         X = (X.copy() - self.X_meansd[0]) / (self.X_meansd[1] + 1e-7)
@@ -97,20 +117,20 @@ class PredictiveDNNEnsemble(Predictor):
         Xt = torch.tensor(X, dtype=torch.float32).to(self.device)
         yt = torch.tensor(y, dtype=torch.float32).to(self.device)
 
+        # All members share the same inputs and targets, and since their parameters
+        # are disjoint, summing their losses trains each one of them independently
         # TODO: should we be splitting data into
         # train and val?
-        for member in tqdm(self.ensemble, desc="Training DNN Ensemble..."):
-            criterion = torch.nn.MSELoss(reduction="sum")
-            optimizer = torch.optim.Adam(member.parameters(), lr=self.lr)
-            member.train()
+        optimizer = torch.optim.Adam(self.ensemble.parameters(), lr=self.lr)
+        self.ensemble.train()
 
-            for t in range(self.num_tr_steps):
-                y_pred = member(Xt)
-                loss = criterion(y_pred.squeeze(), yt.squeeze())
+        for _ in tqdm(range(num_tr_steps), desc="Training DNN Ensemble..."):
+            y_pred = self.ensemble(Xt)
+            loss = (y_pred - yt).pow(2).sum()
 
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
 
         self.is_fit = True
 
@@ -119,17 +139,15 @@ class PredictiveDNNEnsemble(Predictor):
         assert len(X.shape) == 2
         assert self.is_fit, "PredictiveDNNEnsemble: predict called before fit!"
 
+        X = np.nan_to_num(X, nan=self.replace_nan_value)
         X = (X.copy() - self.X_meansd[0]) / (self.X_meansd[1] + 1e-7)
         Xt = torch.tensor(X, dtype=torch.float32).to(self.device)
 
-        preds = []
+        self.ensemble.eval()
         with torch.no_grad():
-            for member in self.ensemble:
-                member.eval()
-                pred = member(Xt).to("cpu").numpy()
-                preds.append(pred * (self.y_meansd[1] + 1e-7) + self.y_meansd[0])
+            preds = self.ensemble(Xt).to("cpu").numpy()
 
-        preds = np.array(preds)
+        preds = preds * (self.y_meansd[1] + 1e-7) + self.y_meansd[0]
 
         return MeanVar(mean=np.mean(preds, axis=0), var=np.var(preds, axis=0))
 
@@ -169,3 +187,82 @@ class FFEnsembleMember(nn.Module):
             x = f.relu(layer(x))
 
         return self.output(x)
+
+
+class FFEnsemble(nn.Module):
+    """Feedforward ensemble with stacked member weights.
+
+    Each member has the same architecture and initialization of `FFEnsembleMember`, but
+    all members are evaluated at once using batched matrix multiplications.
+
+    """
+
+    def __init__(
+        self,
+        num_ensemble_members: Optional[int] = 5,
+        num_objectives: Optional[int] = 1,
+        input_feat_len: Optional[int] = 128,
+        num_layers: Optional[int] = 10,
+        width: Optional[int] = 20,
+    ) -> None:
+        """Initialize the ensemble.
+
+        Args:
+            num_ensemble_members: Number of ensemble members.
+            num_objectives: Number of objectives.
+            input_feat_len: Length of input features.
+            num_layers: Number of layers.
+            width: Width of each layer.
+
+        """
+
+        super(FFEnsemble, self).__init__()
+
+        self.num_ensemble_members = num_ensemble_members
+        self.num_objectives = num_objectives
+        self.input_feat_len = input_feat_len
+        self.num_layers = num_layers
+        self.width = width
+
+        layer_dims = [input_feat_len] + [width] * (num_layers - 1) + [num_objectives]
+
+        self.weights = nn.ParameterList(
+            [
+                nn.Parameter(torch.empty(num_ensemble_members, d_in, d_out))
+                for d_in, d_out in zip(layer_dims[:-1], layer_dims[1:])
+            ]
+        )
+        self.biases = nn.ParameterList(
+            [nn.Parameter(torch.empty(num_ensemble_members, 1, d_out)) for d_out in layer_dims[1:]]
+        )
+
+        self.reset_parameters()
+
+    def reset_parameters(self) -> None:
+        """Initialize the parameters with the default initialization of `nn.Linear`."""
+
+        for weight, bias in zip(self.weights, self.biases):
+            bound = 1 / math.sqrt(weight.shape[1])
+            nn.init.uniform_(weight, -bound, bound)
+            nn.init.uniform_(bias, -bound, bound)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Evaluate all members.
+
+        Args:
+            x: Input features with shape `(batch_size, input_feat_len)`.
+
+        Returns:
+            Predictions with shape `(num_ensemble_members, batch_size, num_objectives)`.
+
+        """
+
+        x = x.unsqueeze(0).expand(self.num_ensemble_members, -1, -1)
+
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = torch.baddbmm(bias, x, weight)
+
+            if i < len(self.weights) - 1:
+                x = f.relu(x)
+
+        return x
@@ -10,11 +10,12 @@ from typing import Any, Dict, Optional, Union
 import yaml
 
 
-def build_arch_config(config_dict: Dict[str, Any]) -> ArchConfig:
+def build_arch_config(config_dict: Dict[str, Any], deepcopy_config: Optional[bool] = True) -> ArchConfig:
     """Build an `ArchConfig` object from a sampled config dictionary.
 
     Args:
         config_dict: Config dictionary
+        deepcopy_config: Whether `config_dict` should be deep copied.
 
     Returns:
         `ArchConfig` object.
@@ -24,17 +25,21 @@ def build_arch_config(config_dict: Dict[str, Any]) -> ArchConfig:
     ARCH_CONFIGS = {"default": ArchConfig, "config_list": ArchConfigList}
 
     config_type = config_dict.get("_config_type", "default")
-    return ARCH_CONFIGS[config_type](config_dict)
+    return ARCH_CONFIGS[config_type](config_dict, deepcopy_config=deepcopy_config)
 
 
 class ArchConfig:
     """Store architecture configs."""
 
-    def __init__(self, config_dict: Dict[str, Union[dict, float, int, str]]) -> None:
+    def __init__(
+        self, config_dict: Dict[str, Union[dict, float, int, str]], deepcopy_config: Optional[bool] = True
+    ) -> None:
         """Initialize the class.
 
         Args:
             config_dict: Configuration dictionary.
+            deepcopy_config: Whether `config_dict` should be deep copied. Nested nodes
+                share the copy made by the root node.
 
         """
 
@@ -42,14 +47,14 @@ class ArchConfig:
         self._used_params = set()
 
         # Original config dictionary
-        self._config_dict = deepcopy(config_dict)
+        self._config_dict = deepcopy(config_dict) if deepcopy_config else config_dict
 
         # ArchConfig nodes
         self.nodes = OrderedDict()
 
         for param_name, param in self._config_dict.items():
             if isinstance(param, dict):
-                self.nodes[param_name] = build_arch_config(param)
+                self.nodes[param_name] = build_arch_config(param, deepcopy_config=False)
             else:
                 self.nodes[param_name] = param
 
@@ -181,15 +186,16 @@ class ArchConfig:
 class ArchConfigList(ArchConfig):
     """Store a list of architecture configs."""
 
-    def __init__(self, config: OrderedDict):
+    def __init__(self, config: OrderedDict, deepcopy_config: Optional[bool] = True):
         """Initialize the class.
 
         Args:
             config: Configuration dictionary.
+            deepcopy_config: Whether `config` should be deep copied.
 
         """
 
-        super().__init__(config)
+        super().__init__(config, deepcopy_config=deepcopy_config)
 
         assert "_configs" in config
         assert "_repeat_times" in config
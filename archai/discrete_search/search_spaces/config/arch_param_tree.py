@@ -1,19 +1,30 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import itertools
 from collections import OrderedDict
 from copy import deepcopy
 from functools import reduce
 from random import Random
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
 
 from archai.discrete_search.search_spaces.config.arch_config import (
     ArchConfig,
     build_arch_config,
 )
 from archai.discrete_search.search_spaces.config.discrete_choice import DiscreteChoice
-from archai.discrete_search.search_spaces.config.utils import flatten_dict, replace_ptree_choices, order_dict_keys
+
+
+class _ParamEncoder(NamedTuple):
+    """Compiled encoder of a single (deduplicated) architecture parameter."""
+
+    name: str
+    path: Tuple[str, ...]
+    choice: DiscreteChoice
+    offset: int
+    width: int
+    one_hot_index: Optional[Dict[Any, List[int]]]
 
 
 class ArchParamTree:
@@ -30,15 +41,27 @@ class ArchParamTree:
         self.config_tree = deepcopy(config_tree)
         self.params, self.constants = self._init_tree(config_tree)
 
+        # Flat schema of the tree, compiled on demand by `_compile`
+        self._encoders = None
+        self._num_features = None
+        self._choices_tree = None
+
     @property
     def num_archs(self) -> int:
         """Return the number of architectures in the search space."""
 
-        param_dict = self.to_dict(flatten=True, deduplicate_params=True, remove_constants=True)
-        num_options = [float(len(p.choices)) for p in param_dict.values()]
+        num_options = [float(len(encoder.choice.choices)) for encoder in self._compile()]
 
         return reduce(lambda a, b: a*b, num_options, 1)
 
+    @property
+    def num_features(self) -> int:
+        """Return the length of the vectors produced by `encode_config` and `encode_many`."""
+
+        self._compile()
+
+        return self._num_features
+
     def _init_tree(self, config_tree: Dict[str, Any]) -> Tuple[OrderedDict, OrderedDict]:
         params, constants = OrderedDict(), OrderedDict()
 
@@ -52,6 +75,50 @@ class ArchParamTree:
 
         return params, constants
 
+    def _compile(self) -> List[_ParamEncoder]:
+        if self._encoders is not None:
+            return self._encoders
+
+        encoders, offset = [], 0
+
+        for path, choice in self._get_params_with_paths((), set()):
+            width = len(choice.choices) if choice.encode_strategy == "one_hot" else 1
+            one_hot_index = None
+
+            if choice.encode_strategy == "one_hot":
+                try:
+                    one_hot_index = {}
+                    for i, c in enumerate(choice.choices):
+                        one_hot_index.setdefault(c, []).append(i)
+                except TypeError:
+                    # Unhashable choices are compared one by one
+                    one_hot_index = None
+
+            encoders.append(_ParamEncoder(".".join(path), path, choice, offset, width, one_hot_index))
+            offset += width
+
+        self._encoders, self._num_features = encoders, offset
+        self._choices_tree = self.to_dict()
+
+        return self._encoders
+
+    def _get_params_with_paths(
+        self, prefix: Tuple[str, ...], dedup_param_ids: set
+    ) -> List[Tuple[Tuple[str, ...], DiscreteChoice]]:
+        # Follows the same traversal order of `to_dict(flatten=True, deduplicate_params=True)`
+        params = []
+
+        for param_name, param in self.params.items():
+            path = prefix + (str(param_name),)
+
+            if isinstance(param, ArchParamTree):
+                params.extend(param._get_params_with_paths(path, dedup_param_ids))
+            elif id(param) not in dedup_param_ids:
+                params.append((path, param))
+                dedup_param_ids.add(id(param))
+
+        return params
+
     def _to_dict(
         self, prefix: str, flatten: bool, dedup_param_ids: Optional[set] = None, remove_constants: Optional[bool] = True
     ) -> OrderedDict:
@@ -122,10 +189,38 @@ class ArchParamTree:
 
         """
 
+        return self.sample_many(1, rng)[0]
+
+    def sample_many(self, n: int, rng: Optional[Random] = None) -> List[ArchConfig]:
+        """Sample architecture configs from the search param tree.
+
+        Choices are drawn from the compiled (deduplicated) parameters, in the same order as the
+        tree is traversed, so sampling `n` configs consumes `rng` in the same way as calling
+        `sample_config` `n` times.
+
+        Args:
+            n: Number of architecture configs to sample.
+            rng: Random number generator used during sampling. If set to `None`,
+                `random.Random()` is used.
+
+        Returns:
+            List of sampled architecture configs.
+
+        """
+
         rng = rng or Random()
-        choices_dict = replace_ptree_choices(self.to_dict(), lambda x: x.random_sample(rng))
+        encoders = self._compile()
+
+        configs = []
+        for _ in range(n):
+            values = deepcopy([encoder.choice.random_sample(rng) for encoder in encoders])
 
-        return build_arch_config(choices_dict)
+            # Copying the tree with a memo that maps each choice to its sampled value replaces
+            # all occurrences of the choice (including shared ones) without walking the tree again
+            memo = {id(encoder.choice): value for encoder, value in zip(encoders, values)}
+            configs.append(build_arch_config(deepcopy(self._choices_tree, memo), deepcopy_config=False))
+
+        return configs
 
     def get_param_name_list(self) -> List[str]:
         """Get list of parameter names in the search space.
@@ -135,9 +230,7 @@ class ArchParamTree:
 
         """
 
-        param_dict = self.to_dict(flatten=True, deduplicate_params=True, remove_constants=True)
-
-        return list(param_dict.keys())
+        return [encoder.name for encoder in self._compile()]
 
     def encode_config(self, config: ArchConfig, track_unused_params: Optional[bool] = True) -> List[float]:
         """Encode an `ArchConfig` object into a fixed-length vector of features.
@@ -154,27 +247,69 @@ class ArchParamTree:
 
         """
 
-        deduped_features = self.to_dict(flatten=True, deduplicate_params=True, remove_constants=True)
+        return self.encode_many([config], track_unused_params=track_unused_params)[0].tolist()
+
+    def encode_many(self, configs: List[ArchConfig], track_unused_params: Optional[bool] = True) -> np.ndarray:
+        """Encode a list of `ArchConfig` objects into a matrix of features.
+
+        This method should be used after the model objects are created.
+
+        Args:
+            configs: List of architecture configurations.
+            track_unused_params: If `track_unused_params=True`, parameters not used during
+                model creation (by calling `config.pick`) will be represented as `float("NaN")`.
+
+        Returns:
+            Array of shape `(len(configs), num_features)` with the features of each config.
+
+        """
+
+        encoders = self._compile()
+        features = np.zeros((len(configs), self._num_features), dtype=np.float64)
+
+        for encoder in encoders:
+            values = [_get_config_value(config, encoder.path) for config in configs]
+
+            if encoder.choice.encode_strategy != "one_hot":
+                features[:, encoder.offset] = np.asarray(values, dtype=np.float64)
+            else:
+                for row, value in enumerate(values):
+                    features[row, [encoder.offset + i for i in _get_one_hot_indices(encoder, value)]] = 1.0
+
+            # Replaces unused params with NaNs if necessary
+            if track_unused_params:
+                unused_rows = [row for row, config in enumerate(configs) if not _is_param_used(config, encoder.path)]
+                features[unused_rows, encoder.offset : encoder.offset + encoder.width] = np.nan
+
+        return features
+
+
+def _get_config_value(config: ArchConfig, path: Tuple[str, ...]) -> Any:
+    value = config._config_dict
+
+    for key in path:
+        value = value[key]
+
+    return value
+
+
+def _is_param_used(config: ArchConfig, path: Tuple[str, ...]) -> bool:
+    node = config
+
+    for key in path[:-1]:
+        node = node.nodes[key]
 
-        flat_config = flatten_dict(config._config_dict)
-        flat_used_params = flatten_dict(config.get_used_params())
+    return path[-1] in node._used_params
 
-        # Reorder `flat_config` and `flat_used_params` to follow the order of `deduped_features`
-        flat_config = order_dict_keys(deduped_features, flat_config)
-        flat_used_params = order_dict_keys(deduped_features, flat_used_params)
 
-        # Build feature array
-        features = OrderedDict([
-            (k, deduped_features[k].encode(v)) 
-            for k, v in flat_config.items() 
-            if k in deduped_features
-        ])
+def _get_one_hot_indices(encoder: _ParamEncoder, value: Any) -> List[int]:
+    choices = encoder.choice.choices
+    assert value in choices, f"Invalid option: {value}. Valid options: {choices}"
 
-        # Replaces unused params with NaNs if necessary
-        if track_unused_params:
-            for feature_name, enc_param in features.items():
-                if not flat_used_params[feature_name]:
-                    features[feature_name] = [float("NaN") for _ in enc_param]
+    if encoder.one_hot_index is not None:
+        try:
+            return encoder.one_hot_index[value]
+        except (KeyError, TypeError):
+            pass
 
-        # Flattens the feature array
-        return list(itertools.chain(*features.values()))
+    return [i for i, choice in enumerate(choices) if choice == value]
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 import hashlib
+from functools import partial
 from random import Random
 from typing import Any, Callable, Dict, List, Optional, Type, Union
 
@@ -34,6 +35,7 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         hash_archid: bool = True,
         model_kwargs: Optional[Dict[str, Any]] = None,
         builder_kwargs: Optional[Dict[str, Any]] = None,
+        lazy_model_build: bool = False,
     ) -> None:
         """Config-based Discrete Search Space.
 
@@ -51,6 +53,10 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
             hash_archid (bool, optional): Weather to hash architecture identifiers. Defaults to True.
             model_kwargs: Additional arguments to pass to `model_cls` constructor.
             builder_kwargs: Arguments to pass to `arch_param_tree` if a builder function is passed.
+            lazy_model_build (bool, optional): Whether to defer building models until `ArchaiModel.arch`
+                is accessed. Architecture identifiers and encodings are computed from the `ArchConfig`
+                alone, so unused parameters can not be tracked and `track_unused_params` is ignored.
+                Defaults to False.
         """
 
         self.model_cls = model_cls
@@ -61,6 +67,11 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         self.model_kwargs = model_kwargs or {}
         self.builder_kwargs = builder_kwargs or {}
         self.hash_archid = hash_archid
+        self.lazy_model_build = lazy_model_build
+
+        # Parameter usage is only known after the model is built
+        if self.lazy_model_build:
+            self.track_unused_params = False
 
         if callable(self.arch_param_tree):
             self.arch_param_tree = self.arch_param_tree(**self.builder_kwargs)
@@ -86,6 +97,32 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
         return archid
 
+    def build_model(self, config: ArchConfig) -> ArchaiModel:
+        """Build an `ArchaiModel` from an architecture configuration.
+
+        If `lazy_model_build` is enabled, the model object is only built when `ArchaiModel.arch`
+        is accessed for the first time.
+
+        Args:
+            config: Architecture configuration.
+
+        Returns:
+            Archai-based model.
+
+        """
+
+        if self.lazy_model_build:
+            return ArchaiModel(
+                arch=None,
+                archid=self.get_archid(config),
+                metadata={"config": config},
+                arch_builder=partial(self.model_cls, config, **self.model_kwargs),
+            )
+
+        model = self.model_cls(config, **self.model_kwargs)
+
+        return ArchaiModel(arch=model, archid=self.get_archid(config), metadata={"config": config})
+
     @overrides
     def save_arch(self, model: ArchaiModel, path: str) -> None:
         model.metadata["config"].to_file(path)
@@ -93,9 +130,8 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
     @overrides
     def load_arch(self, path: str) -> ArchaiModel:
         config = ArchConfig.from_file(path)
-        model = self.model_cls(config, **self.model_kwargs)
 
-        return ArchaiModel(arch=model, archid=self.get_archid(config), metadata={"config": config})
+        return self.build_model(config)
 
     @overrides
     def save_model_weights(self, model: ArchaiModel, path: str) -> None:
@@ -108,9 +144,8 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
     @overrides
     def random_sample(self) -> ArchaiModel:
         config = self.arch_param_tree.sample_config(self.rng)
-        model = self.model_cls(config, **self.model_kwargs)
 
-        return ArchaiModel(arch=model, archid=self.get_archid(config), metadata={"config": config})
+        return self.build_model(config)
 
     @overrides
     def mutate(self, model: ArchaiModel) -> ArchaiModel:
@@ -126,11 +161,8 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         )
 
         mutated_config = build_arch_config(mutated_dict)
-        mutated_model = self.model_cls(mutated_config, **self.model_kwargs)
 
-        return ArchaiModel(
-            arch=mutated_model, archid=self.get_archid(mutated_config), metadata={"config": mutated_config}
-        )
+        return self.build_model(mutated_config)
 
     @overrides
     def crossover(self, model_list: List[ArchaiModel]) -> ArchaiModel:
@@ -152,17 +184,17 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         )
 
         cross_config = build_arch_config(cross_dict)
-        cross_model = self.model_cls(cross_config, **self.model_kwargs)
 
-        return ArchaiModel(arch=cross_model, archid=self.get_archid(cross_config), metadata={"config": cross_config})
+        return self.build_model(cross_config)
 
     @overrides
     def encode(self, model: ArchaiModel) -> np.ndarray:
-        encoded_config = np.array(
-            self.arch_param_tree.encode_config(
-                model.metadata["config"],
-                track_unused_params=self.track_unused_params
-            )
+        return self.encode_many([model])[0]
+
+    @overrides
+    def encode_many(self, archs: List[ArchaiModel]) -> np.ndarray:
+        encoded_configs = self.arch_param_tree.encode_many(
+            [model.metadata["config"] for model in archs], track_unused_params=self.track_unused_params
         )
 
-        return np.nan_to_num(encoded_config, nan=self.unused_param_value)
+        return np.nan_to_num(encoded_configs, nan=self.unused_param_value)
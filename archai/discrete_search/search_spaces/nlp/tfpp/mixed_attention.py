@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 from torch import nn
@@ -48,10 +48,22 @@ class MixedAttentionBlock(nn.Module):
         self.resid_dropout = nn.Dropout(self.hf_config.resid_pdrop)
         self.out_proj = Conv1D(self.hidden_size, self.hidden_size)
 
-    def forward(self, hidden_states: torch.Tensor, **kwargs):
+    def forward(self, hidden_states: torch.Tensor, layer_past: Optional[Tuple] = None,
+                use_cache: Optional[bool] = False, **kwargs):
+        # Cache of the layer holds the number of cached positions, followed by the cache of each op
+        ops_past = layer_past[1:] if layer_past is not None else [None] * len(self.ops)
+
         # Concatenates outputs from each op in the embedding dim
-        output = [op(hidden_states, **kwargs)[0] for op in self.ops]
-        output = torch.cat(output, dim=-1)
+        outputs = [
+            op(hidden_states, layer_past=op_past, use_cache=use_cache, **kwargs)
+            for op, op_past in zip(self.ops, ops_past)
+        ]
+        output = torch.cat([op_output[0] for op_output in outputs], dim=-1)
+
+        present = None
+        if use_cache:
+            past_length = (layer_past[0] if layer_past is not None
+                           else hidden_states.new_zeros(hidden_states.shape[0], dtype=torch.long))
+            present = (past_length + hidden_states.shape[1],) + tuple(op_output[1] for op_output in outputs)
 
-        # TODO: return present values
-        return self.resid_dropout(self.out_proj(output)), None
+        return self.resid_dropout(self.out_proj(output)), present
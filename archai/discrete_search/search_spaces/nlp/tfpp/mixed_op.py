@@ -1,6 +1,6 @@
 import torch
 from torch import nn
-from typing import Optional
+from typing import Optional, Tuple
 from transformers.models.gpt2.configuration_gpt2 import GPT2Config
 from archai.discrete_search.search_spaces.config import ArchConfig
 
@@ -58,9 +58,40 @@ class MixedAttentionBlock(nn.Module):
         else:
             self.out_proj = nn.Linear(self.hidden_size, self.hidden_size)
 
-    def forward(self, hidden_states, **kwargs):
+    def forward(self, hidden_states, layer_past: Optional[Tuple] = None,
+                use_cache: Optional[bool] = False, **kwargs):
+        # Cache of the layer holds the number of cached positions, followed by the cache of each op
+        ops_past = layer_past[1:] if layer_past is not None else [None] * len(self.ops)
+
         # Concatenates outputs from each op in the embedding dim
-        output = [op(hidden_states, **kwargs)[0] for op in self.ops]
-        output = torch.cat(output, dim=-1)
-        
-        return self.out_proj(output), None
+        outputs = [
+            op(hidden_states, layer_past=op_past, use_cache=use_cache, **kwargs)
+            for op, op_past in zip(self.ops, ops_past)
+        ]
+        output = torch.cat([op_output[0] for op_output in outputs], dim=-1)
+
+        present = None
+        if use_cache:
+            past_length = (layer_past[0] if layer_past is not None
+                           else hidden_states.new_zeros(hidden_states.shape[0], dtype=torch.long))
+            present = (past_length + hidden_states.shape[1],) + tuple(op_output[1] for op_output in outputs)
+
+        return self.out_proj(output), present
+
+
+def get_past_length(past_key_values: Optional[Tuple]) -> int:
+    """Gets the number of cached positions of a model built with `MixedAttentionBlock` layers."""
+
+    if past_key_values is None or past_key_values[0] is None:
+        return 0
+    return int(past_key_values[0][0][0])
+
+
+def reorder_past_key_values(past_key_values: Optional[Tuple], beam_idx: torch.Tensor) -> Optional[Tuple]:
+    """Selects the batch entries of the (nested) cached states, e.g., to follow beam search."""
+
+    if past_key_values is None:
+        return None
+    if isinstance(past_key_values, torch.Tensor):
+        return past_key_values.index_select(0, beam_idx.to(past_key_values.device))
+    return tuple(reorder_past_key_values(past, beam_idx) for past in past_key_values)
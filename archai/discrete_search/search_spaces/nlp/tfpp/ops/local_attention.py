@@ -1,7 +1,7 @@
 '''Adapted from https://github.com/lucidrains/local-attention.'''
 
 import math
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 from torch import nn, einsum
@@ -31,8 +31,11 @@ def rotate_half(x):
     x1, x2 = x.unbind(dim = -2)
     return torch.cat((-x2, x1), dim = -1)
 
+def apply_rotary_emb(t, freqs):
+    return (t * freqs.cos()) + (rotate_half(t) * freqs.sin())
+
 def apply_rotary_pos_emb(q, k, freqs):
-    q, k = map(lambda t: (t * freqs.cos()) + (rotate_half(t) * freqs.sin()), (q, k))
+    q, k = map(lambda t: apply_rotary_emb(t, freqs), (q, k))
     return q, k
 
 def max_neg_value(tensor):
@@ -144,11 +147,11 @@ class LocalAttention(nn.Module):
             sim = sim.masked_fill(causal_mask, mask_value)
             del causal_mask
 
-        # mask out padding value
-        if self.autopad and needed_pad:
-            pad_mask = bq_k == self.pad_value
-            sim = sim.masked_fill(pad_mask, mask_value)
-            del pad_mask
+        # mask out padding value (keys looked around before the first window are
+        # padded even if the sequence length is a multiple of the window size)
+        pad_mask = bq_k == self.pad_value
+        sim = sim.masked_fill(pad_mask, mask_value)
+        del pad_mask
 
         if bin_attention_mask is not None:
             mask = bin_attention_mask.bool()
@@ -181,6 +184,57 @@ class LocalAttention(nn.Module):
         out, *_ = unpack(out, packed_shape, '* n d')
         return out
 
+    def forward_with_past(self, q, k, v, past_key_value: Optional[Tuple[torch.Tensor]] = None,
+                          bin_attention_mask: Optional[torch.FloatTensor] = None):
+        """Computes the attention of new positions, re-using the keys and values of the previous positions.
+
+        Since each query only attends to the last `window_size * look_backward` positions, only the keys and
+        values (without positional embeddings) of these positions are returned for the next call.
+
+        Args:
+            q, k, v: (..., n, d) queries, keys and values of the new positions.
+            past_key_value: keys and values of the previous positions, returned by the previous call.
+            bin_attention_mask: (batch, n_past + n) binary mask of the previous and new positions.
+        """
+        assert self.causal and self.exact_windowsize, 'incremental decoding requires causal and exact windows'
+
+        max_window_size = self.window_size * self.look_backward
+
+        if past_key_value is None:
+            out = self(q, k, v, bin_attention_mask=bin_attention_mask)
+            return out, (k[..., -max_window_size:, :], v[..., -max_window_size:, :])
+
+        k = torch.cat([past_key_value[0], k], dim=-2)
+        v = torch.cat([past_key_value[1], v], dim=-2)
+        present = (k[..., -max_window_size:, :], v[..., -max_window_size:, :])
+
+        (q, packed_shape), (k, _), (v, _) = map(lambda t: pack([t], '* n d'), (q, k, v))
+        n_q, n_k, device = q.shape[1], k.shape[1], q.device
+
+        # Rotary embeddings only depend on the relative positions, so they are computed
+        # from the first cached position
+        if self.rel_pos is not None:
+            pos_emb = self.rel_pos(k)
+            q, k = apply_rotary_emb(q, pos_emb[-n_q:]), apply_rotary_emb(k, pos_emb)
+
+        sim = einsum('b i e, b j e -> b i j', q, k) * (q.shape[-1] ** -0.5)
+        mask_value = max_neg_value(sim)
+
+        q_t = rearrange(torch.arange(n_k - n_q, n_k, device=device), 'i -> i 1')
+        k_t = rearrange(torch.arange(n_k, device=device), 'j -> 1 j')
+        sim = sim.masked_fill((q_t < k_t) | (q_t > k_t + max_window_size), mask_value)
+
+        if bin_attention_mask is not None:
+            mask = bin_attention_mask[:, -n_k:].bool()
+            mask = repeat(mask, 'b j -> (b h) 1 j', h=q.shape[0] // mask.shape[0])
+            sim = sim.masked_fill(~mask, mask_value)
+
+        attn = self.dropout(sim.softmax(dim=-1))
+        out = einsum('b i j, b j e -> b i e', attn, v)
+
+        out, *_ = unpack(out, packed_shape, '* n d')
+        return out, present
+
 
 class LocalMHA(nn.Module):
     def __init__(
@@ -217,14 +271,22 @@ class LocalMHA(nn.Module):
             **kwargs
         )
 
-    def forward(self, hidden_states, bin_attention_mask: Optional[torch.LongTensor] = None, **kwargs):
+    def forward(self, hidden_states, bin_attention_mask: Optional[torch.LongTensor] = None,
+                layer_past: Optional[Tuple[torch.Tensor]] = None, use_cache: Optional[bool] = False, **kwargs):
         if self.norm is not None:
             hidden_states = self.norm(hidden_states)
 
         q, k, v = self.to_qkv(hidden_states).chunk(3, dim = -1)
         q, k, v = map(lambda t: rearrange(t, 'b n (h d) -> b h n d', h = self.op_heads), (q, k, v)) 
 
-        out = self.attn_fn(q, k, v, bin_attention_mask=bin_attention_mask)
+        present = None
+        if layer_past is not None or use_cache:
+            out, present = self.attn_fn.forward_with_past(
+                q, k, v, past_key_value=layer_past, bin_attention_mask=bin_attention_mask
+            )
+        else:
+            out = self.attn_fn(q, k, v, bin_attention_mask=bin_attention_mask)
+
         out = rearrange(out, 'b h n d -> b n (h d)')
         
-        return out, None
+        return out, (present if use_cache else None)
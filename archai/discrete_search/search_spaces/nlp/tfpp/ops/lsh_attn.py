@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 from torch import nn
@@ -48,7 +48,20 @@ class LSHAttention(nn.Module):
 
     def forward(self, hidden_states, bin_attention_mask: Optional[torch.FloatTensor] = None, 
                 past_buckets_states: Optional[torch.Tensor] = None,  use_cache: bool = False,
-                *args, **kwargs):
+                layer_past: Optional[Tuple[torch.Tensor]] = None, *args, **kwargs):
+        # Buckets depend on the whole sequence, so the hidden states of the previous positions
+        # are cached and attention is re-computed for all positions
+        if layer_past is not None or use_cache:
+            n_positions = hidden_states.size(1)
+            if layer_past is not None:
+                hidden_states = torch.cat([layer_past[0], hidden_states], dim=1)
+
+            output = self._attend(hidden_states, bin_attention_mask)
+            return output[0][:, -n_positions:], ((hidden_states,) if use_cache else None)
+
+        return self._attend(hidden_states, bin_attention_mask)
+
+    def _attend(self, hidden_states, bin_attention_mask: Optional[torch.FloatTensor] = None):
         seq_len = hidden_states.size(1)
 
         # Pads input to be divisible by bucket size
@@ -56,6 +69,9 @@ class LSHAttention(nn.Module):
             pad_size = (self.bucket_size - seq_len % self.bucket_size) % self.bucket_size
             
             # Pads hidden states and attention mask with zeros so attn is not computed for padded tokens
+            if bin_attention_mask is None:
+                bin_attention_mask = hidden_states.new_ones(hidden_states.shape[:2])
+
             p_hidden_states = torch.nn.functional.pad(hidden_states, (0, 0, pad_size, 0))
             p_bin_attention_mask = torch.nn.functional.pad(bin_attention_mask, (pad_size, 0))
 
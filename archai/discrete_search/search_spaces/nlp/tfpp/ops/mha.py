@@ -197,6 +197,59 @@ class SelfAttention(nn.Module):
         return output
 
 
+class CrossAttention(nn.Module):
+    """Implement the scaled dot product attention with softmax, where queries and
+    keys/values might have different lengths (e.g., when decoding with cached keys/values).
+    Arguments
+    ---------
+        softmax_scale: The temperature to use for the softmax attention.
+                      (default: 1/sqrt(d_keys) where d_keys is computed at
+                      runtime)
+        attention_dropout: The dropout rate to apply to the attention
+                           (default: 0.0)
+    """
+    def __init__(self, causal=False, softmax_scale=None, attention_dropout=0.0):
+        super().__init__()
+        self.causal = causal
+        self.softmax_scale = softmax_scale
+        self.dropout_p = attention_dropout
+
+    def forward(self, q, kv, causal=None, key_padding_mask=None):
+        """Implements the multihead softmax attention.
+        Arguments
+        ---------
+            q: The tensor containing the query. (B, Sq, H, D)
+            kv: The tensor containing the key and value. (B, Sk, 2, H, D)
+            causal: if passed, will override self.causal. Queries are aligned with the
+                last Sq keys, so query i attends to keys up to i + Sk - Sq.
+            key_padding_mask: boolean mask to apply to the attention weights. True means to keep,
+                False means to mask out. (B, Sk)
+        """
+        batch_size, seqlen_q, seqlen_k = q.shape[0], q.shape[1], kv.shape[1]
+        causal = self.causal if causal is None else causal
+
+        k, v = kv.unbind(dim=2)
+        softmax_scale = self.softmax_scale or 1.0 / math.sqrt(q.shape[-1])
+        scores = torch.einsum('bthd,bshd->bhts', q, k * softmax_scale)
+
+        if key_padding_mask is not None:
+            padding_mask = torch.full((batch_size, seqlen_k), -10000.0, dtype=scores.dtype,
+                                      device=scores.device)
+            padding_mask.masked_fill_(key_padding_mask, 0.0)
+            scores = scores + rearrange(padding_mask, 'b s -> b 1 1 s')
+
+        if causal:
+            causal_mask = torch.triu(torch.full((seqlen_q, seqlen_k), -10000.0, device=scores.device),
+                                     seqlen_k - seqlen_q + 1)
+            scores = scores + causal_mask.to(dtype=scores.dtype)
+
+        attention = torch.softmax(scores, dim=-1, dtype=v.dtype)
+        attention_drop = F.dropout(attention, self.dropout_p if self.training else 0.0)
+        output = torch.einsum('bhts,bshd->bthd', attention_drop, v)
+
+        return output
+
+
 class MHA(nn.Module):
     def __init__(self, hf_config: PretrainedConfig, 
                  hidden_size: int, total_heads: int, op_heads: int,
@@ -247,6 +300,10 @@ class MHA(nn.Module):
             self.inner_attn = SelfAttention(causal=causal, softmax_scale=softmax_scale,
                                             attention_dropout=dropout)
 
+        # Used when decoding with cached keys and values
+        self.inner_cross_attn = CrossAttention(causal=causal, softmax_scale=softmax_scale,
+                                               attention_dropout=dropout)
+
     def _update_kv_cache(self, kv, inference_params):
         """kv: (batch_size, seqlen, 2, nheads, head_dim) or (batch_size, 1, 2, nheads, head_dim)
         """
@@ -255,7 +312,7 @@ class MHA(nn.Module):
         return _update_kv_cache(kv, inference_params, self.layer_idx)
 
     def forward(self, x, x_kv=None, key_padding_mask=None, cu_seqlens=None, max_seqlen=None,
-                mixer_subset=None, inference_params=None, **kwargs):
+                mixer_subset=None, inference_params=None, layer_past=None, use_cache=False, **kwargs):
         """
         Arguments:
             x: (batch, seqlen, hidden_dim) (where hidden_dim = num heads * head dim) if
@@ -273,6 +330,9 @@ class MHA(nn.Module):
                 about the CLS token in the last layer.
             inference_params: for generation. Adapted from Megatron-LM (and Apex)
             https://github.com/NVIDIA/apex/blob/3ff1a10f72ec07067c4e44759442329804ac5162/apex/transformer/testing/standalone_transformer_lm.py#L470
+            layer_past: (kv,) keys (with rotary embeddings) and values of the previous positions,
+                (batch, past_seqlen, 2, nheads, head_dim). Returned as the present value if use_cache=True.
+            use_cache: whether to return the keys and values of the previous and current positions.
         """
         if cu_seqlens is not None:
             assert max_seqlen is not None
@@ -299,14 +359,31 @@ class MHA(nn.Module):
         qkv = self.Wqkv(x)
         qkv = rearrange(qkv, '... (three h d) -> ... three h d', three=3, d=self.head_dim)
 
-        if inference_params is None:
+        present = None
+
+        if inference_params is None and layer_past is None:
             if self.rotary_emb_dim > 0:
                 qkv = self.rotary_emb(qkv)
 
+            if use_cache:
+                present = (qkv[:, :, 1:],)
+
             if not self.checkpointing:
                 context = self.inner_attn(qkv, **attn_kwargs)
             else:
                 context = torch.utils.checkpoint.checkpoint(self.inner_attn, qkv, **attn_kwargs)
+        elif inference_params is None:
+            assert cu_seqlens is None and max_seqlen is None
+
+            past_seqlen = layer_past[0].shape[1]
+            if self.rotary_emb_dim > 0:
+                qkv = self.rotary_emb(qkv, seqlen_offset=past_seqlen)
+
+            kv = torch.cat([layer_past[0], qkv[:, :, 1:]], dim=1)
+            if use_cache:
+                present = (kv,)
+
+            context = self.inner_cross_attn(qkv[:, :, 0], kv, key_padding_mask=key_padding_mask)
         else:
             if (not inference_params.fused_ft_kernel) or inference_params.sequence_len_offset == 0:
                 if self.rotary_emb_dim > 0:
@@ -330,4 +407,4 @@ class MHA(nn.Module):
         
         out = rearrange(context, '... h d -> ... (h d)')
         
-        return (out, None) if not self.return_residual else ((out, x), None)
+        return (out, present) if not self.return_residual else ((out, x), present)
@@ -1,4 +1,8 @@
+from typing import Optional, Tuple
+
+import torch
 from torch import nn
+import torch.nn.functional as F
 
 from archai.discrete_search.search_spaces.config import ArchConfig
 
@@ -22,11 +26,25 @@ class SeparableConv1d(nn.Module):
         
         self.act = nn.ReLU()
         
-    def forward(self, hidden_states, **kwargs):
+    def forward(self, hidden_states, layer_past: Optional[Tuple[torch.Tensor]] = None,
+                use_cache: Optional[bool] = False, **kwargs):
         out = self.act(self.conv_map_in(hidden_states))
-        out = self.act(self.conv(out.transpose(-1,-2)).transpose(-1,-2))
-        
-        # Removes padding to get back the original sequence length
-        out = out[:, :hidden_states.shape[1], :]
-        
-        return out, None
+        conv_inputs = out if layer_past is None else torch.cat([layer_past[0], out], dim=1)
+
+        # Inputs of the last `kernel_size - 1` positions are enough to compute the next outputs
+        present = None
+        if use_cache:
+            present = (conv_inputs[:, max(conv_inputs.shape[1] - self.kernel_size + 1, 0):],)
+
+        if layer_past is None:
+            out = self.act(self.conv(out.transpose(-1,-2)).transpose(-1,-2))
+
+            # Removes padding to get back the original sequence length
+            out = out[:, :hidden_states.shape[1], :]
+        else:
+            # Left-pads the previous inputs to compute the outputs of the new positions without padding
+            out = F.pad(conv_inputs.transpose(-1, -2), (self.kernel_size - 1 - layer_past[0].shape[1], 0))
+            out = F.conv1d(out, self.conv.weight, self.conv.bias, groups=self.op_size)
+            out = self.act(out.transpose(-1, -2))
+
+        return out, present
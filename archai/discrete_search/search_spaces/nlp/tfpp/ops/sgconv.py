@@ -4,6 +4,7 @@
 
 import math
 from functools import partial
+from typing import Optional, Tuple
 
 import torch
 import torch.nn as nn
@@ -259,6 +260,24 @@ class Normalization(nn.Module):
         return x
 
 
+def causal_conv(u, u_past, k):
+    """ Causal convolution of the new inputs u (..., L) with the kernel k (..., K), where u_past (..., M)
+    holds the inputs of the previous positions. Used for incremental decoding, where L is small.
+    """
+    L = u.size(-1)
+    n = min(u_past.size(-1) + L, k.size(-1))
+    u = F.pad(torch.cat([u_past, u], dim=-1), (n - 1, 0))
+    windows = u.unfold(-1, n, 1)[..., -L:, :]  # (... L n)
+    return (windows * k[..., :n].flip(-1).unsqueeze(-2)).sum(-1)
+
+
+def update_state(state, u, length):
+    """ Appends the new inputs u (..., L) to the state and keeps its last `length` positions """
+    if state is not None:
+        u = torch.cat([state, u], dim=-1)
+    return u[..., max(u.size(-1) - length, 0):]
+
+
 class GConv(nn.Module):
     requires_length = True
 
@@ -395,7 +414,10 @@ class GConv(nn.Module):
         self.register_buffer('kernel_norm_initialized',
                              torch.tensor(0, dtype=torch.bool))
 
-    def fft_conv(self, u, k, L):
+        # Materialized kernels (and their FFTs) used in inference, keyed by `(L, device, dtype)`
+        self._kernel_cache = {}
+
+    def fft_conv(self, u, k, L, k_f=None):
         if self.use_fast_fftconv:
             k = rearrange(k, '1 h l -> h l')
             dropout_mask = None
@@ -406,7 +428,8 @@ class GConv(nn.Module):
             # y = rearrange(y, 'b h l -> b 1 h l')
             return y
     
-        k_f = torch.fft.rfft(k, n=2*L)  # (C H L)
+        if k_f is None:
+            k_f = torch.fft.rfft(k, n=2*L)  # (C H L)
         u_f = torch.fft.rfft(u, n=2*L)  # (B H L)
         # k_f.unsqueeze(-4) * u_f.unsqueeze(-3) # (B C H L)
         y_f = contract('bhl,chl->bchl', u_f, k_f)
@@ -417,19 +440,44 @@ class GConv(nn.Module):
         # Reshape to flatten channels
         return rearrange(y, '... c h l -> ... (c h) l')
 
-    def forward(self, u, return_kernel=False):
+    def train(self, mode=True):
+        self._kernel_cache = {}
+        return super().train(mode)
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        # Inference tensors do not bump their versions when loaded in-place
+        self._kernel_cache = {}
+        return super()._load_from_state_dict(*args, **kwargs)
+
+    def _get_kernel_version(self):
+        # Weight updates happen in-place and bump the tensors versions, except for inference
+        # tensors (e.g., `kernel_norm` initialized under `torch.inference_mode()`), which do
+        # not track versions and can only be updated in-place under inference mode
+        tensors = list(self.parameters()) + list(self.buffers())
+        return tuple((t.data_ptr(), None if t.is_inference() else t._version) for t in tensors)
+
+    def _get_cached_kernels(self, u, L, compute_fn):
+        """Returns the kernels computed by `compute_fn`, which are cached in inference
+        (eval mode without gradients), since they only depend on the weights and `L`.
         """
-        u: (B H L) if self.transposed else (B L H)
-        state: (H N) never needed unless you know what you're doing
+        if self.training or torch.is_grad_enabled():
+            return compute_fn()
 
-        Returns: same shape as u
-        """
-        if not self.transposed:
-            u = u.transpose(-1, -2)
-        L = u.size(-1)
-        if self.use_fast_fftconv and L % 2 != 0:
-            u = F.pad(u, (0, 1))
+        key = (L, u.device, u.dtype)
+        version = self._get_kernel_version()
+
+        cached = self._kernel_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        kernels = compute_fn()
+
+        # Kernel norm might have been initialized by `compute_fn`
+        self._kernel_cache[key] = (self._get_kernel_version(), kernels)
 
+        return kernels
+
+    def _compute_kernel(self, L):
         kernel_list = []
         interpolate_mode = 'nearest' if 'nearest' in self.mode else 'linear'
         multiplier = self.multiplier
@@ -483,8 +531,54 @@ class GConv(nn.Module):
             k0, k1 = rearrange(k, '(s c) h l -> s c h l', s=2)
             k = F.pad(k0, (0, L)) \
                 + F.pad(k1.flip(-1), (L, 0)) \
-        
-        y = self.fft_conv(u, k, L)
+
+        return k
+
+    def _get_kernels(self, u, L):
+        def _compute_kernels():
+            k = self._compute_kernel(L)
+            k_f = torch.fft.rfft(k, n=2*L) if not self.use_fast_fftconv else None
+            return k, k_f
+
+        return self._get_cached_kernels(u, L, _compute_kernels)
+
+    @property
+    def kernel_length(self):
+        """ Length of the kernel before truncation, i.e., number of positions that affect an output """
+        if 'sum' in self.mode:
+            return self.kernel_dim * 2**(self.num_scales - 1 + self.init_scale)
+        return sum(self.kernel_dim * 2**(max(0, i - 1) + self.init_scale) for i in range(self.num_scales))
+
+    def forward(self, u, return_kernel=False, state=None, return_state=False):
+        """
+        u: (B H L) if self.transposed else (B L H)
+        state: inputs of the previous positions (returned when return_state=True), used for incremental decoding
+
+        Returns: same shape as u
+        """
+        if not self.transposed:
+            u = u.transpose(-1, -2)
+        L = u.size(-1)
+
+        next_state = None
+        if return_state:
+            assert not self.bidirectional, 'incremental decoding does not support bidirectional=True'
+            next_state = (update_state(state[0] if state is not None else None, u, self.kernel_length - 1),)
+
+        if state is None:
+            if self.use_fast_fftconv and L % 2 != 0:
+                u = F.pad(u, (0, 1))
+
+            k, k_f = self._get_kernels(u, L)
+            y = self.fft_conv(u, k, L, k_f=k_f)
+        else:
+            assert not self.bidirectional, 'incremental decoding does not support bidirectional=True'
+
+            # Kernels are computed with their full length, so they are re-used by all decoding steps
+            k, _ = self._get_kernels(u, self.kernel_length)
+            y = causal_conv(u.unsqueeze(-3), state[0].unsqueeze(-3), k)
+            y = y + contract('bhl,ch->bchl', u, self.D)
+            y = rearrange(y, '... c h l -> ... (c h) l')
 
         if not self.linear:
             y = self.dropout(self.activation(y))
@@ -498,7 +592,7 @@ class GConv(nn.Module):
 
         if return_kernel:
             return y, k
-        return y, None
+        return y, next_state
 
     @property
     def d_state(self):
@@ -544,9 +638,10 @@ class SGConv(nn.Module):
 
         self.act = nn.GELU(approximate='none')
 
-    def forward(self, x: torch.Tensor, **kwargs):
-        output, _ = self.sgconv(self.in_proj(x))
-        return self.act(output), None
+    def forward(self, x: torch.Tensor, layer_past: Optional[Tuple[torch.Tensor]] = None,
+                use_cache: Optional[bool] = False, **kwargs):
+        output, present = self.sgconv(self.in_proj(x), state=layer_past, return_state=bool(use_cache))
+        return self.act(output), present
 
 if __name__ == '__main__':
     B = 2  # batch size
@@ -1,6 +1,7 @@
 # Modified from S4: https://github.com/HazyResearch/state-spaces/blob/main/src/models/sequence/ss/s4.py
 from functools import partial
 import math
+from typing import Optional, Tuple
 
 import torch
 import torch.nn as nn
@@ -12,7 +13,7 @@ import opt_einsum as oe
 from archai.discrete_search.search_spaces.config import ArchConfig
 
 from ..utils import get_optim_flag
-from .sgconv import GConv
+from .sgconv import GConv, causal_conv, update_state
 
 optimized = True
 
@@ -173,19 +174,9 @@ class GConv3(GConv):
         return k
     
     
-    # absorbs return_output and transformer src mask
-    def forward(self, u, return_kernel=False):
-        """
-        u: (B H L) if self.transposed else (B L H)
-        state: (H N) never needed unless you know what you're doing
-
-        Returns: same shape as u
-        """
-        if not self.transposed:
-            u = u.transpose(-1, -2)
-        L = u.size(-1)
-        if self.use_fast_fftconv and L % 2 != 0:
-            u = F.pad(u, (0, 1))
+    def _compute_kernels(self, L):
+        if self.bidirectional:
+            raise NotImplementedError
 
         k_key = self.get_kernels_forward(self.multiplier_key, self.kernel_list_key)
         k = self.get_kernels_forward(self.multiplier, self.kernel_list)
@@ -211,9 +202,45 @@ class GConv3(GConv):
         k_key = k_key / self.kernel_norm_key  # * (L / self.l_max) ** 0.5
         k = k / self.kernel_norm  # * (L / self.l_max) ** 0.5
 
-        # Convolution
-        if self.bidirectional:
-            raise NotImplementedError
+        k_key = rearrange(k_key, '1 h l -> h l')
+        k = rearrange(k, '1 h l -> h l')
+
+        return k_key, k
+
+    def _get_kernels(self, u, L):
+        def _compute_kernels():
+            k_key, k = self._compute_kernels(L)
+            k_key_f = torch.fft.rfft(k_key, n=2*L) if not self.use_fast_fftconv else None
+            k_f = torch.fft.rfft(k, n=2*L) if not self.use_fast_fftconv else None
+            return k_key, k, k_key_f, k_f
+
+        return self._get_cached_kernels(u, L, _compute_kernels)
+
+    def _get_kv(self, key, value):
+        return (rearrange(key, 'b (h d1) l -> b d1 1 h l', d1=self.head_dim)
+                * rearrange(value, 'b (h d2) l -> b 1 d2 h l', d2=self.head_dim))  # B d1 d2 h L
+
+    # absorbs return_output and transformer src mask
+    def forward(self, u, return_kernel=False, state=None, return_state=False):
+        """
+        u: (B H L) if self.transposed else (B L H)
+        state: keys and key-value products of the previous positions (returned when return_state=True),
+          used for incremental decoding
+
+        Returns: same shape as u
+        """
+        if not self.transposed:
+            u = u.transpose(-1, -2)
+        L = u.size(-1)
+
+        if state is None:
+            if self.use_fast_fftconv and L % 2 != 0:
+                u = F.pad(u, (0, 1))
+
+            k_key, k, k_key_f, k_f = self._get_kernels(u, L)
+        else:
+            # Kernels are computed with their full length, so they are re-used by all decoding steps
+            k_key, k, _, _ = self._get_kernels(u, self.kernel_length)
 
         # compute key, query, and value
         u = rearrange(u, 'b h l -> h (b l)')  # (H B*L)
@@ -224,9 +251,13 @@ class GConv3(GConv):
         value = self.v_proj.weight @ u + self.v_proj.bias.to(dtype).unsqueeze(-1)
         query, key, value = [rearrange(x, 'h (b l) -> b h l', l=L) for x in [query, key, value]]
 
+        if return_state:
+            key_state = update_state(state[0] if state is not None else None, key, self.kernel_length - 1)
+
         # first conv
-        k_key = rearrange(k_key, '1 h l -> h l')
-        if self.use_fast_fftconv:
+        if state is not None:
+            key = causal_conv(key, state[0], k_key) + contract('bhl,1h->bhl', key, self.D_key)
+        elif self.use_fast_fftconv:
             dropout_mask = None
             # No GeLU after the SSM
             # We want output_hbl=True so that k has the same layout as q and v for the next
@@ -239,16 +270,23 @@ class GConv3(GConv):
             key = rearrange(rearrange(key, 'b h l -> h b l'), 'h b l -> b h l')
         else:
             fft_size = 2*L 
-            k_key_f = torch.fft.rfft(k_key, n=fft_size)  # (H L+1)
+            k_key_f = torch.fft.rfft(k_key, n=fft_size) if k_key_f is None else k_key_f  # (H L+1)
             key_f = torch.fft.rfft(key, n=fft_size)  # (B H L+1)
             y_f = contract('bhl,hl->bhl', key_f, k_key_f)
             y = torch.fft.irfft(y_f, n=fft_size)[..., :L]  # (B H L)
             # Compute D term in state space equation - essentially a skip connection
             key = y + contract('bhl,1h->bhl', key, self.D_key)
 
+        next_state = None
+        if return_state:
+            # Only the products of the positions within the kernel length are needed
+            n_positions = min(L, self.kernel_length - 1)
+            kv = self._get_kv(key[..., L - n_positions:], value[..., L - n_positions:])
+            kv_state = update_state(state[1] if state is not None else None, kv, self.kernel_length - 1)
+            next_state = (key_state, kv_state)
+
         # second conv
-        k = rearrange(k, '1 h l -> h l') # (H L)
-        if self.use_fast_fftconv:
+        if self.use_fast_fftconv and state is None:
             if self.head_dim in [1,8]:
                 dropout_mask = None
                 # No GeLU after the SSM
@@ -256,8 +294,7 @@ class GConv3(GConv):
                 y = fftconv_func(key, k, self.D.squeeze(0), dropout_mask, 
                                 False, False, True, value, self.head_dim, query)
             else:
-                kv = (rearrange(key, 'b (h d1) l -> b d1 1 h l', d1=self.head_dim)
-                        * rearrange(value, 'b (h d2) l -> b 1 d2 h l', d2=self.head_dim))  # B d1 d2 h L
+                kv = self._get_kv(key, value)  # B d1 d2 h L
                 kv = rearrange(kv, 'b d1 d2 h l -> b (d1 d2 h) l')
                 k = repeat(k, 'h l -> d h l', d=self.head_dim**2).clone().contiguous()
                 k = rearrange(k, 'd h l -> (d h) l')
@@ -271,12 +308,14 @@ class GConv3(GConv):
                 y = mul_sum(y, query)
                 y = rearrange(y, 'b d h l -> b (d h) l')
         else:
-            fft_size = 2*L
-            kv = (rearrange(key, 'b (h d1) l -> b d1 1 h l', d1=self.head_dim)
-                    * rearrange(value, 'b (h d2) l -> b 1 d2 h l', d2=self.head_dim))  # B d1 d2 h L
-            kv_f = torch.fft.rfft(kv, n=fft_size) / fft_size
-            k_f = torch.fft.rfft(k, n=fft_size)  # H L+1
-            y = torch.fft.irfft(kv_f * k_f, n=fft_size, norm='forward')[..., :L]  # B d1 d2 h L
+            kv = self._get_kv(key, value)  # B d1 d2 h L
+            if state is None:
+                fft_size = 2*L
+                kv_f = torch.fft.rfft(kv, n=fft_size) / fft_size
+                k_f = torch.fft.rfft(k, n=fft_size) if k_f is None else k_f  # H L+1
+                y = torch.fft.irfft(kv_f * k_f, n=fft_size, norm='forward')[..., :L]  # B d1 d2 h L
+            else:
+                y = causal_conv(kv, state[1], k)  # B d1 d2 h L
             y = y + kv * self.D.unsqueeze(-1)  # B d1 d2 h L
             query = rearrange(query, 'b (h d1) l -> b d1 1 h l', d1=self.head_dim)
             # einsum is way slower than multiply and then sum.
@@ -302,7 +341,7 @@ class GConv3(GConv):
 
         if return_kernel:
             return y, k
-        return y, None
+        return y, next_state
 
     @property
     def d_state(self):
@@ -348,9 +387,10 @@ class SGConv3(nn.Module):
 
         self.act = nn.GELU(approximate='none')
 
-    def forward(self, x: torch.Tensor, **kwargs):
-        output, _ = self.sgconv(self.in_proj(x))
-        return self.act(output), None
+    def forward(self, x: torch.Tensor, layer_past: Optional[Tuple[torch.Tensor]] = None,
+                use_cache: Optional[bool] = False, **kwargs):
+        output, present = self.sgconv(self.in_proj(x), state=layer_past, return_state=bool(use_cache))
+        return self.act(output), present
 
 
 if __name__ == '__main__':
@@ -32,7 +32,8 @@ class TfppSearchSpace(ConfigSearchSpace):
                  mixed_ops: bool = True, 
                  homogeneous: bool = False,
                  seed: Optional[int] = None,
-                 disable_cache: bool = True,
+                 disable_cache: bool = False,
+                 lazy_model_build: bool = False,
                  **hf_config_kwargs) -> None:
         op_subset = {
             op_name: op for op_name, op in OPS.items()
@@ -92,4 +93,5 @@ class TfppSearchSpace(ConfigSearchSpace):
             arch_param_tree,
             model_kwargs=(hf_config_kwargs or {}),
             seed=seed,
+            lazy_model_build=lazy_model_build,
         )
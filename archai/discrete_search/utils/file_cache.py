@@ -0,0 +1,158 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+class LRUFileCache:
+    """Content-addressed cache of files stored in a directory.
+
+    Files are identified by a string key (e.g., architecture identifier and input shapes)
+    and created on demand. When the total size of the directory exceeds `max_size`,
+    the least recently used files are evicted. Files are written atomically, so the same
+    directory can be shared by multiple threads and processes.
+
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: Optional[int] = None, suffix: Optional[str] = "") -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory used to store the files.
+            max_size: Maximum size of the cache (in bytes). If `None`, files are never evicted.
+            suffix: Suffix appended to the name of the files (e.g., `.onnx`).
+
+        """
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_size = max_size
+        self.suffix = suffix
+
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached files (in bytes)."""
+
+        return sum(size for _, _, size in self._list_files())
+
+    def get_path(self, key: str) -> Path:
+        """Get the path of the file identified by `key`.
+
+        Args:
+            key: Key of the file.
+
+        Returns:
+            Path of the file, which might not exist yet.
+
+        """
+
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}{self.suffix}"
+
+    def __contains__(self, key: str) -> bool:
+        return self.get_path(key).is_file()
+
+    def get_or_create(self, key: str, create_fn: Callable[[str], None]) -> Path:
+        """Get the path of the file identified by `key`, creating it if necessary.
+
+        Args:
+            key: Key of the file.
+            create_fn: Function that writes the file to the path passed as argument.
+
+        Returns:
+            Path of the cached file.
+
+        """
+
+        path = self.get_path(key)
+
+        if path.is_file():
+            # Marks the file as recently used
+            try:
+                os.utime(path)
+                return path
+            except FileNotFoundError:
+                pass
+
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+        try:
+            create_fn(str(tmp_path))
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self.evict(keep=path)
+
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Evict the least recently used files until the cache fits into `max_size`.
+
+        Args:
+            keep: Path of a file that should not be evicted.
+
+        """
+
+        if self.max_size is None:
+            return
+
+        with self._lock:
+            files = sorted(self._list_files(), key=lambda f: f[1])
+            total_size = sum(size for _, _, size in files)
+
+            for path, _, size in files:
+                if total_size <= self.max_size:
+                    break
+
+                if keep is not None and path == keep:
+                    continue
+
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+                total_size -= size
+
+    def clear(self) -> None:
+        """Remove all cached files."""
+
+        with self._lock:
+            for path, _, _ in self._list_files():
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _list_files(self) -> List[Tuple[Path, float, int]]:
+        files = []
+
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            if path.is_file() and not path.name.endswith(".tmp"):
+                files.append((path, stat.st_mtime, stat.st_size))
+
+        return files
@@ -1,7 +1,8 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import Any, Dict, List
+import bisect
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
@@ -88,67 +89,202 @@ def get_non_dominated_sorting(
     ]
 
 
-def _find_pareto_frontier_points(all_points: np.ndarray) -> List[int]:
+class ParetoArchive:
+    """Incrementally updated archive of non-dominated points.
+
+    Instead of recomputing the pareto-frontier over all evaluated points, the archive keeps
+    the current non-dominated points and only compares them with newly added points, which
+    is equivalent since a discarded point is always dominated by a point in the archive.
+
+    Points are expected to be lower-is-better on every dimension, and each point is
+    identified by an integer index (e.g., its row in the search history). The indices of
+    the archive members after each update are stored in `history`.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty archive."""
+
+        self.indices = np.array([], dtype=np.int64)
+        self.points = None
+        self.history = []
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def update(self, points: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Add new points to the archive and discard dominated points.
+
+        Args:
+            points: New points with shape `(#points, #objectives)`.
+            indices: Indices that identify the new points. When points are duplicated,
+                the one with lowest index is kept, so indices should be increasing
+                across updates.
+
+        Returns:
+            Indices of the archive members, in lexicographic order of their points.
+
+        """
+
+        assert len(points.shape) == 2
+        assert points.shape[0] == len(indices)
+
+        if self.points is None:
+            self.points = points[:0]
+
+        all_points = np.concatenate([self.points, points], axis=0)
+        all_indices = np.concatenate([self.indices, np.asarray(indices, dtype=np.int64)], axis=0)
+
+        pareto_points = np.array(_find_pareto_frontier_points(all_points), dtype=np.int64)
+
+        self.points = all_points[pareto_points]
+        self.indices = all_indices[pareto_points]
+        self.history.append(self.indices)
+
+        return self.indices
+
+
+def _find_pareto_frontier_points(all_points: np.ndarray, block_size: Optional[int] = 1024) -> List[int]:
     """Takes in a list of n-dimensional points, one per row, returns the list of row indices
     which are Pareto-frontier points.
 
-    Assumes that lower values on every dimension are better.
+    Assumes that lower values on every dimension are better. Duplicated points are only
+    considered once (using the index of their first occurrence) and the returned indices
+    follow the lexicographic order of the points.
 
     Args:
         all_points: N-dimensional points.
+        block_size: Number of points compared at once by the vectorized dominance check.
 
     Returns:
         List of Pareto-frontier indexes.
 
     """
 
-    # For each point see if there exists  any other point which dominates it on all dimensions
-    # If that is true, then it is not a pareto point and vice-versa
-
     # Inputs should alwyas be a two-dimensional array
     assert len(all_points.shape) == 2
 
-    pareto_inds = []
+    if all_points.shape[0] == 0:
+        return []
+
+    # Gets the indices of unique points (sorted lexicographically)
+    unique_points, unique_indices = np.unique(all_points, axis=0, return_index=True)
+
+    if unique_points.shape[1] == 2:
+        pareto_mask = _find_2d_non_dominated_mask(unique_points)
+    else:
+        pareto_mask = _find_non_dominated_mask(unique_points, block_size=block_size)
+
+    return unique_indices[pareto_mask].tolist()
+
+
+def _find_2d_non_dominated_mask(sorted_points: np.ndarray) -> np.ndarray:
+    """Finds the non-dominated points of a lexicographically sorted matrix (#points, 2)
+    using a sweep-line over the first dimension.
+
+    A point is dominated if any point before it in the sorted order is lower than or equal
+    to it in both dimensions.
+
+    Args:
+        sorted_points: Lexicographically sorted 2-dimensional points.
+
+    Returns:
+        Boolean mask of non-dominated points.
+
+    """
+
+    y = sorted_points[:, 1]
+
+    # First point is never dominated, others need to be strictly lower than every previous point
+    mask = np.ones(len(y), dtype=bool)
+    mask[1:] = y[1:] < np.minimum.accumulate(y[:-1])
+
+    return mask
+
+
+def _find_weakly_dominated(points: np.ndarray, candidates: np.ndarray, block_size: Optional[int] = 1024) -> np.ndarray:
+    """Checks which points are lower than or equal to at least one candidate in all dimensions,
+    using chunked broadcast comparisons of at most `block_size**2` pairs.
+
+    Args:
+        points: N-dimensional points.
+        candidates: N-dimensional candidate points.
+        block_size: Square root of the maximum number of pairs compared at once.
+
+    Returns:
+        Boolean mask of dominated points.
+
+    """
+
+    dominated = np.zeros(points.shape[0], dtype=bool)
+    chunk_size = max(1, block_size**2 // max(1, points.shape[0]))
+
+    for start in range(0, candidates.shape[0], chunk_size):
+        chunk = candidates[start : start + chunk_size]
+        dominated |= np.all(chunk[:, None, :] <= points[None, :, :], axis=2).any(axis=0)
+
+    return dominated
+
+
+def _find_non_dominated_mask(sorted_points: np.ndarray, block_size: Optional[int] = 1024) -> np.ndarray:
+    """Finds the non-dominated points of a lexicographically sorted matrix (#points, #objectives)
+    using chunked broadcast comparisons.
+
+    A point is dominated if any point before it in the sorted order is lower than or equal
+    to it in all dimensions. Since points are sorted, a dominating point always comes first
+    (and is never larger in the first dimension), so blocks of leading points are resolved
+    at once and used to discard every later point they dominate.
+
+    Args:
+        sorted_points: Lexicographically sorted N-dimensional points.
+        block_size: Number of points compared at once.
 
-    dim = all_points.shape[1]
+    Returns:
+        Boolean mask of non-dominated points.
 
-    # Gets the indices of unique points
-    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+    """
 
-    for i in unique_indices:
-        this_point = all_points[i, :]
-        is_pareto = True
+    # First dimension is already ordered, so only the remaining ones need to be compared
+    points = sorted_points[:, 1:]
 
-        for j in unique_indices:
-            if j == i:
-                continue
+    mask = np.zeros(points.shape[0], dtype=bool)
+    remaining = np.arange(points.shape[0])
 
-            other_point = all_points[j, :]
-            diff = this_point - other_point
+    while len(remaining) > 0:
+        block_indices, remaining = remaining[:block_size], remaining[block_size:]
+        block = points[block_indices]
 
-            if sum(diff >= 0) == dim:
-                # Other point is smaller/larger on all dimensions
-                # so we have found at least one dominating point
-                is_pareto = False
-                break
+        # `le[i, j]` is `True` when `block[i] <= block[j]` in all dimensions
+        le = np.all(block[:, None, :] <= block[None, :, :], axis=2)
+        non_dominated = ~np.triu(le, k=1).any(axis=0)
+        mask[block_indices[non_dominated]] = True
 
-        if is_pareto:
-            pareto_inds.append(i)
+        if len(remaining) > 0:
+            dominated = _find_weakly_dominated(points[remaining], block[non_dominated], block_size=block_size)
+            remaining = remaining[~dominated]
 
-    return pareto_inds
+    return mask
 
 
-def _find_non_dominated_sorting(all_points: np.ndarray) -> List[List[int]]:
+def _find_non_dominated_sorting(all_points: np.ndarray, block_size: Optional[int] = 1024) -> List[np.ndarray]:
     """Finds non-dominated sorting frontiers from a matrix (#points, #objectives).
 
+    Points are sorted lexicographically and a point is assigned to the first front that does
+    not contain a point lower than or equal to it in all dimensions (duplicated points are
+    placed in successive fronts). Two-dimensional inputs are sorted in O(N log N) with a
+    longest non-decreasing subsequence sweep, while higher dimensional inputs are sorted by
+    blocks of points with a vectorized binary search over the fronts found so far.
+
     Args:
         all_points: N-dimensional points.
+        block_size: Number of points compared at once by the vectorized dominance check.
 
     Returns:
         List of frontier indices.
 
     References:
-        Adapted from: https://github.com/anyoptimization/pymoo/blob/main/pymoo/util/nds/efficient_non_dominated_sort.py
+        Produces the same fronts as the Efficient Non-dominated Sort (ENS-SS) from
+        https://github.com/anyoptimization/pymoo/blob/main/pymoo/util/nds/efficient_non_dominated_sort.py
 
         Algorithm:
             X. Zhang, Y. Tian, R. Cheng, and Y. Jin,
@@ -157,69 +293,114 @@ def _find_non_dominated_sorting(all_points: np.ndarray) -> List[List[int]]:
 
     """
 
+    if all_points.shape[0] == 0:
+        return []
+
     lex_sorting = np.lexsort(all_points.T[::-1])
-    all_points = all_points.copy()[lex_sorting]
+    sorted_points = all_points[lex_sorting]
 
-    fronts = []
+    if sorted_points.shape[1] == 2:
+        ranks = _find_2d_front_ranks(sorted_points)
+    else:
+        ranks = _find_front_ranks(sorted_points, block_size=block_size)
+
+    # Stable sort keeps the lexicographic order within each front
+    order = np.argsort(ranks, kind="stable")
+    fronts = np.split(order, np.cumsum(np.bincount(ranks))[:-1])
+
+    return [lex_sorting[front] for front in fronts]
+
+
+def _find_2d_front_ranks(sorted_points: np.ndarray) -> np.ndarray:
+    """Finds the front rank of each point of a lexicographically sorted matrix (#points, 2).
 
-    for idx in range(all_points.shape[0]):
-        front_rank = _find_front_rank(all_points, idx, fronts)
+    The rank of a point is the length of the longest chain of points before it that are
+    lower than or equal to each other in both dimensions, which is computed with a patience
+    sorting sweep over the second dimension.
 
-        if front_rank >= len(fronts):
-            fronts.append([])
+    Args:
+        sorted_points: Lexicographically sorted 2-dimensional points.
+
+    Returns:
+        Front rank of each point.
+
+    """
 
-        fronts[front_rank].append(idx)
+    tails = []
+    ranks = np.empty(sorted_points.shape[0], dtype=np.int64)
 
-    ret = []
-    for front in fronts:
-        ret.append(lex_sorting[front])
+    for i, y in enumerate(sorted_points[:, 1].tolist()):
+        rank = bisect.bisect_right(tails, y)
 
-    return ret
+        if rank == len(tails):
+            tails.append(y)
+        else:
+            tails[rank] = y
+
+        ranks[i] = rank
+
+    return ranks
 
 
-def _find_front_rank(all_points: np.ndarray, idx: int, fronts: List[List[int]]) -> int:
-    """Finds the front rank for all_points[idx] given `fronts`.
+def _find_front_ranks(sorted_points: np.ndarray, block_size: Optional[int] = 1024) -> np.ndarray:
+    """Finds the front rank of each point of a lexicographically sorted matrix (#points, #objectives).
+
+    Points are processed in blocks. Since a point dominated by a member of front `k` is
+    also dominated by a member of every front before `k`, the rank of each point with
+    respect to previous blocks is found with a binary search over the fronts, which is
+    vectorized across the points of the block. Dominance between points of the same block
+    is resolved afterwards in sorted order.
 
     Args:
-        all_points: N-dimensional points.
-        idx: Point index.
-        fronts: Current NDS fronts.
+        sorted_points: Lexicographically sorted N-dimensional points.
+        block_size: Number of points compared at once.
 
     Returns:
-        Front rank for `all_points[idx]`.
-
-    Reference:
-        Adapted from https://github.com/anyoptimization/pymoo/blob/main/pymoo/util/nds/efficient_non_dominated_sort.py
+        Front rank of each point.
 
     """
 
-    def dominates(x, y):
-        for i in range(len(x)):
-            if y[i] < x[i]:
-                return False
+    # First dimension is already ordered, so only the remaining ones need to be compared
+    points = sorted_points[:, 1:]
 
-        return True
+    ranks = np.empty(points.shape[0], dtype=np.int64)
+    fronts = []
 
-    num_found_fronts = len(fronts)
-    rank = 0
-    current = all_points[idx]
+    for start in range(0, points.shape[0], block_size):
+        block = points[start : start + block_size]
 
-    while True:
-        if num_found_fronts == 0:
-            return 0
+        # Binary search for the first front without a dominating point
+        low = np.zeros(block.shape[0], dtype=np.int64)
+        high = np.full(block.shape[0], len(fronts), dtype=np.int64)
+        active = np.nonzero(low < high)[0]
 
-        fk_indices = fronts[rank]
-        solutions = all_points[fk_indices[::-1]]
-        non_dominated = True
+        while len(active) > 0:
+            middle = (low[active] + high[active]) // 2
 
-        for s in solutions:
-            if dominates(s, current):
-                non_dominated = False
-                break
+            for rank in np.unique(middle):
+                indices = active[middle == rank]
+                dominated = _find_weakly_dominated(block[indices], fronts[rank], block_size=block_size)
 
-        if non_dominated:
-            return rank
-        else:
-            rank += 1
-            if rank >= num_found_fronts:
-                return num_found_fronts
+                low[indices[dominated]] = rank + 1
+                high[indices[~dominated]] = rank
+
+            active = active[low[active] < high[active]]
+
+        # Points from the same block can only be dominated by previous points of the block
+        block_ranks = low
+        le = np.triu(np.all(block[:, None, :] <= block[None, :, :], axis=2), k=1)
+
+        for j in np.nonzero(le.any(axis=0))[0]:
+            block_ranks[j] = max(block_ranks[j], block_ranks[:j][le[:j, j]].max() + 1)
+
+        ranks[start : start + block.shape[0]] = block_ranks
+
+        for rank in np.unique(block_ranks):
+            front_points = block[block_ranks == rank]
+
+            if rank == len(fronts):
+                fronts.append(front_points)
+            else:
+                fronts[rank] = np.concatenate([fronts[rank], front_points], axis=0)
+
+    return ranks
@@ -0,0 +1,124 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Callable, List, Optional, Set
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+
+
+def generate_valid_candidates(
+    generators: List[Callable[[], ArchaiModel]],
+    search_objectives: SearchObjectives,
+    num_candidates: Optional[int] = 1,
+    patience: Optional[int] = 20,
+    batch_size: Optional[int] = None,
+    seen_archids: Optional[Set[str]] = None,
+) -> List[List[ArchaiModel]]:
+    """Generate unseen candidates that satisfy all constraints using batched constraint checking.
+
+    In each round, up to `batch_size` candidates are generated for every generator that has not
+    reached `num_candidates` yet, and all of them are validated with a single call to
+    `SearchObjectives.validate_constraints`. Every generated candidate counts towards the `patience`
+    budget of its generator, regardless of being valid, so the procedure always terminates.
+
+    Args:
+        generators: List of functions that generate a new candidate (e.g., mutations of a parent).
+        search_objectives: Search objectives used to validate the candidates.
+        num_candidates: Number of valid candidates to generate for each generator.
+        patience: Maximum number of candidates generated by each generator.
+        batch_size: Number of candidates generated by each generator per round.
+            If `None`, uses `num_candidates`.
+        seen_archids: Architecture identifiers that should not be generated again.
+
+    Returns:
+        List of valid candidates for each generator. Candidates are unique across all generators.
+
+    """
+
+    batch_size = batch_size or num_candidates
+    seen_archids = seen_archids or set()
+
+    candidates = [{} for _ in generators]
+    nb_tries = [0] * len(generators)
+    generated_archids = set()
+
+    pending = [i for i in range(len(generators)) if num_candidates > 0 and patience > 0]
+
+    while pending:
+        batch, batch_generators = [], []
+
+        for i in pending:
+            num_samples = min(batch_size, patience - nb_tries[i])
+            nb_tries[i] += num_samples
+
+            for _ in range(num_samples):
+                candidate = generators[i]()
+
+                # Duplicated candidates are discarded before evaluating any constraint
+                if candidate.archid in seen_archids or candidate.archid in generated_archids:
+                    continue
+
+                generated_archids.add(candidate.archid)
+                batch.append(candidate)
+                batch_generators.append(i)
+
+        if batch:
+            _, valid_indices = search_objectives.validate_constraints(batch)
+
+            for idx in valid_indices:
+                i = batch_generators[idx]
+
+                if len(candidates[i]) < num_candidates:
+                    candidates[i][batch[idx].archid] = batch[idx]
+
+        pending = [i for i in pending if len(candidates[i]) < num_candidates and nb_tries[i] < patience]
+
+    return [list(c.values()) for c in candidates]
+
+
+def mutate_parents(
+    parents: List[ArchaiModel],
+    mutate_fn: Callable[[ArchaiModel], ArchaiModel],
+    search_objectives: SearchObjectives,
+    mutations_per_parent: Optional[int] = 1,
+    patience: Optional[int] = 20,
+    batch_size: Optional[int] = None,
+    seen_archids: Optional[Set[str]] = None,
+) -> List[ArchaiModel]:
+    """Mutate parents to generate new models using batched constraint checking.
+
+    Args:
+        parents: List of parent models.
+        mutate_fn: Function that mutates a model, such as `EvolutionarySearchSpace.mutate`.
+        search_objectives: Search objectives used to validate the mutations.
+        mutations_per_parent: Number of mutations to apply to each parent.
+        patience: Maximum number of mutations generated for each parent.
+        batch_size: Number of mutations generated for each parent per round.
+            If `None`, uses `mutations_per_parent`.
+        seen_archids: Architecture identifiers that should not be generated again.
+
+    Returns:
+        List of mutated models, with the parent's architecture identifier in `metadata["parent"]`.
+
+    """
+
+    def _mutation_generator(parent: ArchaiModel) -> Callable[[], ArchaiModel]:
+        def _mutate() -> ArchaiModel:
+            mutated_model = mutate_fn(parent)
+            mutated_model.metadata["parent"] = parent.archid
+
+            return mutated_model
+
+        return _mutate
+
+    mutations = generate_valid_candidates(
+        [_mutation_generator(p) for p in parents],
+        search_objectives,
+        num_candidates=mutations_per_parent,
+        patience=patience,
+        batch_size=batch_size,
+        seen_archids=seen_archids,
+    )
+
+    return [m for parent_mutations in mutations for m in parent_mutations]
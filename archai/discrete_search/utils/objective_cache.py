@@ -0,0 +1,326 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import numbers
+import sqlite3
+import threading
+from abc import abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from overrides import EnforceOverrides, overrides
+
+# Cache key: (obj_name, archid, budget)
+CacheKey = Tuple[str, str, Optional[Any]]
+
+# Sentinel used to distinguish missing keys from keys storing `None`
+_MISSING = object()
+
+
+class ObjectiveCache(EnforceOverrides):
+    """Abstract class for objective evaluation caches.
+
+    Objective caches map `(obj_name, archid, budget)` keys to evaluation results and are
+    used by `SearchObjectives` to avoid evaluating the same architecture multiple times.
+
+    Subclasses of `ObjectiveCache` are expected to implement `get`, `update`, `items`,
+    `clear` and `__len__`.
+
+    """
+
+    @abstractmethod
+    def get(self, key: CacheKey, default: Optional[float] = None) -> Optional[float]:
+        """Get a cached evaluation result.
+
+        Args:
+            key: Cache key.
+            default: Value returned if `key` is not in the cache.
+
+        Returns:
+            Cached evaluation result or `default`.
+
+        """
+
+        pass
+
+    @abstractmethod
+    def update(self, entries: Dict[CacheKey, Optional[float]]) -> None:
+        """Add or replace a batch of evaluation results in the cache.
+
+        Args:
+            entries: Dictionary mapping cache keys to evaluation results.
+
+        """
+
+        pass
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[CacheKey, Optional[float]]]:
+        """Iterate over all `(key, value)` pairs stored in the cache."""
+
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def get_many(self, keys: List[CacheKey]) -> List[Optional[float]]:
+        """Get a batch of cached evaluation results.
+
+        Args:
+            keys: List of cache keys.
+
+        Returns:
+            List of cached evaluation results, with `None` for keys that are not in the cache.
+
+        """
+
+        return [self.get(key) for key in keys]
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return self.get(key, default=_MISSING) is not _MISSING
+
+    def __getitem__(self, key: CacheKey) -> Optional[float]:
+        if key not in self:
+            raise KeyError(key)
+
+        return self.get(key)
+
+    def __setitem__(self, key: CacheKey, value: Optional[float]) -> None:
+        self.update({key: value})
+
+    def to_dict(self) -> Dict[CacheKey, Optional[float]]:
+        """Return a dictionary with all entries stored in the cache."""
+
+        return dict(self.items())
+
+
+class InMemoryObjectiveCache(ObjectiveCache):
+    """Objective cache backed by a Python dictionary.
+
+    This is the default cache used by `SearchObjectives`. It is not persisted unless
+    `SearchObjectives.save_cache()` is explicitly called.
+
+    """
+
+    def __init__(self, entries: Optional[Dict[CacheKey, Optional[float]]] = None) -> None:
+        """Initialize the in-memory cache.
+
+        Args:
+            entries: Initial cache entries.
+
+        """
+
+        self._data = dict(entries or {})
+
+    @overrides
+    def get(self, key: CacheKey, default: Optional[float] = None) -> Optional[float]:
+        return self._data.get(key, default)
+
+    @overrides
+    def update(self, entries: Dict[CacheKey, Optional[float]]) -> None:
+        self._data.update(entries)
+
+    @overrides
+    def items(self) -> Iterator[Tuple[CacheKey, Optional[float]]]:
+        return iter(list(self._data.items()))
+
+    @overrides
+    def clear(self) -> None:
+        self._data.clear()
+
+    @overrides
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteObjectiveCache(ObjectiveCache):
+    """Objective cache persisted in a SQLite database.
+
+    Entries are written incrementally (one transaction per `update` call) and looked up
+    lazily by key, so the cache never needs to be fully loaded into memory. The database
+    is opened in write-ahead logging (WAL) mode, which allows multiple search processes
+    on the same node to read and write the same cache file concurrently.
+
+    Budgets are stored as JSON, hence they must be JSON-serializable (e.g., `None`,
+    numbers or strings). Numeric budgets (including NumPy scalars) are stored as floats,
+    so `1`, `1.0` and `np.int64(1)` refer to the same entry.
+
+    """
+
+    def __init__(self, file_path: Union[str, Path], timeout: Optional[float] = 60.0) -> None:
+        """Initialize the SQLite cache.
+
+        Args:
+            file_path: Path to the SQLite database file. It is created if it does not exist.
+            timeout: Number of seconds a connection waits for a lock held by another
+                process before raising an error.
+
+        """
+
+        self.file_path = str(file_path)
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+        Path(self.file_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.file_path, timeout=self.timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS objective_cache ("
+                "obj_name TEXT NOT NULL, archid TEXT NOT NULL, budget TEXT NOT NULL, value REAL, "
+                "PRIMARY KEY (obj_name, archid, budget))"
+            )
+            conn.commit()
+
+            self._conn = conn
+
+        return self._conn
+
+    @staticmethod
+    def _encode_key(key: CacheKey) -> Tuple[str, str, str]:
+        obj_name, archid, budget = key
+        if isinstance(budget, numbers.Number) and not isinstance(budget, bool):
+            budget = float(budget)
+
+        return str(obj_name), str(archid), json.dumps(budget)
+
+    @staticmethod
+    def _decode_key(row: Tuple[str, str, str]) -> CacheKey:
+        obj_name, archid, budget = row
+        return obj_name, archid, json.loads(budget)
+
+    @overrides
+    def get(self, key: CacheKey, default: Optional[float] = None) -> Optional[float]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value FROM objective_cache WHERE obj_name = ? AND archid = ? AND budget = ?",
+                    self._encode_key(key),
+                )
+                .fetchone()
+            )
+
+        return default if row is None else row[0]
+
+    @overrides
+    def get_many(self, keys: List[CacheKey]) -> List[Optional[float]]:
+        if not keys:
+            return []
+
+        encoded_keys = [self._encode_key(key) for key in keys]
+        results = {}
+
+        with self._lock:
+            conn = self._connect()
+
+            # Groups lookups by `(obj_name, budget)` to query all archids at once
+            groups = {}
+            for obj_name, archid, budget in encoded_keys:
+                groups.setdefault((obj_name, budget), set()).add(archid)
+
+            # SQLite limits the number of host parameters in a single statement
+            chunk_size = 500
+
+            for (obj_name, budget), archids in groups.items():
+                archids = list(archids)
+
+                for i in range(0, len(archids), chunk_size):
+                    chunk = archids[i : i + chunk_size]
+                    rows = conn.execute(
+                        "SELECT archid, value FROM objective_cache WHERE obj_name = ? AND budget = ? "
+                        f"AND archid IN ({', '.join('?' * len(chunk))})",
+                        (obj_name, budget, *chunk),
+                    ).fetchall()
+
+                    results.update({(obj_name, archid, budget): value for archid, value in rows})
+
+        return [results.get(key) for key in encoded_keys]
+
+    @overrides
+    def update(self, entries: Dict[CacheKey, Optional[float]]) -> None:
+        if not entries:
+            return
+
+        rows = [(*self._encode_key(key), value) for key, value in entries.items()]
+
+        with self._lock:
+            conn = self._connect()
+
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO objective_cache (obj_name, archid, budget, value) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+    @overrides
+    def items(self) -> Iterator[Tuple[CacheKey, Optional[float]]]:
+        last_rowid = 0
+
+        # Pages through the table so the whole cache is never loaded at once
+        while True:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        "SELECT rowid, obj_name, archid, budget, value FROM objective_cache "
+                        "WHERE rowid > ? ORDER BY rowid LIMIT 10000",
+                        (last_rowid,),
+                    )
+                    .fetchall()
+                )
+
+            if not rows:
+                break
+
+            for row in rows:
+                yield self._decode_key(row[1:4]), row[4]
+
+            last_rowid = rows[-1][0]
+
+    @overrides
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+
+            with conn:
+                conn.execute("DELETE FROM objective_cache")
+
+    @overrides
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM objective_cache").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections and locks can not be pickled, so they are re-created on demand
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -20,6 +20,7 @@ from torch.utils.data.distributed import DistributedSampler
 
 from archai.api.trainer_base import TrainerBase
 from archai.common.ordered_dict_logger import OrderedDictLogger
+from archai.common.timing import StepTimer
 from archai.trainers.nlp.ds_training_args import DsTrainingArguments
 
 logger = OrderedDictLogger(source=__name__)
@@ -137,6 +138,7 @@ class DsTrainer(TrainerBase):
         self.eval_dataset = eval_dataset
 
         self.client_state = {"global_step": 0, "total_consumed_samples": 0, "log_history": []}
+        self.step_timer = StepTimer(self.engine.device)
 
     @property
     def data_parallel_world_size(self) -> int:
@@ -194,16 +196,22 @@ class DsTrainer(TrainerBase):
         total_loss = 0.0
 
         for _ in range(gradient_accumulation_steps):
+            data_time = time.time()
             input_ids, _ = next(data_iter)
-            input_ids = input_ids.to(self.engine.device)
+            input_ids = input_ids.to(self.engine.device, non_blocking=True)
+            self.step_timer.add("data", time.time() - data_time)
 
-            outputs = self.engine(input_ids, labels=input_ids)
-            loss = outputs[0].mean()
+            with self.step_timer.measure("forward"):
+                outputs = self.engine(input_ids, labels=input_ids)
+                loss = outputs[0].mean()
+
+            with self.step_timer.measure("backward"):
+                self.engine.backward(loss)
 
-            self.engine.backward(loss)
-            self.engine.step()
+            with self.step_timer.measure("optimizer"):
+                self.engine.step()
 
-            total_loss += loss
+            total_loss += loss.detach()
 
         return total_loss / gradient_accumulation_steps
 
@@ -278,41 +286,57 @@ class DsTrainer(TrainerBase):
         train_iterator = iter(RepeatingLoader(train_dataloader))
         train_time = time.time()
 
-        for step in range(global_step, self.args.max_steps):
-            step_time = time.time()
+        # Losses are accumulated on device and only synchronized at logging steps
+        train_loss, log_step = 0.0, 0
+        log_time = time.time()
+        self.step_timer.reset()
 
+        for step in range(global_step, self.args.max_steps):
             if self.args.pipe_parallel_size > 0:
-                loss = self.engine.train_batch(data_iter=train_iterator)
+                with self.step_timer.measure("train_batch"):
+                    loss = self.engine.train_batch(data_iter=train_iterator)
             else:
                 loss = self.train_batch_without_pipe_parallel(data_iter=train_iterator)
 
-            step_time = time.time() - step_time
+            train_loss += loss.detach().mean()
+            log_step += 1
+            self.step_timer.step()
+
+            do_periodic_logging = (step + 1) % self.args.logging_steps == 0 or step + 1 == self.args.max_steps
+            if do_periodic_logging:
+                sync_time = time.time()
+                float_loss = float(train_loss) / log_step
+                self.step_timer.add("sync", time.time() - sync_time)
 
-            if self.engine.global_rank == 0:
-                float_loss = loss.mean().item()
-                samples_per_second = self.engine.train_batch_size() / step_time
-                learning_rate = self.engine.get_lr()[0]
+                step_time = (time.time() - log_time) / log_step
+                step_time_breakdown = self.step_timer.summary()
 
-                metrics = {
-                    "train/step": step + 1,
-                    "train/loss": float_loss,
-                    "train/ppl": math.exp(float_loss),
-                    "train/learning_rate": learning_rate,
-                    "train/samples_per_second": samples_per_second,
-                    "train/step_runtime": step_time,
-                }
+                if self.engine.global_rank == 0:
+                    samples_per_second = self.engine.train_batch_size() / step_time
+                    learning_rate = self.engine.get_lr()[0]
+
+                    metrics = {
+                        "train/step": step + 1,
+                        "train/loss": float_loss,
+                        "train/ppl": math.exp(float_loss),
+                        "train/learning_rate": learning_rate,
+                        "train/samples_per_second": samples_per_second,
+                        "train/step_runtime": step_time,
+                        **{f"train/{name}_time": phase_time for name, phase_time in step_time_breakdown.items()},
+                    }
 
-                log_history.append(metrics)
-                mlflow.log_metrics(metrics, step=step + 1)
+                    log_history.append(metrics)
+                    mlflow.log_metrics(metrics, step=step + 1)
 
-                do_periodic_logging = (step + 1) % self.args.logging_steps == 0
-                if do_periodic_logging:
                     logger.info(
                         f"Step: {step + 1} | LR: {learning_rate} | "
                         + f"Loss: {float_loss:.3f} | Samples/s: {samples_per_second:.3f} | "
                         + f"PPL: {math.exp(float_loss):.3f}"
                     )
 
+                train_loss, log_step = 0.0, 0
+                log_time = time.time()
+
             do_periodic_eval = (step + 1) % self.args.eval_steps == 0
             if do_periodic_eval and self.args.do_eval:
                 assert self.eval_dataset, "`eval_dataset` must be supplied if `args.do_eval` is True."
@@ -377,9 +401,10 @@ class DsTrainer(TrainerBase):
                 loss = self.engine.eval_batch(data_iter=eval_iterator)
             else:
                 loss = self.eval_batch_without_pipe_parallel(data_iter=eval_iterator)
-            eval_loss += loss.mean().item()
+            eval_loss += loss.detach().mean()
 
-        eval_loss /= n_eval_steps
+        # Loss is accumulated on device and only synchronized at the end
+        eval_loss = float(eval_loss) / n_eval_steps
 
         eval_time = time.time() - eval_time
         eval_samples_per_second = (n_eval_steps * self.engine.train_batch_size()) / eval_time
@@ -4,14 +4,26 @@
 import shutil
 from typing import Dict, Optional, Tuple
 
+import datasets
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 from overrides import overrides
+from torch.utils.data import DataLoader, Dataset
 from transformers.trainer import Trainer
 
 from archai.api.trainer_base import TrainerBase
 from archai.trainers.nlp.hf_training_args import DistillerTrainingArguments
+from archai.trainers.nlp.teacher_logits_cache import (
+    TEACHER_TOP_K_INDICES,
+    TEACHER_TOP_K_VALUES,
+    TeacherLogitsCache,
+    TeacherLogitsCollator,
+    TeacherLogitsDataset,
+    create_teacher_logits_cache,
+    get_teacher_logits_fingerprint,
+    sparse_kd_loss,
+)
 
 
 class HfTrainer(Trainer, TrainerBase):
@@ -65,7 +77,13 @@ class HfTrainer(Trainer, TrainerBase):
 
 
 class HfDistillerTrainer(HfTrainer):
-    """Hugging Face distillation-based trainer."""
+    """Hugging Face distillation-based trainer.
+
+    If `teacher_logits_cache_dir` is supplied in the arguments, the top-k logits of the
+    teacher are computed once over the training set (or loaded, if they are already cached),
+    and the KD loss of the training steps is computed from them, without running the teacher.
+
+    """
 
     def __init__(self, teacher_model: torch.nn.Module, **kwargs) -> None:
         """Initialize Hugging Face distillation-based trainer.
@@ -76,6 +94,7 @@ class HfDistillerTrainer(HfTrainer):
         """
 
         self.teacher_model = teacher_model
+        self.teacher_logits_cache = None
 
         if "args" in kwargs:
             assert isinstance(
@@ -86,6 +105,87 @@ class HfDistillerTrainer(HfTrainer):
 
         super().__init__(**kwargs)
 
+    def cache_teacher_logits(self, train_dataset: Optional[Dataset] = None) -> TeacherLogitsCache:
+        """Cache the top-k logits of the teacher over the training set.
+
+        The cache is loaded if it already exists in `teacher_logits_cache_dir` and was created
+        with the same teacher model, training set and `teacher_logits_top_k`. The training set
+        is wrapped, so its samples carry the cached logits.
+
+        Args:
+            train_dataset: Training dataset. If not supplied, uses the trainer's training dataset.
+
+        Returns:
+            Teacher logits cache.
+
+        """
+
+        assert self.args.teacher_logits_cache_dir, "`teacher_logits_cache_dir` should be supplied."
+
+        train_dataset = train_dataset or self.train_dataset
+        if isinstance(train_dataset, TeacherLogitsDataset):
+            train_dataset = train_dataset.dataset
+
+        fingerprint = get_teacher_logits_fingerprint(self.teacher_model, train_dataset)
+        if TeacherLogitsCache.exists(
+            self.args.teacher_logits_cache_dir,
+            n_samples=len(train_dataset),
+            top_k=self.args.teacher_logits_top_k,
+            fingerprint=fingerprint,
+        ):
+            cache = TeacherLogitsCache(self.args.teacher_logits_cache_dir)
+        else:
+            # Samples should be streamed in the same order as they are indexed
+            teacher_dataset = train_dataset
+            data_collator = self.data_collator
+            if isinstance(teacher_dataset, datasets.Dataset):
+                teacher_dataset = self._remove_unused_columns(teacher_dataset, description="teacher")
+            else:
+                data_collator = self._get_collator_with_removed_columns(data_collator, description="teacher")
+
+            dataloader = DataLoader(
+                teacher_dataset,
+                batch_size=self.args.per_device_eval_batch_size,
+                collate_fn=data_collator,
+                num_workers=self.args.dataloader_num_workers,
+                pin_memory=self.args.dataloader_pin_memory,
+            )
+
+            self.teacher_model.to(self.args.device)
+            cache = create_teacher_logits_cache(
+                self.teacher_model,
+                dataloader,
+                self.args.teacher_logits_cache_dir,
+                top_k=self.args.teacher_logits_top_k,
+                device=self.args.device,
+                fingerprint=fingerprint,
+            )
+
+        self.teacher_logits_cache = cache
+        self.train_dataset = TeacherLogitsDataset(train_dataset, cache)
+        if not isinstance(self.data_collator, TeacherLogitsCollator):
+            self.data_collator = TeacherLogitsCollator(self.data_collator)
+
+        return cache
+
+    @overrides
+    def get_train_dataloader(self) -> DataLoader:
+        if self.args.teacher_logits_cache_dir and self.teacher_logits_cache is None:
+            # Cache is created by the main process, while the others wait to load it
+            with self.args.main_process_first(local=self.args.save_on_each_node, desc="teacher logits cache"):
+                self.cache_teacher_logits()
+
+        return super().get_train_dataloader()
+
+    @overrides
+    def _set_signature_columns_if_needed(self) -> None:
+        super()._set_signature_columns_if_needed()
+
+        # Cached logits should not be removed from the samples
+        for column in [TEACHER_TOP_K_VALUES, TEACHER_TOP_K_INDICES]:
+            if column not in self._signature_columns:
+                self._signature_columns.append(column)
+
     @overrides
     def compute_loss(
         self,
@@ -97,7 +197,8 @@ class HfDistillerTrainer(HfTrainer):
 
         The loss is a weighted sum of the student's loss, as computed by
         the original `HfTrainer`, and the KL divergence between the student and
-        teacher models.
+        teacher models. If the inputs carry cached teacher logits, the KL divergence
+        is computed from them instead of running the teacher.
 
         Args:
             model: Student model.
@@ -109,22 +210,30 @@ class HfDistillerTrainer(HfTrainer):
 
         """
 
+        teacher_top_k_values = inputs.pop(TEACHER_TOP_K_VALUES, None)
+        teacher_top_k_indices = inputs.pop(TEACHER_TOP_K_INDICES, None)
+
         student_outputs = model(**inputs)
 
         student_loss = student_outputs["loss"]
         student_logits = student_outputs["logits"]
 
-        with torch.no_grad():
-            teacher_outputs = self.teacher_model(**inputs)
-            teacher_logits = teacher_outputs["logits"]
-
-        # Compute the KL divergence and KD losses
-        kl_loss = nn.KLDivLoss(reduction="batchmean")
-        kl_divergence = kl_loss(
-            F.log_softmax(student_logits / self.args.temperature, dim=-1),
-            F.softmax(teacher_logits / self.args.temperature, dim=-1),
-        )
-        kd_loss = self.args.temperature**2 * kl_divergence
+        if teacher_top_k_values is not None:
+            kd_loss = sparse_kd_loss(
+                student_logits, teacher_top_k_values, teacher_top_k_indices, temperature=self.args.temperature
+            )
+        else:
+            with torch.no_grad():
+                teacher_outputs = self.teacher_model(**inputs)
+                teacher_logits = teacher_outputs["logits"]
+
+            # Compute the KL divergence and KD losses
+            kl_loss = nn.KLDivLoss(reduction="batchmean")
+            kl_divergence = kl_loss(
+                F.log_softmax(student_logits / self.args.temperature, dim=-1),
+                F.softmax(teacher_logits / self.args.temperature, dim=-1),
+            )
+            kd_loss = self.args.temperature**2 * kl_divergence
 
         # Weigh the final loss
         loss = self.args.alpha * student_loss + (1 - self.args.alpha) * kd_loss
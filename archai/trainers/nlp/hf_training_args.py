@@ -18,9 +18,19 @@ class DistillerTrainingArguments(TrainingArguments):
             a value in the range [0, 1].
         temperature: Annealing ratio for the softmax activations. This value
             should be greater than 0.
+        teacher_logits_cache_dir: Folder where the top-k logits of the teacher are cached.
+            If supplied, the teacher is run once over the training set and the KD loss
+            is computed from the cache.
+        teacher_logits_top_k: Number of teacher logits cached per token.
 
     """
 
     alpha: float = field(default=0.5, metadata={"help": "Weight ratio between student and KD losses."})
 
     temperature: float = field(default=1.0, metadata={"help": "Annealing ratio for the softmax activations."})
+
+    teacher_logits_cache_dir: str = field(
+        default=None, metadata={"help": "Folder where the top-k logits of the teacher are cached."}
+    )
+
+    teacher_logits_top_k: int = field(default=64, metadata={"help": "Number of teacher logits cached per token."})
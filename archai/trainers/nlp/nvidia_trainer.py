@@ -7,8 +7,10 @@ import math
 import os
 import shutil
 import sys
+import threading
 import time
-from typing import Any, Dict, Iterator, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import torch
 import torch.nn as nn
@@ -18,8 +20,9 @@ from packaging import version
 from torch.nn.parallel import DistributedDataParallel
 
 from archai.api.trainer_base import TrainerBase
-from archai.common.distributed_utils import all_reduce, sync_workers
+from archai.common.distributed_utils import all_reduce, get_world_size, sync_workers
 from archai.common.ordered_dict_logger import OrderedDictLogger
+from archai.common.timing import StepTimer
 from archai.datasets.nlp.nvidia_data_loader_utils import (
     LMMultiFileIterator,
     LMOrderedIterator,
@@ -34,6 +37,120 @@ from archai.trainers.nlp.nvidia_training_args import NvidiaTrainingArguments
 logger = OrderedDictLogger(source=__name__)
 
 
+def _copy_state_to_cpu(state: Any, buffers: Dict[str, torch.Tensor], key: Optional[str] = "") -> Any:
+    # Copies tensors to CPU (into re-usable pinned buffers if they are on GPU), so the snapshot
+    # is not modified by the training that continues while it is being serialized
+    if isinstance(state, torch.Tensor):
+        if not state.is_cuda:
+            return state.detach().clone()
+
+        buffer = buffers.get(key, None)
+        if buffer is None or buffer.shape != state.shape or buffer.dtype != state.dtype:
+            buffer = torch.empty(state.shape, dtype=state.dtype, device="cpu").pin_memory()
+            buffers[key] = buffer
+
+        return buffer.copy_(state.detach(), non_blocking=True)
+
+    if isinstance(state, dict):
+        state_copy = OrderedDict() if isinstance(state, OrderedDict) else {}
+        for k, v in state.items():
+            state_copy[k] = _copy_state_to_cpu(v, buffers, f"{key}.{k}")
+
+        # Models' state dictionaries keep their version in `_metadata`
+        if hasattr(state, "_metadata"):
+            state_copy._metadata = copy.deepcopy(state._metadata)
+
+        return state_copy
+
+    if isinstance(state, list):
+        return [_copy_state_to_cpu(v, buffers, f"{key}.{i}") for i, v in enumerate(state)]
+    if isinstance(state, tuple):
+        return tuple(_copy_state_to_cpu(v, buffers, f"{key}.{i}") for i, v in enumerate(state))
+
+    return copy.deepcopy(state)
+
+
+def _save_state(state: Dict[str, Any], checkpoint_path: str, alias_paths: List[str]) -> None:
+    # Writes the checkpoint atomically, and references the same file for its aliases
+    # (hard links), falling back to copying it if links are not supported
+    tmp_checkpoint_path = checkpoint_path + ".tmp"
+    torch.save(state, tmp_checkpoint_path)
+    os.replace(tmp_checkpoint_path, checkpoint_path)
+
+    for alias_path in alias_paths:
+        logger.info(f"Saving checkpoint: {alias_path}")
+
+        tmp_alias_path = alias_path + ".tmp"
+        if os.path.exists(tmp_alias_path):
+            os.remove(tmp_alias_path)
+
+        try:
+            os.link(checkpoint_path, tmp_alias_path)
+        except OSError:
+            shutil.copy(checkpoint_path, tmp_alias_path)
+
+        os.replace(tmp_alias_path, alias_path)
+
+
+class AsyncCheckpointWriter:
+    """Write checkpoints in a background thread.
+
+    States are copied to CPU (pinned) buffers before being serialized, so training can
+    continue while the checkpoint is written. Only one checkpoint is written at a time,
+    and buffers are re-used between checkpoints.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+
+        self._buffers = {}
+        self._thread = None
+        self._error = None
+
+    def save(self, state: Dict[str, Any], checkpoint_path: str, alias_paths: Optional[List[str]] = None) -> None:
+        """Snapshot a state and write it in background.
+
+        Args:
+            state: State to be saved.
+            checkpoint_path: Path to the checkpoint file.
+            alias_paths: Paths that should reference the same checkpoint file.
+
+        """
+
+        # Buffers are only re-used after the previous checkpoint has been written
+        self.wait()
+
+        state = _copy_state_to_cpu(state, self._buffers)
+
+        copy_event = None
+        if torch.cuda.is_available():
+            copy_event = torch.cuda.Event()
+            copy_event.record()
+
+        def _write() -> None:
+            try:
+                if copy_event is not None:
+                    copy_event.synchronize()
+                _save_state(state, checkpoint_path, alias_paths or [])
+            except BaseException as e:
+                self._error = e
+
+        self._thread = threading.Thread(target=_write, daemon=True)
+        self._thread.start()
+
+    def wait(self) -> None:
+        """Wait for the checkpoint being written (if any), raising its error (if any)."""
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
 def save_checkpoint(
     output_dir: str,
     model: torch.nn.Module,
@@ -45,6 +162,7 @@ def save_checkpoint(
     prefix: Optional[str] = "",
     save_all_checkpoints: Optional[bool] = False,
     is_best_model: Optional[bool] = False,
+    checkpoint_writer: Optional[AsyncCheckpointWriter] = None,
 ) -> None:
     """Save a checkpoint that holds enough information to resume the training.
 
@@ -52,10 +170,10 @@ def save_checkpoint(
     the scheduler's state, the scaler's state (if FP16 precision is used),
     and the trainer's state.
 
-    If `is_best_model` is `True`, the function will also save a copy of the checkpoint
+    If `is_best_model` is `True`, the function will also save a link to the checkpoint
     with the prefix "checkpoint-best".
 
-    If `save_all_checkpoints` is `True`, the function will also save a copy of the checkpoint
+    If `save_all_checkpoints` is `True`, the function will also save a link to the checkpoint
     with the step number in the file name.
 
     Args:
@@ -69,40 +187,38 @@ def save_checkpoint(
         prefix: Prefix which should be added to the checkpoint's file name.
         save_all_checkpoints: Whether all `eval_steps` steps should be saved.
         is_best_model: Whether best model should be saved.
+        checkpoint_writer: Writer used to save the checkpoint in background. If not supplied,
+            the checkpoint is saved synchronously.
 
     """
 
-    state = {
-        "model_config": model.config,
-        "model_state": model.state_dict(),
-        "optimizer_state": optimizer.state_dict(),
-        "scheduler_state": scheduler.state_dict() if scheduler else None,
-        "scaler_state": scaler.state_dict() if fp16 else None,
-        "trainer_state": trainer_state,
-    }
-
     checkpoint_name = prefix + "checkpoint-last.pt"
 
     with sync_workers() as rank:
         checkpoint_path = os.path.join(output_dir, checkpoint_name)
 
         if rank == 0:
-            logger.info(f"Saving checkpoint: {checkpoint_path}")
-            torch.save(state, checkpoint_path)
-
+            state = {
+                "model_config": model.config,
+                "model_state": model.state_dict(),
+                "optimizer_state": optimizer.state_dict(),
+                "scheduler_state": scheduler.state_dict() if scheduler else None,
+                "scaler_state": scaler.state_dict() if fp16 else None,
+                "trainer_state": trainer_state,
+            }
+
+            alias_paths = []
             if is_best_model:
-                checkpoint_step_name = prefix + "checkpoint-best.pt"
-                checkpoint_step_path = os.path.join(output_dir, checkpoint_step_name)
-
-                logger.info(f"Saving checkpoint: {checkpoint_step_path}")
-                shutil.copy(checkpoint_path, checkpoint_step_path)
-
+                alias_paths.append(os.path.join(output_dir, prefix + "checkpoint-best.pt"))
             if save_all_checkpoints:
-                checkpoint_step_name = prefix + f"checkpoint-{trainer_state['step']}.pt"
-                checkpoint_step_path = os.path.join(output_dir, checkpoint_step_name)
+                alias_paths.append(os.path.join(output_dir, prefix + f"checkpoint-{trainer_state['step']}.pt"))
 
-                logger.info(f"Saving checkpoint: {checkpoint_step_path}")
-                shutil.copy(checkpoint_path, checkpoint_step_path)
+            logger.info(f"Saving checkpoint: {checkpoint_path}")
+
+            if checkpoint_writer is not None:
+                checkpoint_writer.save(state, checkpoint_path, alias_paths=alias_paths)
+            else:
+                _save_state(state, checkpoint_path, alias_paths)
 
 
 class NvidiaTrainer(TrainerBase):
@@ -150,6 +266,9 @@ class NvidiaTrainer(TrainerBase):
             "log_history": [],
         }
 
+        self.checkpoint_writer = AsyncCheckpointWriter() if self.args.async_checkpoint else None
+        self.step_timer = StepTimer(self.args.device)
+
     def load_checkpoint(self, checkpoint_file_path: str) -> Tuple[int, int, int, int]:
         """Load states from a checkpoint file.
 
@@ -192,20 +311,27 @@ class NvidiaTrainer(TrainerBase):
         else:
             raise RuntimeError(f"Split: {split} is not supported yet.")
 
+        # Evaluation uses its own batch size and sequence length
+        batch_size, seq_len = self.args.global_batch_size, self.args.seq_len
+        if split != "train":
+            batch_size, seq_len = self.args.eval_batch_size, self.args.eval_seq_len
+
         if self.args.dataset_name in ["wt2", "wt103"] or self.args.dataset_name.startswith("olx_"):
             return LMOrderedIterator(
                 input_ids,
-                self.args.global_batch_size,
-                self.args.seq_len,
+                batch_size,
+                seq_len,
                 device=self.args.device,
+                num_prefetch_batches=self.args.iterator_prefetch_batches,
             )
         elif self.args.dataset_name == "lm1b":
             return LMMultiFileIterator(
                 input_ids,
                 self.vocab,
-                self.args.global_batch_size,
-                self.args.seq_len,
+                batch_size,
+                seq_len,
                 device=self.args.device,
+                num_prefetch_batches=self.args.iterator_prefetch_batches,
             )
         else:
             raise RuntimeError(f"Dataset: {self.args.dataset_name} is not supported yet.")
@@ -295,19 +421,30 @@ class NvidiaTrainer(TrainerBase):
         elif self.args.strategy == "dp":
             self.dist_model = nn.DataParallel(self.model, dim=1)
 
+    def _get_autocast(self, enabled: bool) -> torch.autocast:
+        # Support `bf16` based on PyTorch version and CUDA availability
+        autocast = torch.autocast(self.args.device.type, enabled=enabled)
+        if version.parse(torch.__version__) >= version.parse("1.10") and self.args.device.type != "cpu":
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            autocast = torch.cuda.amp.autocast(enabled=enabled, dtype=dtype)
+
+        return autocast
+
     def _training_step_chunk(
         self, input_ids: torch.LongTensor, labels: torch.LongTensor, autocast: torch.autocast
-    ) -> float:
-        with autocast:
+    ) -> torch.Tensor:
+        with self.step_timer.measure("forward"), autocast:
             loss = self.dist_model(input_ids, labels=input_ids)[0]
             loss = loss.float().mean().type_as(loss) / self.args.gradient_accumulation_steps
 
-        if self.args.fp16:
-            self.scaler.scale(loss).backward()
-        else:
-            loss.backward()
+        with self.step_timer.measure("backward"):
+            if self.args.fp16:
+                self.scaler.scale(loss).backward()
+            else:
+                loss.backward()
 
-        return loss.float().item()
+        # Loss is kept on device to avoid synchronizing it at every step
+        return loss.detach().float()
 
     def _training_step(
         self,
@@ -324,6 +461,8 @@ class NvidiaTrainer(TrainerBase):
         best_eval_loss = self.trainer_state["best_eval_loss"]
 
         start_time = time.time()
+        start_stall_time = train_dataloader.stall_time
+        self.step_timer.reset()
 
         # `lm1b` uses a different style of data loader
         if self.args.dataset_name != "lm1b":
@@ -331,11 +470,7 @@ class NvidiaTrainer(TrainerBase):
         else:
             train_iterator = train_dataloader
 
-        # Support `bf16` based on PyTorch version and CUDA availability
-        autocast = torch.autocast(self.args.device.type, enabled=self.args.fp16)
-        if version.parse(torch.__version__) >= version.parse("1.10") and self.args.device.type != "cpu":
-            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
-            autocast = torch.cuda.amp.autocast(enabled=self.args.fp16, dtype=dtype)
+        autocast = self._get_autocast(self.args.fp16)
 
         for batch, (input_ids, labels, _, _) in enumerate(train_iterator, start=start_batch + 1):
             log_step += 1
@@ -359,17 +494,20 @@ class NvidiaTrainer(TrainerBase):
                 )
                 train_loss += train_loss_chunk
 
-            if self.args.fp16:
-                self.scaler.unscale_(self.optimizer)
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.args.max_grad_norm)
-            else:
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.args.max_grad_norm)
+            with self.step_timer.measure("optimizer"):
+                if self.args.fp16:
+                    self.scaler.unscale_(self.optimizer)
+                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.args.max_grad_norm)
+                else:
+                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.args.max_grad_norm)
 
-            if self.args.fp16:
-                self.scaler.step(self.optimizer)
-                self.scaler.update()
-            else:
-                self.optimizer.step()
+                if self.args.fp16:
+                    self.scaler.step(self.optimizer)
+                    self.scaler.update()
+                else:
+                    self.optimizer.step()
+
+            self.step_timer.step()
 
             # Learning rate annealing
             step += 1
@@ -386,19 +524,31 @@ class NvidiaTrainer(TrainerBase):
 
             # Logging
             if step % self.args.logging_steps == 0:
+                # Loss is only synchronized at logging steps
+                sync_start_time = time.time()
+                loss = float(train_loss) / log_step
+                loss = all_reduce(loss, op="mean")
+
                 elapsed_time = time.time() - start_time
+                self.step_timer.add("sync", time.time() - sync_start_time)
 
                 lr = self.optimizer.param_groups[0]["lr"]
 
-                loss = train_loss / log_step
-                loss = all_reduce(loss, op="mean")
-
                 batch_time = elapsed_time / log_step
                 batch_time = all_reduce(batch_time, op="max")
 
                 throughput = n_labels_tokens / elapsed_time
                 throughput = all_reduce(throughput, op="sum")
 
+                # Time spent waiting for the data loader and in each phase of the step
+                stall_time = (train_dataloader.stall_time - start_stall_time) / log_step
+                stall_time = all_reduce(stall_time, op="max")
+
+                step_time_breakdown = {
+                    f"{name}_time": all_reduce(phase_time, op="max")
+                    for name, phase_time in self.step_timer.summary().items()
+                }
+
                 train_loss, log_step, n_labels_tokens = 0.0, 0, 0
 
                 self.trainer_state["log_history"].append(
@@ -407,6 +557,8 @@ class NvidiaTrainer(TrainerBase):
                         "learning_rate": lr,
                         "loss": loss,
                         "ppl": math.exp(loss),
+                        "data_stall_time": stall_time,
+                        **step_time_breakdown,
                         "step": step,
                     }
                 )
@@ -414,19 +566,22 @@ class NvidiaTrainer(TrainerBase):
                 logger.info(
                     f"Epoch: {epoch} | Step: {step} | "
                     f"Batch: {batch} / {train_dataloader.n_batch} | LR: {lr:.3e} | "
-                    f"ms/batch: {batch_time*1000:.1f} | tok/s: {throughput:.0f} | "
+                    f"ms/batch: {batch_time*1000:.1f} | data ms/batch: {stall_time*1000:.1f} | "
+                    f"tok/s: {throughput:.0f} | "
                     f"Loss: {loss:.3f} | PPL: {math.exp(loss):.3f}"
                 )
 
                 start_time = time.time()
+                start_stall_time = train_dataloader.stall_time
 
             do_periodic_eval = step % self.args.eval_steps == 0
             is_final_step = step == self.args.max_steps
 
             # Evaluation and checkpoint
             if (do_periodic_eval or is_final_step) and self.args.do_eval:
-                eval_loss, eval_time = self._evaluation_step(eval_dataloader)
+                eval_loss, eval_time, eval_tokens = self._evaluation_step(eval_dataloader)
                 eval_loss = all_reduce(eval_loss, op="mean")
+                eval_tokens = all_reduce(eval_tokens, op="sum")
 
                 self.trainer_state["log_history"].append(
                     {
@@ -435,6 +590,8 @@ class NvidiaTrainer(TrainerBase):
                         "eval_runtime": eval_time,
                         "eval_loss": eval_loss,
                         "eval_ppl": math.exp(eval_loss),
+                        "eval_tokens": eval_tokens,
+                        "eval_tag": self._get_eval_tag(),
                         "step": step,
                     }
                 )
@@ -446,7 +603,7 @@ class NvidiaTrainer(TrainerBase):
                 )
 
                 iterator = train_dataloader.last_iter
-                save_model = copy.deepcopy(self.model)
+                save_model = self.model
                 prefix = ""
 
                 self.trainer_state["iterator"] = iterator
@@ -456,6 +613,8 @@ class NvidiaTrainer(TrainerBase):
 
                 # Model needs to be converted back to FP32 when using QAT
                 if self.args.qat:
+                    # Conversion is performed in-place, so model needs to be copied
+                    save_model = copy.deepcopy(self.model)
                     qat_to_float_modules(save_model)
                     prefix = "qat-"
 
@@ -481,6 +640,7 @@ class NvidiaTrainer(TrainerBase):
                     prefix=prefix,
                     save_all_checkpoints=self.args.save_all_checkpoints,
                     is_best_model=is_best_model,
+                    checkpoint_writer=self.checkpoint_writer,
                 )
 
             if is_final_step:
@@ -526,7 +686,8 @@ class NvidiaTrainer(TrainerBase):
         try:
             for epoch in itertools.count(start=start_epoch):
                 if self.args.iterator_roll:
-                    train_dataloader.roll(seed=self.args.seed + epoch)
+                    # Next epoch's roll is prepared in background while training
+                    train_dataloader.roll(seed=self.args.seed + epoch, next_seed=self.args.seed + epoch + 1)
 
                 step = self._training_step(train_dataloader, eval_dataloader, iterator, epoch, start_batch, step)
 
@@ -538,29 +699,60 @@ class NvidiaTrainer(TrainerBase):
 
         except KeyboardInterrupt:
             logger.info("Exiting from training ...")
+
+        # Ensures that last checkpoint has been written
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.wait()
         end_time = time.time()
 
         train_time = end_time - start_time
         logger.info(f"Training time: {train_time:.3f} seconds")
 
-    def _evaluation_step(self, eval_dataloader: Iterator) -> Tuple[float, float]:
+    def _get_eval_tag(self) -> str:
+        # Evaluations are only comparable if they use the same settings
+        return (
+            f"bsz={self.args.eval_batch_size}|seq_len={self.args.eval_seq_len}|"
+            f"max_tokens={self.args.eval_max_tokens}|fp16={self.args.eval_fp16}"
+        )
+
+    def _evaluation_step(self, eval_dataloader: Iterator) -> Tuple[float, float, int]:
         self.model.eval()
 
+        # Number of tokens used by each process
+        max_tokens = None
+        if self.args.eval_max_tokens:
+            max_tokens = max(self.args.eval_max_tokens // get_world_size(), 1)
+
+        # `lm1b` uses a different style of data loader, which is stopped once
+        # `max_tokens` are used, while others use a stable subsample of batches
+        if isinstance(eval_dataloader, LMOrderedIterator):
+            max_batches = None
+            if self.args.eval_max_tokens:
+                max_batches = max(self.args.eval_max_tokens // (eval_dataloader.bsz * eval_dataloader.bptt), 1)
+
+            eval_iterator = eval_dataloader.get_fixlen_iter(max_batches=max_batches)
+        else:
+            eval_iterator = eval_dataloader
+
         eval_loss, n_tokens = 0.0, 0
         start_time = time.time()
-        with torch.no_grad():
-            for _, (input_ids, _, _, warm) in enumerate(eval_dataloader):
+        with torch.inference_mode(), self._get_autocast(self.args.eval_fp16):
+            for input_ids, _, _, warm in eval_iterator:
                 loss = self.model(input_ids, labels=input_ids)[0]
                 tokens = input_ids.numel()
                 if warm:
-                    eval_loss += tokens * loss.float().mean().item()
+                    # Loss is accumulated on device and only synchronized at the end
+                    eval_loss += tokens * loss.float().mean()
                     n_tokens += tokens
-            eval_loss /= n_tokens
+
+                if max_tokens is not None and n_tokens >= max_tokens and eval_iterator is eval_dataloader:
+                    break
+            eval_loss = float(eval_loss) / n_tokens
         end_time = time.time()
 
         self.model.train()
 
-        return eval_loss, end_time - start_time
+        return eval_loss, end_time - start_time, n_tokens
 
     @overrides
     def evaluate(self, eval_dataloader: Optional[Iterator] = None) -> Dict[str, Any]:
@@ -578,13 +770,15 @@ class NvidiaTrainer(TrainerBase):
         if not eval_dataloader:
             eval_dataloader = self._get_dataloader("test")
 
-        eval_loss, eval_time = self._evaluation_step(eval_dataloader)
+        eval_loss, eval_time, eval_tokens = self._evaluation_step(eval_dataloader)
 
         eval_metrics = {
             "eval_time": eval_time,
             "eval_loss": eval_loss,
             "eval_ppl": math.exp(eval_loss),
             "eval_bpc": eval_loss / math.log(2),
+            "eval_tokens": eval_tokens,
+            "eval_tag": self._get_eval_tag(),
         }
 
         return eval_metrics
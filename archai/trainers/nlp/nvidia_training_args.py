@@ -83,6 +83,7 @@ class NvidiaTrainingArguments:
         do_eval: Whether to enable evaluation.
         eval_steps: Number of steps between evaluations.
         save_all_checkpoints: Whether to save all checkpoints from `eval_steps` steps.
+        async_checkpoint: Whether checkpoints should be written in background.
         dataset_name: Name of the dataset.
         dataset_dir: Dataset folder.
         dataset_cache_dir: Dataset cache folder.
@@ -90,6 +91,11 @@ class NvidiaTrainingArguments:
         vocab_type: Name of the vocabulary/tokenizer.
         vocab_size: Size of the vocabulary.
         iterator_roll: Whether iterator should be rolled.
+        iterator_prefetch_batches: Number of batches prepared in background by the iterator.
+        eval_batch_size: Global batch size used for evaluation (defaults to `global_batch_size`).
+        eval_seq_len: Sequence length used for evaluation (defaults to `seq_len`).
+        eval_max_tokens: Maximum number of tokens used for evaluation.
+        eval_fp16: Whether FP16 precision should be used during evaluation.
         global_batch_size: Global batch size.
         per_device_global_batch_size: Individual GPU batch size.
         seq_len: Sequence length.
@@ -136,6 +142,10 @@ class NvidiaTrainingArguments:
         default=False, metadata={"help": "Whether to save all checkpoints from `eval_steps` steps."}
     )
 
+    async_checkpoint: bool = field(
+        default=True, metadata={"help": "Whether checkpoints should be written in background."}
+    )
+
     dataset_name: str = field(default="wt103", metadata={"help": "Name of the dataset."})
 
     dataset_dir: str = field(default="", metadata={"help": "Dataset folder."})
@@ -150,6 +160,20 @@ class NvidiaTrainingArguments:
 
     iterator_roll: bool = field(default=True, metadata={"help": "Whether iterator should be rolled."})
 
+    iterator_prefetch_batches: int = field(
+        default=2, metadata={"help": "Number of batches prepared in background by the iterator."}
+    )
+
+    eval_batch_size: int = field(default=None, metadata={"help": "Global batch size used for evaluation."})
+
+    eval_seq_len: int = field(default=None, metadata={"help": "Sequence length used for evaluation."})
+
+    eval_max_tokens: int = field(default=None, metadata={"help": "Maximum number of tokens used for evaluation."})
+
+    eval_fp16: bool = field(
+        default=False, metadata={"help": "Whether FP16 precision should be used during evaluation."}
+    )
+
     global_batch_size: int = field(default=256, metadata={"help": "Global batch size."})
 
     per_device_global_batch_size: int = field(default=None, metadata={"help": "Individual GPU batch size."})
@@ -238,6 +262,11 @@ class NvidiaTrainingArguments:
             world_size = get_world_size()
             self.global_batch_size = world_size * self.per_device_global_batch_size
 
+        if self.eval_batch_size is None:
+            self.eval_batch_size = self.global_batch_size
+        if self.eval_seq_len is None:
+            self.eval_seq_len = self.seq_len
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert attributes into a dictionary representation.
 
@@ -0,0 +1,309 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, Dataset
+
+from archai.common.ordered_dict_logger import OrderedDictLogger
+
+logger = OrderedDictLogger(source=__name__)
+
+TEACHER_TOP_K_VALUES = "teacher_top_k_values"
+TEACHER_TOP_K_INDICES = "teacher_top_k_indices"
+
+_METADATA_FILE_NAME = "metadata.json"
+_VALUES_FILE_NAME = "values.npy"
+_INDICES_FILE_NAME = "indices.npy"
+
+
+class TeacherLogitsCache:
+    """Memory-mapped cache of the top-k logits of a teacher model.
+
+    The cache stores, for every token of every sample of a dataset, the `top_k` largest
+    logits (as `float16`) and their vocabulary indices, which are enough to compute a
+    sparse knowledge distillation loss without running the teacher model.
+
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]) -> None:
+        """Load the cache.
+
+        Args:
+            cache_dir: Folder where the cache is stored.
+
+        """
+
+        self.cache_dir = Path(cache_dir)
+
+        with open(self.cache_dir / _METADATA_FILE_NAME, "r") as f:
+            self.metadata = json.load(f)
+
+        self.values = np.load(self.cache_dir / _VALUES_FILE_NAME, mmap_mode="r")
+        self.indices = np.load(self.cache_dir / _INDICES_FILE_NAME, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def top_k(self) -> int:
+        """Number of logits stored per token."""
+
+        return self.values.shape[-1]
+
+    @staticmethod
+    def exists(
+        cache_dir: Union[str, Path],
+        n_samples: Optional[int] = None,
+        top_k: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+    ) -> bool:
+        """Check whether a complete cache is stored in a folder.
+
+        If any of `n_samples`, `top_k` or `fingerprint` are supplied, they should also
+        match the ones the cache was created with.
+
+        Args:
+            cache_dir: Folder where the cache is stored.
+            n_samples: Number of samples of the dataset.
+            top_k: Number of logits requested per token.
+            fingerprint: Fingerprint of the teacher model and dataset.
+
+        Returns:
+            Whether the cache exists.
+
+        """
+
+        metadata_path = os.path.join(cache_dir, _METADATA_FILE_NAME)
+        if not os.path.exists(metadata_path):
+            return False
+
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+
+        expected_metadata = {"n_samples": n_samples, "top_k": top_k, "fingerprint": fingerprint}
+        return all(metadata.get(k) == v for k, v in expected_metadata.items() if v is not None)
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        return {
+            TEACHER_TOP_K_VALUES: torch.from_numpy(self.values[idx].astype(np.float32)),
+            TEACHER_TOP_K_INDICES: torch.from_numpy(self.indices[idx].astype(np.int64)),
+        }
+
+
+def get_teacher_logits_fingerprint(teacher_model: torch.nn.Module, dataset: Dataset) -> str:
+    """Compute a fingerprint that identifies the teacher logits of a dataset.
+
+    The teacher model is identified by its class, configuration (if available) and a
+    checksum of its parameters, while the dataset is identified by its `_fingerprint`
+    (if it is a Hugging Face dataset), class and number of samples.
+
+    Args:
+        teacher_model: Pre-trained teacher model.
+        dataset: Dataset that the teacher logits are computed over.
+
+    Returns:
+        Fingerprint.
+
+    """
+
+    config = getattr(teacher_model, "config", None)
+    with torch.no_grad():
+        params_checksum = sum(p.detach().double().sum().item() for p in teacher_model.parameters())
+
+    fingerprint = {
+        "teacher_class": type(teacher_model).__name__,
+        "teacher_config": config.to_json_string() if hasattr(config, "to_json_string") else None,
+        "teacher_params_checksum": f"{params_checksum:.8e}",
+        "dataset_fingerprint": getattr(dataset, "_fingerprint", None),
+        "dataset_class": type(dataset).__name__,
+        "dataset_length": len(dataset),
+    }
+
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def create_teacher_logits_cache(
+    teacher_model: torch.nn.Module,
+    dataloader: DataLoader,
+    cache_dir: Union[str, Path],
+    top_k: Optional[int] = 64,
+    device: Optional[Union[str, torch.device]] = None,
+    fingerprint: Optional[str] = None,
+) -> TeacherLogitsCache:
+    """Stream a teacher model over a dataset and cache its top-k logits.
+
+    Batches should be yielded in the order of the dataset (without shuffling), and
+    every sample should have the same sequence length.
+
+    Args:
+        teacher_model: Pre-trained teacher model.
+        dataloader: Data loader of the dataset.
+        cache_dir: Folder where the cache should be stored.
+        top_k: Number of logits stored per token.
+        device: Device where the teacher model is run. If not supplied, uses the
+            device of the teacher model.
+        fingerprint: Fingerprint of the teacher model and dataset, which is stored
+            in the metadata (see `get_teacher_logits_fingerprint()`).
+
+    Returns:
+        Teacher logits cache.
+
+    """
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Previous caches are invalidated before being overwritten
+    if (cache_dir / _METADATA_FILE_NAME).exists():
+        (cache_dir / _METADATA_FILE_NAME).unlink()
+
+    device = device or next(teacher_model.parameters()).device
+    n_samples = len(dataloader.dataset)
+
+    values, indices = None, None
+    n_cached_samples = 0
+
+    teacher_model.eval()
+
+    with torch.inference_mode():
+        for inputs in dataloader:
+            inputs = {k: v.to(device) for k, v in inputs.items() if isinstance(v, torch.Tensor)}
+            logits = teacher_model(**inputs)["logits"]
+
+            batch_top_k = min(top_k, logits.shape[-1])
+            top_k_values, top_k_indices = torch.topk(logits.float(), batch_top_k, dim=-1)
+
+            # Files are only created after the shape of the samples is known
+            if values is None:
+                shape = (n_samples,) + tuple(top_k_values.shape[1:])
+                indices_dtype = np.uint16 if logits.shape[-1] <= np.iinfo(np.uint16).max + 1 else np.int32
+
+                values = np.lib.format.open_memmap(
+                    cache_dir / _VALUES_FILE_NAME, mode="w+", dtype=np.float16, shape=shape
+                )
+                indices = np.lib.format.open_memmap(
+                    cache_dir / _INDICES_FILE_NAME, mode="w+", dtype=indices_dtype, shape=shape
+                )
+
+            if tuple(top_k_values.shape[1:]) != values.shape[1:]:
+                raise ValueError(
+                    f"Samples should have the same length, but got {tuple(top_k_values.shape[1:-1])} "
+                    f"instead of {values.shape[1:-1]}."
+                )
+
+            batch_size = top_k_values.shape[0]
+            values[n_cached_samples : n_cached_samples + batch_size] = top_k_values.cpu().numpy()
+            indices[n_cached_samples : n_cached_samples + batch_size] = top_k_indices.cpu().numpy()
+            n_cached_samples += batch_size
+
+    assert n_cached_samples == n_samples, f"Expected {n_samples} samples, but got {n_cached_samples}."
+
+    values.flush()
+    indices.flush()
+    del values, indices
+
+    # Metadata is written last, so incomplete caches are not loaded
+    metadata = {"n_samples": n_samples, "top_k": top_k, "fingerprint": fingerprint}
+    with open(cache_dir / _METADATA_FILE_NAME, "w") as f:
+        json.dump(metadata, f)
+
+    logger.info(f"Teacher logits cached: {cache_dir}")
+
+    return TeacherLogitsCache(cache_dir)
+
+
+class TeacherLogitsDataset(Dataset):
+    """Dataset that adds the cached teacher logits to the samples of another dataset."""
+
+    def __init__(self, dataset: Dataset, cache: TeacherLogitsCache) -> None:
+        """Initialize the dataset.
+
+        Args:
+            dataset: Dataset that was used to create the cache.
+            cache: Teacher logits cache.
+
+        """
+
+        assert len(dataset) == len(cache), "`dataset` and `cache` should have the same number of samples."
+
+        self.dataset = dataset
+        self.cache = cache
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        sample = dict(self.dataset[idx])
+        sample.update(self.cache[idx])
+
+        return sample
+
+
+class TeacherLogitsCollator:
+    """Collator that stacks the cached teacher logits and collates the remaining features."""
+
+    def __init__(self, data_collator: Callable[[List[Dict[str, Any]]], Dict[str, Any]]) -> None:
+        """Initialize the collator.
+
+        Args:
+            data_collator: Collator of the remaining features.
+
+        """
+
+        self.data_collator = data_collator
+
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(features) == 0 or TEACHER_TOP_K_VALUES not in features[0]:
+            return self.data_collator(features)
+
+        features = [dict(feature) for feature in features]
+        top_k_values = torch.stack([feature.pop(TEACHER_TOP_K_VALUES) for feature in features])
+        top_k_indices = torch.stack([feature.pop(TEACHER_TOP_K_INDICES) for feature in features])
+
+        batch = self.data_collator(features)
+        batch[TEACHER_TOP_K_VALUES] = top_k_values
+        batch[TEACHER_TOP_K_INDICES] = top_k_indices
+
+        return batch
+
+
+def sparse_kd_loss(
+    student_logits: torch.Tensor,
+    teacher_top_k_values: torch.Tensor,
+    teacher_top_k_indices: torch.Tensor,
+    temperature: Optional[float] = 1.0,
+) -> torch.Tensor:
+    """Compute the knowledge distillation loss from the top-k logits of the teacher.
+
+    The teacher distribution is approximated by the softmax over its top-k logits, and the
+    KL divergence is reduced as `nn.KLDivLoss(reduction="batchmean")`. If `top_k` equals the
+    vocabulary size, the loss is the same as the one computed from the full teacher logits.
+
+    Args:
+        student_logits: Logits of the student model.
+        teacher_top_k_values: Top-k logits of the teacher model.
+        teacher_top_k_indices: Indices of the top-k logits of the teacher model.
+        temperature: Annealing ratio for the softmax activations.
+
+    Returns:
+        KD loss (KL divergence scaled by `temperature**2`).
+
+    """
+
+    student_log_probs = F.log_softmax(student_logits.float() / temperature, dim=-1)
+    student_log_probs = student_log_probs.gather(-1, teacher_top_k_indices)
+
+    teacher_log_probs = F.log_softmax(teacher_top_k_values.float() / temperature, dim=-1)
+
+    kl_divergence = (teacher_log_probs.exp() * (teacher_log_probs - student_log_probs)).sum()
+    kl_divergence = kl_divergence / student_logits.shape[0]
+
+    return temperature**2 * kl_divergence
@@ -53,6 +53,14 @@ def parse_args():
         help="Number of few-shot samples.",
     )
 
+    parser.add_argument(
+        "-bs",
+        "--batch_size",
+        type=int,
+        default=1,
+        help="Batch size used for log-likelihood and generation requests.",
+    )
+
     parser.add_argument(
         "-ls",
         "--limit_samples",
@@ -110,7 +118,7 @@ if __name__ == "__main__":
 
     model = AutoModelForCausalLM.from_pretrained(args.pre_trained_model_path)
     tokenizer = AutoTokenizer.from_pretrained(args.hub_tokenizer_path)
-    hf_model = HFEvalModel(model, tokenizer)
+    hf_model = HFEvalModel(model, tokenizer, batch_size=args.batch_size)
 
     outputs = evaluate_wrapper(
         hf_model,
@@ -1,7 +1,8 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import torch
 from lm_eval.base import BaseLM
@@ -21,6 +22,7 @@ class HFEvalModel(BaseLM):
         tokenizer: PreTrainedTokenizer,
         force_attention_mask: Optional[bool] = False,
         max_generated_tokens: Optional[int] = 256,
+        batch_size: Optional[int] = 1,
     ) -> None:
         super().__init__()
 
@@ -34,6 +36,10 @@ class HFEvalModel(BaseLM):
 
         self.force_attention_mask = force_attention_mask
         self.max_generated_tokens = max_generated_tokens
+        self._batch_size = batch_size
+
+        # Stop tokens are shared by most requests, so their encodings are re-used
+        self._encoded_stop_tokens = {}
 
     @property
     def eot_token_id(self) -> int:
@@ -52,7 +58,7 @@ class HFEvalModel(BaseLM):
 
     @property
     def batch_size(self) -> int:
-        return 1
+        return self._batch_size
 
     @property
     def device(self) -> torch.device:
@@ -77,46 +83,96 @@ class HFEvalModel(BaseLM):
     def _model_generate(self, context: str, max_length: int, eos_token_id: int) -> str:
         return self.model.generate(context, max_length=max_length, eos_token_id=eos_token_id, do_sample=False)
 
-    def generate(self, requests: List[Request]) -> List[str]:
+    def _encode_stop_tokens(self, stop_tokens: Union[str, List[str]]) -> Optional[torch.LongTensor]:
+        if not stop_tokens:
+            return None
+
+        key = (stop_tokens,) if isinstance(stop_tokens, str) else tuple(stop_tokens)
+        if key not in self._encoded_stop_tokens:
+            self._encoded_stop_tokens[key] = self.tokenizer(
+                list(key),
+                padding="longest",
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_tensors="pt",
+            )["input_ids"].to(self.device)
+
+        return self._encoded_stop_tokens[key]
+
+    def _generate_batch(
+        self, batch: List[Tuple[List[int], Optional[torch.LongTensor]]], generation_kwargs: Dict[str, Any]
+    ) -> List[str]:
+        # Contexts are left-padded, so generated tokens are aligned across the batch
+        max_context_length = max(len(input_ids) for input_ids, _ in batch)
+        input_ids = torch.full((len(batch), max_context_length), self.eot_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), max_context_length), dtype=torch.long)
+
+        for i, (context_ids, _) in enumerate(batch):
+            input_ids[i, max_context_length - len(context_ids) :] = torch.tensor(context_ids, dtype=torch.long)
+            attention_mask[i, max_context_length - len(context_ids) :] = 1
+
+        # Sequences are stopped individually (by their stop tokens or end-of-sentence token),
+        # and generation only ends when every sequence has been stopped
+        stop_tokens = [encoded_stop_tokens for _, encoded_stop_tokens in batch]
+        stopping_criteria = MultipleTokenStoppingCriteria(
+            stop_tokens, eos_token_id=self.model.generation_config.eos_token_id
+        )
+
+        generated_tokens = self.model.generate(
+            input_ids.to(self.device),
+            attention_mask=attention_mask.to(self.device),
+            pad_token_id=self.eot_token_id,
+            stopping_criteria=StoppingCriteriaList([stopping_criteria]),
+            **generation_kwargs,
+        )
+
         res = []
-        kwargs = {}
+        for i, (context_ids, encoded_stop_tokens) in enumerate(batch):
+            # Defines the number of tokens to be removed when generation ends, i.e.,
+            # largest stop-token (default = 1)
+            n_removal_tokens = encoded_stop_tokens.shape[-1] if encoded_stop_tokens is not None else 1
+
+            stop_length = stopping_criteria.stop_lengths[i] if stopping_criteria.stop_lengths else None
+            stop_length = stop_length or generated_tokens.shape[-1]
+
+            # Removes the padding and generated stop-tokens
+            sequence_tokens = generated_tokens[i, max_context_length - len(context_ids) : stop_length]
+            sequence_tokens = sequence_tokens[:-n_removal_tokens]
+
+            res.append(self.tok_decode(sequence_tokens))
+
+        return res
 
-        for context, stop_tokens, do_sample, temperature, top_p, max_new_tokens in tqdm(requests):
+    def generate(self, requests: List[Request]) -> List[str]:
+        res = [None] * len(requests)
+
+        # Requests are grouped by their generation arguments and sorted by the length
+        # of their contexts, so similarly-sized contexts are batched together
+        grouped_requests = defaultdict(list)
+        for idx, (context, stop_tokens, do_sample, temperature, top_p, max_new_tokens) in enumerate(requests):
             if not context:
-                context = self.eos_token
-
-            # Encodes the context and defines number of tokens to be
-            # removed when generation ends (default = 1)
-            input_ids = self.tokenizer(context, return_tensors="pt")["input_ids"].to(self.device)
-            n_removal_tokens = 1
-
-            if stop_tokens:
-                # Encodes the stop-tokens and defines the number of tokens to be
-                # removed as largest stop-token
-                encoded_stop_tokens = self.tokenizer(
-                    stop_tokens,
-                    padding="longest",
-                    add_special_tokens=False,
-                    return_attention_mask=False,
-                    return_tensors="pt",
-                )["input_ids"].to(self.device)
-                n_removal_tokens = encoded_stop_tokens.shape[-1]
-
-                # Defines the stopping criteria
-                kwargs["stopping_criteria"] = StoppingCriteriaList([MultipleTokenStoppingCriteria(encoded_stop_tokens)])
-
-            # Generates the tokens and removes generated stop-tokens
-            generated_tokens = self.model.generate(
-                input_ids,
-                pad_token_id=self.eot_token_id,
-                do_sample=do_sample,
-                temperature=temperature,
-                top_p=top_p,
-                max_new_tokens=max_new_tokens,
-                **kwargs
-            ).squeeze(0)
-            generated_tokens = generated_tokens[:-n_removal_tokens]
-
-            res.append(self.tok_decode(generated_tokens))
+                context = self.tokenizer.eos_token
+
+            input_ids = self.tokenizer(context)["input_ids"]
+            encoded_stop_tokens = self._encode_stop_tokens(stop_tokens)
+
+            generation_kwargs = (("do_sample", do_sample), ("temperature", temperature), ("top_p", top_p))
+            generation_kwargs += (("max_new_tokens", max_new_tokens),)
+            grouped_requests[generation_kwargs].append((idx, input_ids, encoded_stop_tokens))
+
+        pbar = tqdm(total=len(requests))
+
+        for generation_kwargs, group in grouped_requests.items():
+            group = sorted(group, key=lambda r: -len(r[1]))
+
+            for i in range(0, len(group), self.batch_size):
+                batch = group[i : i + self.batch_size]
+                outputs = self._generate_batch([r[1:] for r in batch], dict(generation_kwargs))
+
+                for (idx, _, _), output in zip(batch, outputs):
+                    res[idx] = output
+                pbar.update(len(batch))
+
+        pbar.close()
 
         return res
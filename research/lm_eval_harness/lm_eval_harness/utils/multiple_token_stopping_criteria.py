@@ -1,19 +1,54 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+from typing import List, Optional, Union
+
 import torch
 from transformers.generation.stopping_criteria import StoppingCriteria
 
 
 class MultipleTokenStoppingCriteria(StoppingCriteria):
-    def __init__(self, stop_tokens: torch.LongTensor) -> None:
+    def __init__(
+        self,
+        stop_tokens: Union[torch.LongTensor, List[Optional[torch.LongTensor]]],
+        eos_token_id: Optional[Union[int, List[int]]] = None,
+    ) -> None:
+        # `stop_tokens` is either shared by all sequences or defined per sequence
+        # (`None` if the sequence does not have stop tokens)
         self.stop_tokens = stop_tokens
-        self.max_stop_tokens = stop_tokens.shape[-1]
+        self.eos_token_id = [eos_token_id] if isinstance(eos_token_id, int) else eos_token_id
+
+        # Length of each sequence when it was stopped (`None` if it has not been stopped yet)
+        self.stop_lengths = None
+
+    def _get_stop_tokens(self, idx: int) -> Optional[torch.LongTensor]:
+        if isinstance(self.stop_tokens, torch.Tensor):
+            return self.stop_tokens
+        return self.stop_tokens[idx]
 
     def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
-        # Only gathers the maximum number of inputs compatible with stop tokens
-        # and checks whether generated inputs are equal to stop_tokens
-        generated_inputs = input_ids[0, -self.max_stop_tokens :]
-        equal_generated_inputs = torch.all(torch.eq(generated_inputs, self.stop_tokens), dim=1)
+        if self.stop_lengths is None:
+            self.stop_lengths = [None] * input_ids.shape[0]
+
+        for i, stop_length in enumerate(self.stop_lengths):
+            if stop_length is not None:
+                continue
+
+            if self.eos_token_id is not None and input_ids[i, -1].item() in self.eos_token_id:
+                self.stop_lengths[i] = input_ids.shape[-1]
+                continue
+
+            stop_tokens = self._get_stop_tokens(i)
+            if stop_tokens is None:
+                continue
+
+            # Only gathers the maximum number of inputs compatible with stop tokens
+            # and checks whether generated inputs are equal to stop_tokens
+            generated_inputs = input_ids[i, -stop_tokens.shape[-1] :]
+            equal_generated_inputs = torch.all(torch.eq(generated_inputs, stop_tokens), dim=1)
+
+            if torch.any(equal_generated_inputs):
+                self.stop_lengths[i] = input_ids.shape[-1]
 
-        return torch.any(equal_generated_inputs)
+        # Generation only stops when every sequence has been stopped
+        return all(stop_length is not None for stop_length in self.stop_lengths)
@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from lm_eval_harness.utils.multiple_token_stopping_criteria import (
+    MultipleTokenStoppingCriteria,
+)
+
+WORDS = [f"w{i}" for i in range(12)]
+
+
+def _get_word_level_tokenizer():
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {token: i for i, token in enumerate(["<unk>", "<eos>"] + WORDS)}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="<unk>", eos_token="<eos>")
+
+
+def test_multiple_token_stopping_criteria():
+    stop_tokens = [torch.LongTensor([[3, 4], [0, 5]]), None, torch.LongTensor([[6]])]
+    criteria = MultipleTokenStoppingCriteria(stop_tokens, eos_token_id=1)
+
+    # Assert that each sequence records the length at which it was stopped
+    assert not criteria(torch.LongTensor([[2, 3], [2, 2], [2, 2]]), None)
+    assert not criteria(torch.LongTensor([[2, 3, 4], [2, 2, 6], [2, 2, 2]]), None)
+    assert criteria.stop_lengths == [3, None, None]
+
+    assert not criteria(torch.LongTensor([[2, 3, 4, 7], [2, 2, 6, 2], [2, 2, 2, 6]]), None)
+    assert criteria.stop_lengths == [3, None, 4]
+
+    assert criteria(torch.LongTensor([[2, 3, 4, 7, 8], [2, 2, 6, 2, 1], [2, 2, 2, 6, 5]]), None)
+    assert criteria.stop_lengths == [3, 5, 4]
+
+
+def test_hf_eval_model_batched_generate():
+    pytest.importorskip("lm_eval")
+    from lm_eval_harness.lm_eval_hf_model import HFEvalModel
+
+    torch.manual_seed(0)
+    tokenizer = _get_word_level_tokenizer()
+
+    # `[PAD]` is added to the tokenizer by `HFEvalModel`, and additional end-of-sentence
+    # tokens make some sequences finish before the others
+    config = GPT2Config(
+        vocab_size=len(tokenizer) + 1,
+        n_positions=64,
+        n_embd=32,
+        n_layer=2,
+        n_head=2,
+        bos_token_id=1,
+        eos_token_id=[1] + tokenizer.convert_tokens_to_ids(["w2", "w9"]),
+        initializer_range=0.2,
+    )
+    model = GPT2LMHeadModel(config).eval()
+
+    # Stop tokens of each request should have the same length, since they are right-padded
+    stop_tokens = [["w3", "w4"], None, ["w0 w8", "w4 w10"], None]
+
+    requests = []
+    for i in range(8):
+        context = " ".join(WORDS[(i * 5 + j) % len(WORDS)] for j in range(1 + (i * 3) % 7))
+        requests.append((context, stop_tokens[i % 4], False, None, None, 12))
+
+    outputs = HFEvalModel(model, tokenizer, batch_size=1).generate(requests)
+    batched_outputs = HFEvalModel(model, tokenizer, batch_size=3).generate(requests)
+
+    # Assert that batched greedy generation (with left-padded contexts) matches unbatched generation
+    assert batched_outputs == outputs
+
+    # Assert that sequences were stopped at different lengths (by stop tokens, end-of-sentence
+    # tokens or `max_new_tokens`), with the last generated token always removed
+    n_generated_tokens = [len(output.split()) - len(request[0].split()) for output, request in zip(outputs, requests)]
+    assert all(output.startswith(request[0]) for output, request in zip(outputs, requests))
+    assert max(n_generated_tokens) == 11
+    assert len(set(n_generated_tokens)) > 3
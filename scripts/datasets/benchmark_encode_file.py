@@ -0,0 +1,104 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+import os
+import tempfile
+from random import Random
+from time import perf_counter
+
+import torch
+
+from archai.datasets.nlp.tokenizer_utils.bbpe_tokenizer import BbpeTokenizer
+from archai.datasets.nlp.tokenizer_utils.tokenizer_base import TokenizerBase
+from archai.datasets.nlp.tokenizer_utils.word_tokenizer import WordTokenizer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks line-by-line and chunked (parallel) file encoding.")
+
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=str,
+        default=None,
+        help="File to be encoded (e.g., `wiki.train.tokens` from wt103). If not set, a synthetic file is created.",
+    )
+
+    parser.add_argument("-l", "--num_lines", type=int, default=200000, help="Number of lines of the synthetic file.")
+
+    parser.add_argument("-t", "--vocab_type", type=str, default="word", help="Type of tokenizer (`word` or `bbpe`).")
+
+    parser.add_argument("-w", "--num_workers", type=int, default=os.cpu_count(), help="Number of workers.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+def _create_synthetic_file(path: str, num_lines: int) -> None:
+    # Mimics the line structure of wt103: headings, empty lines and long paragraphs
+    rng = Random(0)
+    words = [f"w{i}" for i in range(20000)] + ["the", ",", ".", "of", "@-@", "<unk>"] * 2000
+
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(num_lines):
+            if i % 10 == 0:
+                f.write(f" = w{i} = \n")
+            elif i % 2 == 0:
+                f.write(" \n")
+            else:
+                f.write(" " + " ".join(rng.choices(words, k=rng.randint(20, 180))) + " \n")
+
+
+def _legacy_encode_file(tokenizer: TokenizerBase, path: str) -> torch.Tensor:
+    encoded = []
+    tensor_encoded = torch.LongTensor()
+
+    with open(path, "r", encoding="utf-8") as f:
+        for idx, line in enumerate(f):
+            if idx > 0 and idx % 500000 == 0:
+                tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
+                encoded = []
+
+            encoded.extend(tokenizer.encode_text(line))
+
+    if len(encoded) > 0:
+        tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
+
+    return tensor_encoded
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmp_dir, "train.txt")
+            _create_synthetic_file(file_path, args.num_lines)
+
+        if args.vocab_type == "word":
+            tokenizer = WordTokenizer(save_path=os.path.join(tmp_dir, "vocab"))
+        elif args.vocab_type == "bbpe":
+            tokenizer = BbpeTokenizer(save_path=os.path.join(tmp_dir, "vocab"), vocab_size=50257)
+        else:
+            raise ValueError(f"Vocabulary: {args.vocab_type} is not supported.")
+
+        print(f"Training {args.vocab_type} tokenizer on {file_path} ...", flush=True)
+        tokenizer.train([file_path])
+
+        start_time = perf_counter()
+        legacy_encoded = _legacy_encode_file(tokenizer, file_path)
+        legacy_time = perf_counter() - start_time
+        print(f"Line-by-line: {legacy_time:.2f}s ({len(legacy_encoded)} tokens)", flush=True)
+
+        for num_workers in sorted(set([1, args.num_workers])):
+            start_time = perf_counter()
+            encoded = tokenizer.encode_file(file_path, verbose=False, num_workers=num_workers)
+            elapsed_time = perf_counter() - start_time
+
+            assert torch.equal(encoded, legacy_encoded)
+            print(
+                f"Chunked ({num_workers} workers): {elapsed_time:.2f}s ({legacy_time / elapsed_time:.2f}x)", flush=True
+            )
@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+import torch
+
+from archai.discrete_search.predictors.dnn_ensemble import (
+    FFEnsembleMember,
+    PredictiveDNNEnsemble,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks sequential and vectorized DNN ensemble training on CPU.")
+
+    parser.add_argument("-n", "--num_archs", type=int, default=200, help="Number of training architectures.")
+
+    parser.add_argument("-f", "--num_features", type=int, default=40, help="Number of architecture features.")
+
+    parser.add_argument("-e", "--num_ensemble_members", type=int, default=5, help="Number of ensemble members.")
+
+    parser.add_argument("-t", "--num_tr_steps", type=int, default=2_000, help="Number of training steps.")
+
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Random seed.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+def _legacy_fit(X: np.ndarray, y: np.ndarray, args: argparse.Namespace) -> None:
+    Xt = torch.tensor(X, dtype=torch.float32)
+    yt = torch.tensor(y, dtype=torch.float32)
+
+    for _ in range(args.num_ensemble_members):
+        member = FFEnsembleMember(y.shape[1], X.shape[1], num_layers=5, width=64)
+        criterion = torch.nn.MSELoss(reduction="sum")
+        optimizer = torch.optim.Adam(member.parameters(), lr=1e-4)
+        member.train()
+
+        for _ in range(args.num_tr_steps):
+            loss = criterion(member(Xt).squeeze(), yt.squeeze())
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    X = rng.random((args.num_archs, args.num_features))
+    y = rng.random((args.num_archs, 2))
+
+    start = perf_counter()
+    _legacy_fit(X, y, args)
+    legacy_time = perf_counter() - start
+    print(f"Sequential members: {legacy_time:.2f}s", flush=True)
+
+    predictor = PredictiveDNNEnsemble(
+        num_ensemble_members=args.num_ensemble_members,
+        num_tr_steps=args.num_tr_steps,
+        device="cpu",
+        warm_start=True,
+        num_warm_start_tr_steps=args.num_tr_steps // 4,
+    )
+
+    start = perf_counter()
+    predictor.fit(X, y)
+    vectorized_time = perf_counter() - start
+    print(f"Vectorized ensemble: {vectorized_time:.2f}s ({legacy_time / vectorized_time:.2f}x)", flush=True)
+
+    start = perf_counter()
+    predictor.fit(X, y)
+    warm_start_time = perf_counter() - start
+    print(f"Warm-started ensemble: {warm_start_time:.2f}s ({legacy_time / warm_start_time:.2f}x)", flush=True)
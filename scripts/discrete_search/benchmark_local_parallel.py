@@ -0,0 +1,92 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+import multiprocessing
+from time import perf_counter
+
+import torch
+
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.local_parallel import LocalParallelEvaluator
+from archai.discrete_search.evaluators.onnx_model import AvgOnnxLatency
+from archai.discrete_search.evaluators.pt_profiler import (
+    TorchFlops,
+    TorchNumParameters,
+)
+from archai.discrete_search.search_spaces.nlp.transformer_flex.search_space import (
+    TransformerFlexSearchSpace,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks sequential and local parallel evaluation of cheap objectives."
+    )
+
+    parser.add_argument("-n", "--num_models", type=int, default=64, help="Number of models to evaluate.")
+
+    parser.add_argument(
+        "-w",
+        "--num_workers",
+        type=int,
+        nargs="+",
+        default=[2, 4, multiprocessing.cpu_count()],
+        help="Number of workers.",
+    )
+
+    parser.add_argument("-sl", "--seq_len", type=int, default=192, help="Sequence length of the sample input.")
+
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Random seed.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+def _eval_time(evaluator_name, evaluator, models) -> float:
+    objectives = SearchObjectives(cache_objective_evaluation=False)
+    objectives.add_objective(evaluator_name, evaluator, higher_is_better=False, compute_intensive=False)
+
+    start = perf_counter()
+    objectives.eval_cheap_objs(models)
+
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # PyTorch intra-op threads would compete with the pool workers
+    torch.set_num_threads(1)
+
+    search_space = TransformerFlexSearchSpace("gpt2", max_layers=4, random_seed=args.seed)
+    models = [search_space.random_sample() for _ in range(args.num_models)]
+
+    sample_input = torch.zeros(1, args.seq_len, dtype=torch.long)
+
+    # Maps evaluator names to their constructor and whether they are thread-safe
+    evaluators = {
+        "TorchNumParameters": (TorchNumParameters, True),
+        "TorchFlops": (lambda: TorchFlops(forward_args=sample_input), False),
+        "AvgOnnxLatency": (
+            lambda: AvgOnnxLatency(input_shape=(1, args.seq_len), num_trials=5, input_dtype="torch.LongTensor"),
+            True,
+        ),
+    }
+
+    print(f"{'evaluator':>18} {'mode':>10} {'workers':>8} {'time (s)':>10} {'speedup':>9}", flush=True)
+
+    for evaluator_name, (evaluator_fn, thread_safe) in evaluators.items():
+        sequential_time = _eval_time(evaluator_name, evaluator_fn(), models)
+        print(f"{evaluator_name:>18} {'sequential':>10} {1:>8} {sequential_time:10.3f} {1.0:8.1f}x", flush=True)
+
+        for use_processes in ([False, True] if thread_safe else [True]):
+            for num_workers in args.num_workers:
+                evaluator = LocalParallelEvaluator(evaluator_fn(), num_workers=num_workers, use_processes=use_processes)
+                parallel_time = _eval_time(evaluator_name, evaluator, models)
+                evaluator.shutdown()
+
+                mode = "process" if use_processes else "thread"
+                speedup = sequential_time / parallel_time
+                print(f"{evaluator_name:>18} {mode:>10} {num_workers:>8} {parallel_time:10.3f} {speedup:8.1f}x", flush=True)
@@ -0,0 +1,85 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+from random import Random
+from time import perf_counter
+from typing import List
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.utils.mutation import mutate_parents
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks per-candidate and batched mutation constraint checking.")
+
+    parser.add_argument("-p", "--num_parents", type=int, default=100, help="Number of parents.")
+
+    parser.add_argument("-m", "--mutations_per_parent", type=int, default=10, help="Number of mutations per parent.")
+
+    parser.add_argument("-v", "--valid_ratio", type=float, default=0.3, help="Ratio of valid mutations.")
+
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Random seed.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+def _legacy_mutate_parents(
+    parents: List[ArchaiModel], rng: Random, so: SearchObjectives, mutations_per_parent: int, patience: int
+) -> List[ArchaiModel]:
+    mutations = {}
+
+    for p in parents:
+        candidates = {}
+        nb_tries = 0
+
+        while len(candidates) < mutations_per_parent and nb_tries < patience:
+            mutated_model = ArchaiModel(None, str(rng.getrandbits(64)))
+            mutated_model.metadata["parent"] = p.archid
+
+            if not so.is_model_valid(mutated_model):
+                continue
+
+            candidates[mutated_model.archid] = mutated_model
+            nb_tries += 1
+
+        mutations.update(candidates)
+
+    return list(mutations.values())
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Constraint value is a hash of the architecture identifier, so only `valid_ratio` of the mutations are valid
+    so = SearchObjectives()
+    so.add_constraint(
+        "Hash", EvaluationFunction(lambda m, b: (hash(m.archid) % 1000) / 1000), constraint=(0.0, args.valid_ratio)
+    )
+
+    parents = [ArchaiModel(None, str(i)) for i in range(args.num_parents)]
+    patience = int(args.mutations_per_parent / args.valid_ratio * 3)
+
+    rng = Random(args.seed)
+    start = perf_counter()
+    legacy = _legacy_mutate_parents(parents, rng, so, args.mutations_per_parent, patience)
+    legacy_time = perf_counter() - start
+
+    rng = Random(args.seed)
+    start = perf_counter()
+    batched = mutate_parents(
+        parents,
+        lambda p: ArchaiModel(None, str(rng.getrandbits(64))),
+        so,
+        mutations_per_parent=args.mutations_per_parent,
+        patience=patience,
+    )
+    batched_time = perf_counter() - start
+
+    print(f"Per-candidate: {legacy_time:.4f}s ({len(legacy)} mutations)")
+    print(f"Batched: {batched_time:.4f}s ({len(batched)} mutations)")
+    print(f"Speedup: {legacy_time / batched_time:.2f}x")
@@ -0,0 +1,135 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+from time import perf_counter
+from typing import Any, Callable, List
+
+import numpy as np
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.utils.multi_objective import (
+    get_non_dominated_sorting,
+    get_pareto_frontier,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the vectorized Pareto frontier and non-dominated sorting against the loop-based versions."
+    )
+
+    parser.add_argument(
+        "-n", "--num_points", type=int, nargs="+", default=[1000, 10000, 100000], help="Number of points."
+    )
+
+    parser.add_argument("-d", "--num_objectives", type=int, nargs="+", default=[2, 3], help="Number of objectives.")
+
+    parser.add_argument(
+        "-ml",
+        "--max_legacy_points",
+        type=int,
+        default=10000,
+        help="Loop-based versions are skipped above this number of points.",
+    )
+
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Random seed.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+def legacy_find_pareto_frontier_points(all_points: np.ndarray) -> List[int]:
+    pareto_inds = []
+    dim = all_points.shape[1]
+
+    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+
+    for i in unique_indices:
+        is_pareto = True
+
+        for j in unique_indices:
+            if j == i:
+                continue
+
+            if sum((all_points[i, :] - all_points[j, :]) >= 0) == dim:
+                is_pareto = False
+                break
+
+        if is_pareto:
+            pareto_inds.append(i)
+
+    return pareto_inds
+
+
+def legacy_find_non_dominated_sorting(all_points: np.ndarray) -> List[np.ndarray]:
+    def dominates(x, y):
+        for i in range(len(x)):
+            if y[i] < x[i]:
+                return False
+
+        return True
+
+    lex_sorting = np.lexsort(all_points.T[::-1])
+    all_points = all_points.copy()[lex_sorting]
+
+    fronts = []
+
+    for idx in range(all_points.shape[0]):
+        rank = 0
+
+        while rank < len(fronts):
+            if not any(dominates(s, all_points[idx]) for s in all_points[fronts[rank][::-1]]):
+                break
+
+            rank += 1
+
+        if rank >= len(fronts):
+            fronts.append([])
+
+        fronts[rank].append(idx)
+
+    return [lex_sorting[front] for front in fronts]
+
+
+def _time(fn: Callable, *args: Any) -> float:
+    start = perf_counter()
+    fn(*args)
+
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'points':>8} {'objs':>5} {'function':>12} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+
+    for num_objectives in args.num_objectives:
+        for num_points in args.num_points:
+            # Rounds values to also exercise duplicated points
+            points = np.round(rng.random((num_points, num_objectives)), 4)
+
+            models = [ArchaiModel(None, str(i)) for i in range(num_points)]
+            evaluation_results = {f"obj{i}": points[:, i] for i in range(num_objectives)}
+
+            objectives = SearchObjectives()
+            for obj_name in evaluation_results:
+                objectives.add_objective(obj_name, EvaluationFunction(lambda m, b: 0.0), higher_is_better=False)
+
+            for name, legacy_fn, fn in [
+                ("pareto", legacy_find_pareto_frontier_points, get_pareto_frontier),
+                ("nds", legacy_find_non_dominated_sorting, get_non_dominated_sorting),
+            ]:
+                vectorized_time = _time(fn, models, evaluation_results, objectives)
+
+                if num_points <= args.max_legacy_points:
+                    legacy_time = _time(legacy_fn, points)
+                    legacy_str, speedup_str = f"{legacy_time:12.4f}", f"{legacy_time / vectorized_time:8.1f}x"
+                else:
+                    legacy_str, speedup_str = f"{'skipped':>12}", f"{'-':>9}"
+
+                print(f"{num_points:>8} {num_objectives:>5} {name:>12} {legacy_str} {vectorized_time:15.4f} {speedup_str}")
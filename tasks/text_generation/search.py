@@ -5,7 +5,9 @@ import argparse
 
 from archai.discrete_search.algos.evolution_pareto import EvolutionParetoSearch
 from archai.discrete_search.api.search_objectives import SearchObjectives
-from archai.discrete_search.evaluators.nlp.parameters import NonEmbeddingParamsProxy
+from archai.discrete_search.evaluators.nlp.analytical_estimator import (
+    AnalyticalModelSizeProxy,
+)
 from archai.discrete_search.evaluators.nlp.transformer_flex_latency import (
     TransformerFlexOnnxLatency,
 )
@@ -105,7 +107,7 @@ if __name__ == "__main__":
     search_objectives = SearchObjectives()
     search_objectives.add_objective(
         "non_embedding_params",
-        NonEmbeddingParamsProxy(),
+        AnalyticalModelSizeProxy(space),
         higher_is_better=True,
         compute_intensive=False,
         constraint=(1e6, 1e9),
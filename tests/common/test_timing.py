@@ -4,7 +4,7 @@
 import gc
 import time
 
-from archai.common.timing import MeasureBlockTime
+from archai.common.timing import MeasureBlockTime, StepTimer
 
 
 def test_measure_block_time():
@@ -26,3 +26,20 @@ def test_measure_block_time():
         time.sleep(0.5)
         elapsed_time = timer.elapsed
     assert gc.isenabled() is True
+
+
+def test_step_timer():
+    timer = StepTimer()
+
+    for _ in range(2):
+        with timer.measure("forward"):
+            time.sleep(0.1)
+        timer.add("data", 0.2)
+        timer.step()
+
+    # Assert that the times are averaged per step and reset afterwards
+    summary = timer.summary()
+    assert list(summary.keys()) == ["forward", "data"]
+    assert summary["forward"] >= 0.09
+    assert abs(summary["data"] - 0.2) < 1e-6
+    assert timer.summary() == {}
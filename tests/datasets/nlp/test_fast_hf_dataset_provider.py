@@ -2,7 +2,11 @@
 # Licensed under the MIT license.
 
 import shutil
+
+import numpy as np
+
 from archai.datasets.nlp.fast_hf_dataset_provider import FastHfDatasetProvider
+from archai.datasets.nlp.fast_hf_dataset_provider_utils import ShardedTokenArray
 
 TEST_CACHE_DIR='test_fast_hf_dataset_cache'
 
@@ -41,3 +45,46 @@ def test_fast_hf_dataset_provider_from_cache():
         assert len(test_dataset) == 169
 
     shutil.rmtree(TEST_CACHE_DIR)
+
+
+def _get_word_level_tokenizer(words):
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {token: i for i, token in enumerate(["<unk>", "<eos>"] + words)}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="<unk>", eos_token="<eos>")
+
+
+def test_fast_hf_dataset_provider_sharded_cache(tmp_path):
+    from datasets import Dataset
+
+    words = [f"w{i}" for i in range(100)]
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(words, size=rng.integers(1, 50))) for _ in range(500)]
+    Dataset.from_dict({"text": texts}).save_to_disk(tmp_path / "dataset")
+
+    kwargs = {"tokenizer": _get_word_level_tokenizer(words), "use_shared_memory": False}
+    npy_provider = FastHfDatasetProvider.from_disk(
+        (tmp_path / "dataset").as_posix(), cache_dir=tmp_path / "npy_cache", **kwargs
+    )
+    FastHfDatasetProvider.from_disk(
+        (tmp_path / "dataset").as_posix(),
+        cache_dir=tmp_path / "sharded_cache",
+        use_sharded_cache=True,
+        shard_size=1000,
+        **kwargs,
+    )
+
+    # Assert that the sharded cache (and its tokenizer) can be loaded and matches the `.npy` cache
+    sharded_provider = FastHfDatasetProvider.from_cache(tmp_path / "sharded_cache")
+    assert sharded_provider.tokenizer.get_vocab() == kwargs["tokenizer"].get_vocab()
+
+    for split in ["train", "val", "test"]:
+        with getattr(npy_provider, f"get_{split}_dataset")(seq_len=32) as npy_dataset, getattr(
+            sharded_provider, f"get_{split}_dataset"
+        )(seq_len=32) as sharded_dataset:
+            assert isinstance(sharded_dataset.input_ids, ShardedTokenArray)
+            assert np.array_equal(np.asarray(sharded_dataset.input_ids), np.asarray(npy_dataset.input_ids))
@@ -0,0 +1,168 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import io
+
+import numpy as np
+import pytest
+from datasets import Dataset, DatasetDict
+
+from archai.datasets.nlp.fast_hf_dataset_provider_utils import (
+    FastHfDataset,
+    ShardedTokenArray,
+    ShardedTokenWriter,
+    process_with_memory_map_files,
+    process_with_shared_memory,
+    process_with_sharded_cache,
+)
+
+
+@pytest.fixture
+def dataset_dict():
+    rng = np.random.default_rng(0)
+    input_ids = [rng.integers(0, 50_000, size=rng.integers(1, 500)).astype(np.uint16) for _ in range(300)]
+    dataset = Dataset.from_dict({"input_ids": input_ids, "length": [len(ids) for ids in input_ids]})
+
+    # Shuffling creates an indices mapping, which should be respected when writing
+    return DatasetDict({"train": dataset.shuffle(seed=1), "validation": dataset.select(range(10))})
+
+
+def _npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("num_proc", [1, 3])
+def test_process_with_memory_map_files(tmp_path, dataset_dict, num_proc):
+    processed_dataset_dict = process_with_memory_map_files(
+        dataset_dict, tmp_path, np.uint16, num_proc=num_proc, batch_size=7
+    )
+
+    # Assert that the processed arrays match the concatenation of all rows, byte by byte
+    for split, dataset in dataset_dict.items():
+        expected = np.concatenate([np.asarray(ids, dtype=np.uint16) for ids in dataset["input_ids"]])
+        assert _npy_bytes(processed_dataset_dict[split]) == _npy_bytes(expected)
+
+        processed_dataset_dict[split]._mmap.close()
+
+
+@pytest.mark.parametrize("num_proc", [1, 3])
+def test_process_with_shared_memory(dataset_dict, num_proc):
+    processed_dataset_dict = process_with_shared_memory(dataset_dict, np.uint16, num_proc=num_proc, batch_size=7)
+
+    for split, dataset in dataset_dict.items():
+        expected = np.concatenate([np.asarray(ids, dtype=np.uint16) for ids in dataset["input_ids"]])
+        assert _npy_bytes(np.asarray(processed_dataset_dict[split])) == _npy_bytes(expected)
+
+    for array in processed_dataset_dict.values():
+        shm = array.shm
+        del array
+        shm.unlink()
+
+
+def _concatenate_input_ids(examples, calls=None, max_calls=None):
+    # Simulates an interruption after `max_calls` batches
+    if calls is not None:
+        calls[0] += 1
+        if calls[0] > max_calls:
+            raise KeyboardInterrupt
+
+    return {"input_ids": examples["input_ids"]}
+
+
+def test_sharded_token_array(tmp_path):
+    rng = np.random.default_rng(0)
+    tokens = rng.integers(0, 50_000, size=1000).astype(np.uint16)
+
+    writer = ShardedTokenWriter(tmp_path, np.uint16, shard_size=128, metadata={"tokenizer_fingerprint": "abc"})
+    for row, start in enumerate(range(0, len(tokens), 37)):
+        writer.write(tokens[start : start + 37], row)
+    writer.close(row + 1)
+
+    array = ShardedTokenArray(tmp_path)
+    assert len(array) == len(tokens)
+    assert array.num_shards == 8
+    assert array.manifest["metadata"]["tokenizer_fingerprint"] == "abc"
+
+    # Assert that slices within a shard are zero-copy and slices across shards are correct
+    assert isinstance(array[10:20], np.memmap)
+    assert np.array_equal(array[100:300], tokens[100:300])
+    assert np.array_equal(array[-5:], tokens[-5:])
+    assert array[640] == tokens[640]
+    assert np.array_equal(np.asarray(array), tokens)
+
+    # Assert that datasets built on top of sharded arrays match the ones built on plain arrays
+    with FastHfDataset(array, seq_len=64) as sharded_dataset:
+        dataset = FastHfDataset(tokens, seq_len=64)
+        assert len(sharded_dataset) == len(dataset)
+
+        for i in range(len(dataset)):
+            assert all(a.equal(b) for a, b in zip(sharded_dataset[i], dataset[i]))
+
+
+@pytest.mark.parametrize("num_proc", [1, 3])
+def test_process_with_sharded_cache(tmp_path, dataset_dict, num_proc):
+    processed_dataset_dict = process_with_sharded_cache(
+        dataset_dict, tmp_path, _concatenate_input_ids, {}, np.uint16, shard_size=1000, num_proc=num_proc, batch_size=7
+    )
+
+    for split, dataset in dataset_dict.items():
+        expected = np.concatenate([np.asarray(ids, dtype=np.uint16) for ids in dataset["input_ids"]])
+        assert np.array_equal(np.asarray(ShardedTokenArray(processed_dataset_dict[split])), expected)
+
+
+def test_process_with_sharded_cache_resume(tmp_path, dataset_dict):
+    dataset_dict = {"train": dataset_dict["train"]}
+    expected = np.concatenate([np.asarray(ids, dtype=np.uint16) for ids in dataset_dict["train"]["input_ids"]])
+
+    with pytest.raises(KeyboardInterrupt):
+        process_with_sharded_cache(
+            dataset_dict,
+            tmp_path,
+            _concatenate_input_ids,
+            {"calls": [0], "max_calls": 20},
+            np.uint16,
+            shard_size=1000,
+            batch_size=7,
+        )
+
+    # Assert that only completed shards are kept and encoding is resumed from them
+    with pytest.raises(ValueError):
+        ShardedTokenArray(tmp_path / "train")
+
+    metadata = {
+        "batch_size": 7,
+        "dataset_fingerprint": dataset_dict["train"]._fingerprint,
+        "num_rows": len(dataset_dict["train"]),
+    }
+    writer = ShardedTokenWriter(tmp_path / "train", np.uint16, 1000, metadata=metadata)
+    assert 0 < writer.resume_row < len(dataset_dict["train"])
+    assert writer.num_tokens == 1000 * len(writer.manifest["shards"])
+
+    calls = [0]
+    process_with_sharded_cache(
+        dataset_dict,
+        tmp_path,
+        _concatenate_input_ids,
+        {"calls": calls, "max_calls": 1000},
+        np.uint16,
+        shard_size=1000,
+        batch_size=7,
+    )
+    assert calls[0] < (len(dataset_dict["train"]) + 6) // 7
+    assert np.array_equal(np.asarray(ShardedTokenArray(tmp_path / "train")), expected)
+
+
+def test_process_with_sharded_cache_different_dataset(tmp_path, dataset_dict):
+    process_with_sharded_cache(
+        {"train": dataset_dict["train"]}, tmp_path, _concatenate_input_ids, {}, np.uint16, shard_size=1000
+    )
+
+    # Assert that a complete cache is not re-used when the dataset changes
+    dataset = dataset_dict["validation"]
+    process_with_sharded_cache({"train": dataset}, tmp_path, _concatenate_input_ids, {}, np.uint16, shard_size=1000)
+
+    expected = np.concatenate([np.asarray(ids, dtype=np.uint16) for ids in dataset["input_ids"]])
+    assert np.array_equal(np.asarray(ShardedTokenArray(tmp_path / "train")), expected)
@@ -4,6 +4,8 @@
 import torch
 import os
 import shutil
+
+import numpy as np
 from archai.datasets.nlp.tokenizer_utils.gpt2_tokenizer import Gpt2Tokenizer
 from archai.datasets.nlp.nvidia_data_loader_utils import LMOrderedIterator, LMMultiFileIterator
 
@@ -29,6 +31,64 @@ def test_lm_ordered_iterator():
     assert warmup is True
 
 
+def test_lm_ordered_iterator_compact_memmap(tmp_path):
+    input_ids = np.random.default_rng(0).integers(0, 50000, size=1000).astype(np.uint16)
+    np.save(tmp_path / "input_ids.npy", input_ids)
+
+    # Assert that memory-mapped compact inputs yield the same (int64) batches as tensors
+    memmap_iterator = LMOrderedIterator(np.load(tmp_path / "input_ids.npy", mmap_mode="r"), 4, 16, mem_len=32)
+    tensor_iterator = LMOrderedIterator(torch.from_numpy(input_ids.astype(np.int64)), 4, 16, mem_len=32)
+    assert memmap_iterator.input_ids.dtype == np.uint16
+
+    memmap_iterator.roll(1)
+    tensor_iterator.roll(1)
+
+    for memmap_batch, tensor_batch in zip(memmap_iterator, tensor_iterator):
+        assert memmap_batch[0].dtype == torch.long
+        assert torch.equal(memmap_batch[0], tensor_batch[0])
+        assert torch.equal(memmap_batch[1], tensor_batch[1])
+
+
+def test_lm_ordered_iterator_roll():
+    input_ids = np.random.default_rng(0).integers(0, 50000, size=1000).astype(np.uint16)
+    iterator = LMOrderedIterator(input_ids, 4, 16)
+    expected_input_ids = iterator.input_ids.copy()
+
+    iterator.roll(1)
+
+    # Assert that rolling shifts each row by a shift drawn from the seeded generator
+    rng = torch.Generator()
+    rng.manual_seed(1)
+    for i in range(expected_input_ids.shape[0]):
+        shift = int(torch.randint(0, expected_input_ids.shape[1], (1,), generator=rng))
+        expected_input_ids[i] = np.roll(expected_input_ids[i], -shift)
+
+    assert np.array_equal(iterator.input_ids, expected_input_ids)
+
+
+def test_lm_ordered_iterator_prefetch():
+    input_ids = np.random.default_rng(0).integers(0, 50000, size=1003).astype(np.uint16)
+    iterator = LMOrderedIterator(input_ids, 4, 16, mem_len=32, ext_len=4)
+    prefetched_iterator = LMOrderedIterator(input_ids, 4, 16, mem_len=32, ext_len=4, num_prefetch_batches=2)
+
+    # Assert that prefetching (including the next epoch's roll) does not change the batches
+    for epoch in range(3):
+        iterator.roll(epoch)
+        prefetched_iterator.roll(epoch, next_seed=epoch + 1)
+
+        batches = list(iterator.get_fixlen_iter())
+        prefetched_batches = list(prefetched_iterator.get_fixlen_iter())
+
+        assert len(batches) == len(prefetched_batches)
+        for batch, prefetched_batch in zip(batches, prefetched_batches):
+            assert torch.equal(batch[0], prefetched_batch[0])
+            assert torch.equal(batch[1], prefetched_batch[1])
+            assert batch[2:] == prefetched_batch[2:]
+
+    assert prefetched_iterator.last_iter == iterator.last_iter
+    assert prefetched_iterator.stall_time > 0.0
+
+
 def test_lm_multi_file_iterator():
     input_files = [f"tmp_{i}.txt" for i in range(5)]
     for input_file in input_files:
@@ -49,3 +109,52 @@ def test_lm_multi_file_iterator():
     for input_file in input_files:
         os.remove(input_file)
     shutil.rmtree("tokenizer")
+
+
+def test_lm_multi_file_iterator_stream_iterator():
+    iterator = LMMultiFileIterator(["tmp.txt"], None, 2, 4, ext_len=2)
+    sequences = torch.arange(23)
+
+    # Assert that each row is filled with a contiguous block of `bptt + 1` tokens
+    # and the last `ext_len` inputs are retained from the previous batch
+    batches = list(iterator.stream_iterator(sequences))
+    assert len(batches) == 2
+
+    input_ids, labels, seq_len, warmup = batches[0]
+    assert input_ids.tolist() == [[0, 1, 2, 3], [5, 6, 7, 8]]
+    assert labels.tolist() == [[1, 2, 3, 4], [6, 7, 8, 9]]
+
+    input_ids, labels, seq_len, warmup = batches[1]
+    assert input_ids.tolist() == [[2, 3, 10, 11, 12, 13], [7, 8, 15, 16, 17, 18]]
+    assert labels.tolist() == [[11, 12, 13, 14], [16, 17, 18, 19]]
+    assert seq_len == 4
+
+
+def test_lm_multi_file_iterator_prefetch():
+    class Vocab:
+        def encode_file(self, path):
+            return torch.arange(int(path))
+
+    paths = ["1000", "2000", "500"]
+    batches = list(LMMultiFileIterator(paths, Vocab(), 4, 8, n_chunks=2))
+    prefetched_batches = list(LMMultiFileIterator(paths, Vocab(), 4, 8, n_chunks=2, num_prefetch_batches=3))
+
+    # Assert that prefetching does not change the batches
+    assert len(batches) == len(prefetched_batches) == 92
+    for batch, prefetched_batch in zip(batches, prefetched_batches):
+        assert torch.equal(batch[0], prefetched_batch[0])
+        assert torch.equal(batch[1], prefetched_batch[1])
+
+
+def test_lm_ordered_iterator_max_batches():
+    input_ids = np.arange(1000)
+    iterator = LMOrderedIterator(input_ids, 4, 16)
+    batches = list(iterator.get_fixlen_iter())
+
+    # Assert that a stable subsample of evenly spaced batches is returned
+    subsampled_batches = list(iterator.get_fixlen_iter(max_batches=4))
+    assert len(subsampled_batches) == 4
+    assert torch.equal(subsampled_batches[0][0], batches[0][0])
+    assert torch.equal(subsampled_batches[-1][0], batches[-1][0])
+
+    assert len(list(iterator.get_fixlen_iter(max_batches=100))) == len(batches)
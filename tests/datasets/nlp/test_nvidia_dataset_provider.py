@@ -4,6 +4,8 @@
 import os
 import shutil
 
+import numpy as np
+
 from archai.datasets.nlp.nvidia_dataset_provider import NvidiaDatasetProvider
 
 
@@ -31,5 +33,13 @@ def test_nvidia_dataset_provider():
     test_dataset = dataset_provider.get_test_dataset()
     assert len(test_dataset) == 6
 
+    # Assert that the cache is stored with a compact data type and loaded as a memory map
+    dataset_provider = NvidiaDatasetProvider("olx_tmp", dataset_dir=f"{unique_data_root}/olx_tmp")
+
+    train_dataset = dataset_provider.get_train_dataset()
+    assert isinstance(train_dataset, np.memmap)
+    assert train_dataset.dtype == np.uint16
+    assert len(train_dataset) == 7
+
     shutil.rmtree("cache")
     shutil.rmtree(unique_data_root)
@@ -0,0 +1,21 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from archai.datasets.nlp.tokenizer_utils.bbpe_tokenizer import BbpeTokenizer
+
+
+def test_bbpe_tokenizer_encode_lines(tmp_path):
+    lines = [f"line {i} with some café text @-@ {i * 7}\n" for i in range(200)] + ["\n", ""]
+    path = tmp_path / "train.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+    tokenizer = BbpeTokenizer(save_path=(tmp_path / "vocab").as_posix(), vocab_size=300, eos_token="_EOS_")
+    tokenizer.train([path.as_posix()])
+
+    # Assert that batched encoding matches encoding line by line
+    assert tokenizer.encode_lines(lines) == [tokenizer.encode_text(line) for line in lines]
+
+    tokenizer.encode_special_tokens = True
+    assert tokenizer.encode_lines(lines) == [tokenizer.encode_text(line) for line in lines]
+    assert tokenizer.encode_lines([]) == []
@@ -1,11 +1,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import random
+
 import pytest
+import torch
 from overrides import overrides
 
 from archai.datasets.nlp.tokenizer_utils.token_config import SpecialTokenEnum
 from archai.datasets.nlp.tokenizer_utils.tokenizer_base import TokenizerBase
+from archai.datasets.nlp.tokenizer_utils.word_tokenizer import WordTokenizer
 
 
 @pytest.fixture
@@ -96,3 +100,37 @@ def test_tokenizer_base_token_to_id(tokenizer_base):
 
 def test_tokenizer_base_id_to_token(tokenizer_base):
     assert tokenizer_base.id_to_token(5) == "token"
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    rng = random.Random(0)
+    words = ["the", "of", "@-@", "café", "naïve", "=", "<unk>", "1", "São"]
+    newlines = ["\n", "\n", "\n", "\r\n", "\r"]
+
+    lines = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 30))) + rng.choice(newlines) for _ in range(2000)]
+    path = tmp_path / "train.txt"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("".join(lines) + "no newline at the end")
+
+    return path.as_posix()
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_tokenizer_base_encode_file(tmp_path, text_file, num_workers):
+    tokenizer = WordTokenizer(save_path=(tmp_path / "vocab").as_posix(), vocab_size=8)
+    tokenizer.train([text_file])
+
+    expected = []
+    with open(text_file, "r", encoding="utf-8") as f:
+        for line in f:
+            expected.extend(tokenizer.encode_text(line))
+
+    # Assert that encoding small chunks (in parallel or not) matches encoding line by line
+    encoded = tokenizer.encode_file(text_file, num_workers=num_workers, chunk_size=1000)
+    assert encoded.dtype == torch.long
+    assert encoded.tolist() == expected
+
+    encoded = tokenizer.encode_file(text_file, num_workers=num_workers, dtype=torch.int32)
+    assert encoded.dtype == torch.int32
+    assert encoded.tolist() == expected
@@ -27,3 +27,17 @@ def test_random_search(output_dir, search_space, search_objectives):
     # Checks if all registered models satisfy constraints
     _, valid_models = search_objectives.validate_constraints(all_models)
     assert len(valid_models) == len(all_models)
+
+
+def test_random_search_append_search_state(tmp_path, search_space, search_objectives):
+    algo = RandomSearch(
+        search_space, search_objectives, tmp_path, num_iters=2, samples_per_iter=5, append_search_state=True
+    )
+
+    search_results = algo.search()
+    assert not list(tmp_path.glob("search_state_*.csv"))
+
+    state_df = search_results.get_search_state_df()
+    loaded_state_df = search_results.load_search_state(tmp_path / "search_state")
+    assert list(loaded_state_df.columns) == list(state_df.columns)
+    assert loaded_state_df["archid"].tolist() == state_df["archid"].tolist()
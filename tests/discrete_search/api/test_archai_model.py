@@ -20,3 +20,28 @@ def test_archai_model():
         str(archai_model)
         == "ArchaiModel(\n\tarchid=test_archid, \n\tmetadata={'key': 'value'}, \n\tarch=Linear(in_features=10, out_features=1, bias=True)\n)"
     )
+
+
+def test_archai_model_lazy_build():
+    num_builds = []
+
+    def build_arch():
+        num_builds.append(1)
+        return torch.nn.Linear(10, 1)
+
+    archai_model = ArchaiModel(None, "test_archid", arch_builder=build_arch)
+
+    # Assert that the model is only built on first access
+    assert not archai_model.is_built
+    assert "<not built>" in str(archai_model)
+    assert len(num_builds) == 0
+
+    assert isinstance(archai_model.arch, torch.nn.Linear)
+    assert archai_model.arch is archai_model.arch
+    assert archai_model.is_built
+    assert len(num_builds) == 1
+
+    # Assert that clearing the model does not build it again
+    archai_model.clear()
+    assert archai_model.arch is None
+    assert len(num_builds) == 1
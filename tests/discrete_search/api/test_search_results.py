@@ -11,6 +11,7 @@ from archai.discrete_search.evaluators.pt_profiler import TorchNumParameters
 from archai.discrete_search.search_spaces.nlp.transformer_flex.search_space import (
     TransformerFlexSearchSpace,
 )
+from archai.discrete_search.utils.multi_objective import get_pareto_frontier
 
 
 def test_search_results():
@@ -45,3 +46,98 @@ def test_add_iteration_results():
     assert len(search_results.results) == 1
     assert len(search_results.results[0]["models"]) == 1
     assert search_results.results[0][obj_name][0] == 0.5
+
+
+def test_incremental_pareto_frontier(tmp_path):
+    search_space = TransformerFlexSearchSpace("gpt2")
+
+    objectives = SearchObjectives()
+    objectives.add_objective("obj1", TorchNumParameters(), higher_is_better=False)
+    objectives.add_objective("obj2", TorchNumParameters(), higher_is_better=True)
+    objectives.add_objective("obj3", TorchNumParameters(), higher_is_better=False)
+
+    search_results = SearchResults(search_space, objectives)
+    rng = np.random.default_rng(0)
+
+    for it in range(5):
+        models = [ArchaiModel(torch.nn.Linear(10, 1), f"archid_{it}_{i}") for i in range(20)]
+        evaluation_results = {obj_name: np.round(rng.random(20), 1) for obj_name in objectives.objective_names}
+        search_results.add_iteration_results(models, evaluation_results)
+
+        all_models = [m for r in search_results.results for m in r["models"]]
+        all_results = {
+            obj_name: np.concatenate([r[obj_name] for r in search_results.results])
+            for obj_name in objectives.objective_names
+        }
+
+        # Assert that the archive matches the pareto-frontier recomputed from scratch
+        pareto_frontier = search_results.get_pareto_frontier()
+        expected = get_pareto_frontier(all_models, all_results, objectives)
+
+        assert np.array_equal(pareto_frontier["indices"], expected["indices"])
+        assert [m.archid for m in pareto_frontier["models"]] == [m.archid for m in expected["models"]]
+        assert all(
+            np.array_equal(pareto_frontier["evaluation_results"][obj_name], expected["evaluation_results"][obj_name])
+            for obj_name in objectives.objective_names
+        )
+
+    # Assert that frontiers of previous iterations are kept
+    expected = get_pareto_frontier(
+        all_models[:40], {obj_name: r[:40] for obj_name, r in all_results.items()}, objectives
+    )
+    pareto_frontier = search_results.get_pareto_frontier(end_iteration=2)
+
+    assert np.array_equal(pareto_frontier["indices"], expected["indices"])
+    assert np.all(pareto_frontier["iteration_nums"] < 2)
+
+    state_df = search_results.get_search_state_df()
+    assert state_df["is_pareto"].sum() == len(search_results.get_pareto_frontier()["indices"])
+
+    search_results.save_all_2d_pareto_evolution_plots(tmp_path)
+    assert len(list(tmp_path.glob("*.png"))) == 3
+
+
+def test_search_state_storage(tmp_path):
+    search_space = TransformerFlexSearchSpace("gpt2")
+
+    objectives = SearchObjectives()
+    objectives.add_objective("obj1", TorchNumParameters(), higher_is_better=False)
+    objectives.add_objective("obj2", TorchNumParameters(), higher_is_better=True)
+
+    search_results = SearchResults(search_space, objectives)
+    rng = np.random.default_rng(0)
+
+    for it in range(3):
+        models = [ArchaiModel(torch.nn.Linear(10, 1), f"archid_{it}_{i}") for i in range(1500)]
+        evaluation_results = {obj_name: rng.random(1500) for obj_name in objectives.objective_names}
+        extra_model_data = {"extra": [[it, i] for i in range(1500)]} if it > 0 else None
+
+        search_results.add_iteration_results(models, evaluation_results, extra_model_data)
+        search_results.append_search_state(tmp_path / "search_state")
+
+    # Assert that the columns hold the whole search history
+    all_evaluated_objs = search_results.all_evaluated_objs
+    assert all(len(r) == 4500 for r in all_evaluated_objs.values())
+    assert np.array_equal(all_evaluated_objs["obj1"], np.concatenate([r["obj1"] for r in search_results.results]))
+    assert len(search_results.search_walltimes) == 4500
+
+    # Assert that the data frame and the append-only state have the same content
+    state_df = search_results.get_search_state_df()
+    assert list(state_df.columns) == [
+        "archid",
+        "obj1",
+        "obj2",
+        "extra",
+        "iteration_num",
+        "search_walltime_hours",
+        "is_pareto",
+    ]
+    assert state_df["extra"].isna().sum() == 1500
+    assert state_df["archid"].iloc[1500] == "archid_1_0"
+
+    loaded_state_df = SearchResults.load_search_state(tmp_path / "search_state")
+    assert list(loaded_state_df.columns) == list(state_df.columns)
+    assert len(loaded_state_df) == len(state_df)
+    assert loaded_state_df["extra"].iloc[1500] == str([1, 0])
+    assert np.array_equal(loaded_state_df["obj2"].values, state_df["obj2"].values)
+    assert np.array_equal(loaded_state_df["is_pareto"].values, state_df["is_pareto"].values)
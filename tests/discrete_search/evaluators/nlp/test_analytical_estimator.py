@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+import torch
+
+from archai.discrete_search.evaluators.nlp.analytical_estimator import (
+    AnalyticalModelSizeProxy,
+)
+from archai.discrete_search.evaluators.nlp.parameters import (
+    NonEmbeddingParamsProxy,
+)
+from archai.discrete_search.evaluators.pt_profiler import TorchMacs
+from archai.discrete_search.search_spaces.nlp import (
+    TfppSearchSpace,
+    TransformerFlexSearchSpace,
+)
+
+
+@pytest.mark.parametrize("arch_type", ["codegen", "gpt2", "gpt2-flex"])
+def test_analytical_model_size_proxy_transformer_flex(arch_type):
+    search_space = TransformerFlexSearchSpace(
+        arch_type,
+        max_layers=3,
+        d_inner_options=[64, 256],
+        d_model_options=[64, 128],
+        share_d_inner=arch_type != "gpt2-flex",
+        vocab_size=1000,
+        max_sequence_length=128,
+    )
+    proxy = AnalyticalModelSizeProxy(search_space)
+
+    # Assert that the estimated parameters match the instantiated models
+    for _ in range(3):
+        arch = search_space.random_sample()
+        estimate = proxy.estimate(arch)
+
+        assert estimate.non_embedding_params == NonEmbeddingParamsProxy(trainable_only=False).evaluate(arch)
+        assert estimate.total_params == sum(param.numel() for param in arch.arch.parameters())
+        assert proxy.evaluate(arch) == estimate.non_embedding_params
+
+
+def test_analytical_model_size_proxy_transformer_flex_flops():
+    search_space = TransformerFlexSearchSpace(
+        "gpt2-flex", max_layers=2, d_model_options=[64], vocab_size=1000, max_sequence_length=128
+    )
+    arch = search_space.random_sample()
+
+    # Assert that the estimated FLOPs match the profiled MACs
+    seq_len = 32
+    flops_per_token = AnalyticalModelSizeProxy(search_space, metric="flops_per_token", seq_len=seq_len).evaluate(arch)
+    macs = TorchMacs(torch.randint(0, 1000, (1, seq_len)), forward_kwargs={"use_cache": False}).evaluate(arch)
+    assert flops_per_token * seq_len == 2 * macs
+
+
+@pytest.mark.parametrize("backbone", ["codegen", "gpt2"])
+@pytest.mark.parametrize("op_name", ["mha", "sep_conv1d", "sgconv", "sgconv3", "local_attn", "lsh_attn"])
+def test_analytical_model_size_proxy_tfpp(backbone, op_name):
+    search_space = TfppSearchSpace(
+        backbone,
+        embed_dims=[96],
+        inner_dims=[128],
+        total_heads=[6],
+        total_layers=[2],
+        local_attn_window_sizes=[16],
+        sgconv_kernel_sizes=[16],
+        sconv1d_kernel_sizes=[8],
+        lsh_attn_bucket_size=[16],
+        op_subset=[op_name],
+        mixed_ops=False,
+        seed=1,
+        n_positions=128,
+        vocab_size=500,
+    )
+    proxy = AnalyticalModelSizeProxy(search_space, metric="total_params")
+
+    # Assert that the estimated parameters match the instantiated models
+    arch = search_space.random_sample()
+    estimate = proxy.estimate(arch)
+
+    assert estimate.non_embedding_params == NonEmbeddingParamsProxy(trainable_only=False).evaluate(arch)
+    assert proxy.evaluate(arch) == sum(param.numel() for param in arch.arch.parameters())
+    assert estimate.flops_per_token > 0
@@ -3,6 +3,13 @@
 
 import pytest
 
+from archai.discrete_search.evaluators.nlp import onnx_artifact_store
+from archai.discrete_search.evaluators.nlp.onnx_artifact_store import (
+    OnnxArtifactStore,
+)
+from archai.discrete_search.evaluators.nlp.transformer_flex_latency import (
+    TransformerFlexOnnxLatency,
+)
 from archai.discrete_search.evaluators.nlp.transformer_flex_memory import (
     TransformerFlexOnnxMemory,
 )
@@ -23,3 +30,26 @@ def test_transformer_flex_onnx_memory(search_space):
     # Assert that the returned memory is valid
     memory = objective.evaluate(arch)
     assert memory > 0.0
+
+
+def test_transformer_flex_onnx_memory_artifact_store(search_space, tmp_path, monkeypatch):
+    arch = search_space.random_sample()
+    artifact_store = OnnxArtifactStore(tmp_path)
+
+    n_exports = 0
+    export_to_onnx = onnx_artifact_store.export_to_onnx
+
+    def _export_to_onnx(*args, **kwargs):
+        nonlocal n_exports
+        n_exports += 1
+        return export_to_onnx(*args, **kwargs)
+
+    monkeypatch.setattr(onnx_artifact_store, "export_to_onnx", _export_to_onnx)
+
+    # Assert that evaluators sharing a store only export the architecture once
+    latency_objective = TransformerFlexOnnxLatency(search_space, artifact_store=artifact_store)
+    memory_objective = TransformerFlexOnnxMemory(search_space, artifact_store=artifact_store)
+    assert latency_objective.evaluate(arch) > 0.0
+    assert memory_objective.evaluate(arch) > 0.0
+    assert memory_objective.evaluate(arch) == memory_objective.evaluate(arch)
+    assert n_exports == 1
@@ -0,0 +1,75 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import time
+
+import pytest
+import torch
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.evaluators.local_parallel import LocalParallelEvaluator
+from archai.discrete_search.evaluators.pt_profiler import TorchNumParameters
+
+
+def _slow_archid(model, budget):
+    time.sleep(0.01 * (int(model.archid) % 3))
+    return float(model.archid)
+
+
+def _failing_archid(model, budget):
+    if model.archid == "fail":
+        raise ValueError("Evaluation failed.")
+
+    return float(model.archid)
+
+
+def test_local_parallel_evaluator():
+    models = [ArchaiModel(torch.nn.Linear(i + 1, 1), str(i)) for i in range(10)]
+
+    for use_processes in [False, True]:
+        evaluator = LocalParallelEvaluator(TorchNumParameters(), num_workers=2, use_processes=use_processes)
+
+        # Assert that results are returned in the same order as they were sent
+        for model in models:
+            evaluator.send(model)
+        assert evaluator.fetch_all() == [i + 2 for i in range(10)]
+
+        evaluator.shutdown()
+
+
+def test_local_parallel_evaluator_search_objectives():
+    models = [ArchaiModel(torch.nn.Linear(i + 1, 1), str(i)) for i in range(10)]
+
+    objectives = SearchObjectives()
+    objectives.add_objective(
+        "archid",
+        LocalParallelEvaluator(EvaluationFunction(_slow_archid), num_workers=4),
+        higher_is_better=False,
+        compute_intensive=False,
+        constraint=(0, 4),
+    )
+
+    # Assert that parallel evaluators can be used as constraints
+    _, valid_indices = objectives.validate_constraints(models)
+    assert list(valid_indices) == [0, 1, 2, 3, 4]
+
+    results = objectives.eval_cheap_objs(models)
+    assert list(results["archid"]) == [float(i) for i in range(10)]
+
+
+def test_local_parallel_evaluator_failure():
+    evaluator = LocalParallelEvaluator(EvaluationFunction(_failing_archid), num_workers=2)
+
+    evaluator.send(ArchaiModel(torch.nn.Linear(1, 1), "fail"))
+    evaluator.send(ArchaiModel(torch.nn.Linear(1, 1), "1"))
+    with pytest.raises(ValueError):
+        evaluator.fetch_all()
+
+    # Assert that a failing batch does not affect the next one
+    assert len(evaluator.futures) == 0
+    evaluator.send(ArchaiModel(torch.nn.Linear(1, 1), "2"))
+    assert evaluator.fetch_all() == [2.0]
+
+    evaluator.shutdown()
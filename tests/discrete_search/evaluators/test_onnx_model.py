@@ -0,0 +1,63 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pickle
+
+import torch
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.evaluators.onnx_model import AvgOnnxLatency
+
+
+def _build_models():
+    return [
+        ArchaiModel(torch.nn.Sequential(torch.nn.Linear(16, width), torch.nn.ReLU()), f"linear_{width}")
+        for width in [8, 16, 32]
+    ]
+
+
+def test_avg_onnx_latency(tmp_path):
+    models = _build_models()
+
+    evaluator = AvgOnnxLatency(
+        input_shape=(1, 16),
+        num_trials=5,
+        num_warmups=2,
+        metric="median",
+        num_threads=1,
+        export_cache_dir=tmp_path / "onnx_cache",
+        session_cache_size=2,
+    )
+
+    latencies = [evaluator.evaluate(model) for model in models]
+    assert all(latency > 0 for latency in latencies)
+    assert len(list((tmp_path / "onnx_cache").glob("*.onnx"))) == 3
+    assert len(evaluator._sessions) == 2
+
+    # Assert that cached exports are used without accessing the model object
+    evaluator2 = pickle.loads(pickle.dumps(evaluator))
+    assert len(evaluator2._sessions) == 0
+
+    lazy_model = ArchaiModel(None, "linear_8", arch_builder=lambda: 1 / 0)
+    assert evaluator2.evaluate(lazy_model) > 0
+    assert not lazy_model.is_built
+
+
+def test_avg_onnx_latency_cache_eviction(tmp_path):
+    models = _build_models()
+
+    evaluator = AvgOnnxLatency(input_shape=(1, 16), export_cache_dir=tmp_path, session_cache_size=0)
+    evaluator.evaluate(models[0])
+    max_export_cache_size = evaluator.export_cache.size
+
+    # Assert that the least recently used exports are evicted
+    evaluator = AvgOnnxLatency(
+        input_shape=(1, 16),
+        export_cache_dir=tmp_path,
+        max_export_cache_size=max_export_cache_size,
+        session_cache_size=0,
+    )
+    evaluator.evaluate(models[1])
+
+    assert len(list(tmp_path.glob("*.onnx"))) == 1
+    assert f"linear_16|{[(1, 16)]}|torch.FloatTensor|[]" in evaluator.export_cache
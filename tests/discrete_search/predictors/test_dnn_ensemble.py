@@ -2,8 +2,13 @@
 # Licensed under the MIT license.
 
 import numpy as np
+import torch
 
-from archai.discrete_search.predictors.dnn_ensemble import PredictiveDNNEnsemble
+from archai.discrete_search.predictors.dnn_ensemble import (
+    FFEnsemble,
+    FFEnsembleMember,
+    PredictiveDNNEnsemble,
+)
 
 
 def test_dnn_ensemble():
@@ -17,3 +22,41 @@ def test_dnn_ensemble():
 
     assert y_pred.mean.shape == (50, 2)
     assert y_pred.var.shape == (50, 2)
+
+
+def test_dnn_ensemble_warm_start():
+    X_train = np.random.rand(100, 5)
+    y_train = np.random.rand(100, 2)
+
+    predictor = PredictiveDNNEnsemble(num_tr_steps=10, device="cpu", warm_start=True, num_warm_start_tr_steps=5)
+    predictor.fit(X_train, y_train)
+    ensemble = predictor.ensemble
+
+    # Assert that the ensemble is re-used when input and output sizes do not change
+    predictor.fit(X_train, y_train)
+    assert predictor.ensemble is ensemble
+
+    predictor.fit(X_train[:, :4], y_train)
+    assert predictor.ensemble is not ensemble
+    assert predictor.predict(X_train[:, :4]).mean.shape == (100, 2)
+
+
+def test_ff_ensemble_matches_members():
+    ensemble = FFEnsemble(num_ensemble_members=3, num_objectives=2, input_feat_len=5, num_layers=4, width=8)
+    x = torch.rand(10, 5)
+
+    members = []
+    for i in range(3):
+        member = FFEnsembleMember(num_objectives=2, input_feat_len=5, num_layers=4, width=8)
+        layers = list(member.linears) + [member.output]
+
+        with torch.no_grad():
+            for layer, weight, bias in zip(layers, ensemble.weights, ensemble.biases):
+                layer.weight.copy_(weight[i].T)
+                layer.bias.copy_(bias[i, 0])
+
+        members.append(member)
+
+    # Assert that the stacked ensemble computes the same outputs as separate members
+    with torch.no_grad():
+        assert torch.allclose(ensemble(x), torch.stack([m(x) for m in members]), atol=1e-6)
@@ -1,9 +1,12 @@
+import numpy as np
 import pytest
 from random import Random
 from archai.discrete_search.search_spaces.config import (
     ArchConfig, ArchParamTree, ConfigSearchSpace, DiscreteChoice,
     repeat_config
 )
+from archai.discrete_search.search_spaces.config.arch_config import build_arch_config
+from archai.discrete_search.search_spaces.config.utils import replace_ptree_choices
 
 
 @pytest.fixture
@@ -132,3 +135,94 @@ def test_ss_archid(rng, tree_c2):
     assert len(archids) == 3 # Will fail with probability approx 1/2^100
 
 
+
+
+def test_ss_lazy_model_build(tree_c1):
+    tree = ArchParamTree(tree_c1)
+    built_configs = []
+
+    def use_arch(c):
+        built_configs.append(c)
+        return c.pick('param1')
+
+    ss = ConfigSearchSpace(use_arch, tree, seed=1, lazy_model_build=True)
+    eager_ss = ConfigSearchSpace(use_arch, tree, seed=1, track_unused_params=False)
+
+    m = ss.random_sample()
+    m2 = ss.mutate(m)
+    m3 = ss.crossover([m, m2])
+
+    # Assert that identifiers and encodings do not require building the models
+    assert len(built_configs) == 0
+    assert m.archid == eager_ss.random_sample().archid
+    assert len(ss.encode(m3)) == len(eager_ss.encode(m3))
+    assert not any(model.is_built for model in [m, m2, m3])
+
+    # Assert that models are built once on first access
+    built_configs.clear()
+    assert m.arch == m.metadata['config'].pick('param1')
+    assert m.arch == m.metadata['config'].pick('param1')
+    assert len(built_configs) == 1 and m.is_built
+
+
+def test_encode_and_sample_many(tree_c1):
+    tree = ArchParamTree(tree_c1)
+
+    # Assert that sampling in batch consumes the random number generator as the original tree walk
+    configs = tree.sample_many(20, Random(2))
+    rng = Random(2)
+    expected_configs = [
+        build_arch_config(replace_ptree_choices(tree.to_dict(), lambda x: x.random_sample(rng))) for _ in range(20)
+    ]
+    assert [c.to_dict() for c in configs] == [c.to_dict() for c in expected_configs]
+
+    # Assert that shared parameters have the same value
+    for config in tree.sample_many(5, Random(3)):
+        assert config.pick('param1') == config.pick('param1_clone') == config.pick('sub1').pick('sub2').pick('param1_clone')
+
+    for config in configs[:10]:
+        config.pick('param1')
+        for param_block in config.pick('param_list'):
+            param_block.pick('param3')
+
+    # Assert that batched encodings match the ones of the original (per-config) encoder
+    nan = np.nan
+    expected_encodings = {
+        True: [
+            [0, 0, 1, nan, nan, nan, 0] + [nan] * 14,
+            [0, 1, 0, nan, nan, nan, 0] + [nan] * 14,
+            [nan] * 21,
+        ],
+        False: [
+            [0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 4, 0, 0, 1, 0, 0, 1, 3, 0, 1, 0],
+            [0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 3, 0, 0, 1, 0, 0, 1, 4, 0, 1, 0],
+            [1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 4, 1, 0, 0, 1, 0, 0, 4, 0, 1, 0],
+        ],
+    }
+
+    for track_unused_params, expected in expected_encodings.items():
+        encoded = tree.encode_many(configs, track_unused_params=track_unused_params)
+        assert encoded.shape == (20, tree.num_features)
+        np.testing.assert_array_equal(encoded[[0, 1, 10]], np.array(expected))
+
+        for i, expected_row in zip([0, 1, 10], expected):
+            encoded_row = tree.encode_config(configs[i], track_unused_params=track_unused_params)
+            np.testing.assert_array_equal(encoded_row, expected_row)
+
+    encoded = tree.encode_many(configs, track_unused_params=True)
+    assert np.isnan(encoded[10:]).all()
+    assert not np.isnan(encoded[:10, :3]).any()
+
+    # Assert that the search space uses the compiled encoder and keeps the original archids
+    ss = ConfigSearchSpace(lambda c: c.pick('param1'), tree, seed=1)
+    models = [ss.random_sample() for _ in range(3)]
+    assert [m.archid for m in models] == [
+        '7854c1aec25e91923299d0a36fcb34135671ec3f',
+        '7854c1aec25e91923299d0a36fcb34135671ec3f',
+        '58569d4942d36c521f4390274b95510648007fc9',
+    ]
+
+    expected = np.full((3, tree.num_features), -1.0)
+    expected[:, :3] = [[1, 0, 0], [1, 0, 0], [0, 0, 1]]
+    np.testing.assert_array_equal(ss.encode_many(models), expected)
+    np.testing.assert_array_equal(np.vstack([ss.encode(m) for m in models]), expected)
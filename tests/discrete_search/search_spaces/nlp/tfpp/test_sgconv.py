@@ -0,0 +1,104 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+import torch
+
+from archai.discrete_search.search_spaces.nlp.tfpp.ops.sgconv import GConv
+from archai.discrete_search.search_spaces.nlp.tfpp.ops.sgconv3 import GConv3
+
+
+@pytest.mark.parametrize(
+    "layer_fn",
+    [
+        lambda: GConv(16, l_max=64, kernel_dim=8, transposed=False),
+        lambda: GConv3(16, l_max=64, kernel_dim=8, head_dim=8, transposed=False),
+    ],
+)
+def test_gconv_kernel_cache(layer_fn):
+    torch.manual_seed(0)
+    layer = layer_fn().eval()
+    x = torch.randn(2, 64, 16)
+
+    # Assert that kernels are not cached when gradients are enabled
+    y, _ = layer(x)
+    assert len(layer._kernel_cache) == 0
+
+    # Assert that cached kernels produce the same outputs
+    with torch.no_grad():
+        y_cached, _ = layer(x)
+        assert len(layer._kernel_cache) == 1
+        y_cached_2, _ = layer(x)
+
+    assert torch.allclose(y, y_cached, atol=1e-6)
+    assert torch.equal(y_cached, y_cached_2)
+
+    # Assert that in-place updates to the parameters invalidate the cache
+    with torch.no_grad():
+        for p in layer.parameters():
+            p.add_(0.1)
+        y_updated, _ = layer(x)
+    y_expected, _ = layer(x)
+    assert torch.allclose(y_updated, y_expected, atol=1e-6)
+    assert not torch.allclose(y_updated, y_cached, atol=1e-6)
+
+    # Assert that switching to training mode clears the cache
+    layer.train()
+    assert len(layer._kernel_cache) == 0
+
+
+@pytest.mark.parametrize(
+    "layer_fn",
+    [
+        lambda: GConv(16, l_max=32, kernel_dim=8, transposed=False),
+        lambda: GConv3(16, l_max=32, kernel_dim=8, head_dim=8, transposed=False),
+    ],
+)
+def test_gconv_incremental_decoding(layer_fn):
+    torch.manual_seed(0)
+    layer = layer_fn().eval()
+    x = torch.randn(2, 48, 16)
+
+    with torch.no_grad():
+        y, _ = layer(x)
+
+        # Assert that decoding with the state gives the same outputs, also beyond the kernel length
+        y_inc, state = layer(x[:, :10], return_state=True)
+        y_inc = [y_inc]
+        for i in range(10, 48):
+            y_i, state = layer(x[:, i:i+1], state=state, return_state=True)
+            y_inc.append(y_i)
+
+    assert torch.allclose(y, torch.cat(y_inc, dim=1), atol=1e-5)
+    assert all(s.shape[-1] == layer.kernel_length - 1 for s in state)
+
+
+@pytest.mark.parametrize(
+    "layer_fn",
+    [
+        lambda: GConv(16, l_max=64, kernel_dim=8, transposed=False),
+        lambda: GConv3(16, l_max=64, kernel_dim=8, head_dim=8, transposed=False),
+    ],
+)
+def test_gconv_kernel_cache_inference_mode(layer_fn):
+    torch.manual_seed(0)
+    layer = layer_fn().eval()
+    x = torch.randn(2, 64, 16)
+
+    # Assert that a freshly built layer (uninitialized kernel norm) runs under inference mode
+    with torch.inference_mode():
+        y, _ = layer(x)
+        assert len(layer._kernel_cache) == 1
+        y_cached, _ = layer(x)
+
+        for p in layer.parameters():
+            p.add_(0.1)
+        y_updated, _ = layer(x)
+
+    assert torch.equal(y, y_cached)
+    assert not torch.allclose(y_updated, y_cached, atol=1e-6)
+
+    # Assert that loading a state dict invalidates the cache
+    with torch.inference_mode():
+        layer.load_state_dict(layer_fn().state_dict())
+    assert len(layer._kernel_cache) == 0
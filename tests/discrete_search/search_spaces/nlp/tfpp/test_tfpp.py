@@ -10,6 +10,7 @@ from transformers import PretrainedConfig, CodeGenConfig
 from archai.discrete_search.api import ArchaiModel
 from archai.discrete_search.search_spaces.config import ArchConfig, ConfigSearchSpace
 from archai.discrete_search.search_spaces.nlp import TfppSearchSpace
+from archai.discrete_search.search_spaces.nlp.tfpp.model import LanguageModel
 
 N_POSITIONS = 2048
 
@@ -46,3 +47,48 @@ def test_tfpp_sample_gpt2():
     for _ in range(5):
         model = search_space.random_sample()
         check_fwd_pass(model)
+
+
+@pytest.mark.parametrize('backbone', ['codegen', 'gpt2'])
+def test_tfpp_incremental_decoding(backbone):
+    layers = [
+        [('mha', 0.25), ('local_attn', 0.25), ('sgconv', 0.25), ('sep_conv1d', 0.25)],
+        [('sgconv3', 0.5), ('mha', 0.5)]
+    ]
+    layer_configs = {
+        str(i): {
+            'total_heads': 4, 'op_allocation': op_allocation, 'd_inner': 64,
+            'sgconv': {'kernel_size': 8}, 'sgconv3': {'kernel_size': 8},
+            'sep_conv1d': {'kernel_size': 4}, 'local_attn': {'window_size': 8}
+        } for i, op_allocation in enumerate(layers)
+    }
+
+    arch_config = ArchConfig({
+        'backbone': backbone, 'hidden_size': 32,
+        'hidden_layers': {'_config_type': 'config_list', '_repeat_times': 2, '_configs': layer_configs}
+    })
+
+    torch.manual_seed(0)
+    model = LanguageModel(
+        arch_config, vocab_size=50, n_positions=64, max_position_embeddings=64, rotary_dim=4,
+        n_embd=32, n_layer=2, n_head=4, resid_pdrop=0.0, embd_pdrop=0.0, attn_pdrop=0.0
+    ).model.eval()
+    x = torch.randint(high=50, size=(2, 32))
+
+    with torch.no_grad():
+        logits = model(x, use_cache=False).logits
+
+        # Assert that decoding with the cache gives the same outputs as the full forward pass
+        outputs = model(x[:, :10], use_cache=True)
+        inc_logits = [outputs.logits]
+        for i in range(10, 32):
+            outputs = model(x[:, i:i+1], past_key_values=outputs.past_key_values, use_cache=True)
+            inc_logits.append(outputs.logits)
+
+        assert torch.allclose(logits, torch.cat(inc_logits, dim=1), atol=1e-5)
+
+        # Assert that generation re-uses the cache
+        generated = model.generate(x[:, :5], max_new_tokens=10, do_sample=False, pad_token_id=0)
+        generated_no_cache = model.generate(x[:, :5], max_new_tokens=10, do_sample=False,
+                                            use_cache=False, pad_token_id=0)
+        assert torch.equal(generated, generated_no_cache)
@@ -0,0 +1,45 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import pickle
+
+from archai.discrete_search.utils.file_cache import LRUFileCache
+
+
+def _write(content):
+    def _write_fn(path):
+        with open(path, "wb") as f:
+            f.write(content)
+
+    return _write_fn
+
+
+def test_lru_file_cache(tmp_path):
+    cache = LRUFileCache(tmp_path, max_size=250, suffix=".bin")
+    created = []
+
+    path = cache.get_or_create("a", _write(b"a" * 100))
+    assert path.read_bytes() == b"a" * 100 and "a" in cache
+
+    # Assert that existing files are not created again
+    cache.get_or_create("a", lambda p: created.append(p))
+    assert len(created) == 0
+
+    cache.get_or_create("b", _write(b"b" * 100))
+    os.utime(cache.get_path("a"), (0, 0))
+    os.utime(cache.get_path("b"), (1, 1))
+
+    # Assert that the least recently used file is evicted
+    cache.get_or_create("c", _write(b"c" * 100))
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.size == 200
+
+    # Assert that files larger than the cache are kept until the next insertion
+    cache = pickle.loads(pickle.dumps(cache))
+    cache.get_or_create("d", _write(b"d" * 300))
+    assert "d" in cache and "b" not in cache and "c" not in cache
+    assert not list(tmp_path.glob("*.tmp"))
+
+    cache.clear()
+    assert cache.size == 0
@@ -2,12 +2,15 @@
 # Licensed under the MIT license.
 
 import numpy as np
+import pytest
 import torch
 
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.search_objectives import SearchObjectives
 from archai.discrete_search.evaluators.functional import EvaluationFunction
 from archai.discrete_search.utils.multi_objective import (
+    _find_non_dominated_sorting,
+    _find_pareto_frontier_points,
     get_non_dominated_sorting,
     get_pareto_frontier,
 )
@@ -65,3 +68,51 @@ def test_get_non_dominated_sorting():
     # Assert that the length of each list is the same
     assert len(result) == 5
     assert all(len(r["models"]) == len(r["evaluation_results"]["obj1"]) == len(r["indices"]) for r in result)
+
+
+def _naive_pareto_frontier_points(all_points):
+    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+
+    return [
+        i
+        for i in unique_indices
+        if not any(j != i and np.all(all_points[i] >= all_points[j]) for j in unique_indices)
+    ]
+
+
+def _naive_non_dominated_sorting(all_points):
+    lex_sorting = np.lexsort(all_points.T[::-1])
+    sorted_points = all_points[lex_sorting]
+    fronts = []
+
+    for idx in range(len(sorted_points)):
+        rank = 0
+        while rank < len(fronts) and any(np.all(sorted_points[j] <= sorted_points[idx]) for j in fronts[rank]):
+            rank += 1
+
+        if rank == len(fronts):
+            fronts.append([])
+        fronts[rank].append(idx)
+
+    return [lex_sorting[front] for front in fronts]
+
+
+@pytest.mark.parametrize("num_objectives", [1, 2, 3, 4])
+def test_vectorized_dominance_matches_naive(num_objectives):
+    rng = np.random.default_rng(num_objectives)
+
+    # Rounded values produce ties and duplicated points
+    points = np.round(rng.random((300, num_objectives)), 1)
+
+    # Assert that the same frontier is found (small `block_size` exercises the chunking)
+    expected = _naive_pareto_frontier_points(points)
+    assert _find_pareto_frontier_points(points) == expected
+    assert _find_pareto_frontier_points(points, block_size=7) == expected
+
+    # Assert that the same fronts are found in the same order
+    expected_fronts = _naive_non_dominated_sorting(points)
+    for block_size in [1024, 7]:
+        fronts = _find_non_dominated_sorting(points, block_size=block_size)
+
+        assert len(fronts) == len(expected_fronts)
+        assert all(np.array_equal(f, e) for f, e in zip(fronts, expected_fronts))
@@ -0,0 +1,49 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.utils.mutation import (
+    generate_valid_candidates,
+    mutate_parents,
+)
+
+
+def test_mutate_parents(search_space, search_objectives):
+    parents = [search_space.random_sample() for _ in range(10)]
+    seen_archids = {p.archid for p in parents}
+
+    mutations = mutate_parents(
+        parents, search_space.mutate, search_objectives, mutations_per_parent=3, seen_archids=seen_archids
+    )
+
+    # Assert that mutations are unique, unseen and satisfy all constraints
+    archids = [m.archid for m in mutations]
+    assert len(archids) == len(set(archids))
+    assert not seen_archids.intersection(archids)
+    assert all(m.metadata["parent"] in seen_archids for m in mutations)
+
+    _, valid_indices = search_objectives.validate_constraints(mutations)
+    assert len(valid_indices) == len(mutations)
+
+    # Assert that each parent has at most `mutations_per_parent` mutations
+    assert all(sum(m.metadata["parent"] == p.archid for m in mutations) <= 3 for p in parents)
+
+
+def test_generate_valid_candidates_patience(search_space):
+    num_evaluations = []
+
+    objectives = SearchObjectives()
+    objectives.add_constraint(
+        "Never valid", EvaluationFunction(lambda m, b: num_evaluations.append(m.archid) or 1.0), constraint=(0.0, 0.5)
+    )
+
+    counter = iter(range(1_000_000))
+    generators = [lambda: ArchaiModel(None, str(next(counter))) for _ in range(4)]
+
+    candidates = generate_valid_candidates(generators, objectives, num_candidates=2, patience=10, batch_size=4)
+
+    # Assert that the search stops after `patience` tries for each generator
+    assert candidates == [[], [], [], []]
+    assert len(num_evaluations) == 4 * 10
@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pickle
+
+import numpy as np
+import torch
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.evaluators.functional import EvaluationFunction
+from archai.discrete_search.utils.objective_cache import (
+    InMemoryObjectiveCache,
+    SqliteObjectiveCache,
+)
+
+
+def test_in_memory_objective_cache():
+    cache = InMemoryObjectiveCache()
+    cache.update({("obj1", "archid1", None): 1.0, ("obj1", "archid2", 2): 2.0})
+
+    # Assert that entries are stored and looked up by key
+    assert len(cache) == 2
+    assert cache.get(("obj1", "archid1", None)) == 1.0
+    assert cache.get_many([("obj1", "archid2", 2), ("obj1", "archid3", None)]) == [2.0, None]
+    assert ("obj1", "archid2", 2) in cache
+
+    # Assert that keys storing `None` are in the cache
+    cache.update({("obj1", "archid3", None): None})
+    assert ("obj1", "archid3", None) in cache
+    assert cache[("obj1", "archid3", None)] is None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_sqlite_objective_cache(tmp_path):
+    file_path = tmp_path / "cache.db"
+
+    cache = SqliteObjectiveCache(file_path)
+    cache.update({("obj1", "archid1", None): 1.0, ("obj1", "archid2", 2): 2.0, ("obj2", "archid1", 0.5): 3.0})
+
+    # Assert that entries are visible from another connection to the same file
+    other_cache = SqliteObjectiveCache(file_path)
+    assert len(other_cache) == 3
+    assert other_cache.get(("obj1", "archid1", None)) == 1.0
+    assert other_cache.get(("obj1", "archid1", 2)) is None
+    assert other_cache.get_many(
+        [("obj2", "archid1", 0.5), ("obj1", "archid3", None), ("obj1", "archid2", 2)]
+    ) == [3.0, None, 2.0]
+
+    # Assert that numeric budgets are normalized and stored `None` values are found
+    assert other_cache.get(("obj1", "archid2", 2.0)) == 2.0
+    assert other_cache.get(("obj1", "archid2", np.int64(2))) == 2.0
+    other_cache.update({("obj1", "archid4", np.float32(0.5)): None})
+    assert ("obj1", "archid4", 0.5) in cache
+    assert ("obj1", "archid5", 0.5) not in cache
+    cache.update({("obj1", "archid4", 0.5): 5.0})
+    assert len(cache) == 4
+    cache.update({("obj1", "archid4", 0.5): None})
+
+    # Assert that existing entries are replaced
+    other_cache.update({("obj1", "archid1", None): 4.0})
+    assert cache.get(("obj1", "archid1", None)) == 4.0
+    assert set(cache.to_dict().keys()) == {
+        ("obj1", "archid1", None),
+        ("obj1", "archid2", 2),
+        ("obj2", "archid1", 0.5),
+        ("obj1", "archid4", 0.5),
+    }
+
+    # Assert that the cache can be pickled and re-opened
+    unpickled_cache = pickle.loads(pickle.dumps(cache))
+    assert unpickled_cache.get(("obj1", "archid2", 2)) == 2.0
+
+    cache.close()
+    other_cache.close()
+    unpickled_cache.close()
+
+
+def test_search_objectives_with_sqlite_cache(tmp_path):
+    models = [ArchaiModel(torch.nn.Linear(10, 1), f"archid{i}") for i in range(5)]
+    num_calls = []
+
+    def _count_calls(model, budget):
+        num_calls.append(model.archid)
+        return float(len(num_calls))
+
+    objectives = SearchObjectives(cache=SqliteObjectiveCache(tmp_path / "cache.db"))
+    objectives.add_objective("obj1", EvaluationFunction(_count_calls), higher_is_better=True)
+    first_results = objectives.eval_all_objs(models)
+
+    # Assert that a restarted search reuses the persisted evaluations
+    restarted_objectives = SearchObjectives(cache=SqliteObjectiveCache(tmp_path / "cache.db"))
+    restarted_objectives.add_objective("obj1", EvaluationFunction(_count_calls), higher_is_better=True)
+    second_results = restarted_objectives.eval_all_objs(models)
+
+    assert len(num_calls) == len(models)
+    assert (first_results["obj1"] == second_results["obj1"]).all()
+    assert restarted_objectives.lookup_cache("obj1", "archid0", None) == 1.0
+
+    # Assert that the cache can be exported and imported as YAML
+    yaml_path = str(tmp_path / "cache.yaml")
+    objectives.save_cache(yaml_path)
+
+    in_memory_objectives = SearchObjectives()
+    in_memory_objectives.load_cache(yaml_path)
+    assert len(in_memory_objectives.cache) == len(models)
@@ -7,7 +7,7 @@ import tempfile
 import torch
 from transformers import GPT2Config, GPT2LMHeadModel
 
-from archai.trainers.nlp.nvidia_trainer import save_checkpoint
+from archai.trainers.nlp.nvidia_trainer import AsyncCheckpointWriter, save_checkpoint
 
 
 def test_save_checkpoint():
@@ -71,3 +71,47 @@ def test_save_checkpoint():
         assert checkpoint["scheduler_state"][key] == scheduler.state_dict()[key]
     assert checkpoint["scaler_state"] is None
     assert checkpoint["trainer_state"] == trainer_state
+
+
+def test_save_checkpoint_async():
+    output_dir = tempfile.mkdtemp()
+    model = GPT2LMHeadModel(config=GPT2Config(vocab_size=1, n_layer=1))
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=1)
+    scaler = torch.cuda.amp.GradScaler()
+    trainer_state = {"step": 1}
+    checkpoint_writer = AsyncCheckpointWriter()
+
+    save_checkpoint(
+        output_dir=output_dir,
+        model=model,
+        optimizer=optimizer,
+        scheduler=scheduler,
+        scaler=scaler,
+        trainer_state=trainer_state,
+        fp16=False,
+        save_all_checkpoints=True,
+        is_best_model=True,
+        checkpoint_writer=checkpoint_writer,
+    )
+    expected_model_state = {key: value.clone() for key, value in model.state_dict().items()}
+
+    # Assert that changes after saving are not written to the checkpoint
+    with torch.no_grad():
+        for param in model.parameters():
+            param.add_(1.0)
+    trainer_state["step"] = 2
+    checkpoint_writer.wait()
+
+    checkpoint_path = os.path.join(output_dir, "checkpoint-last.pt")
+    checkpoint = torch.load(checkpoint_path)
+    for key in checkpoint["model_state"]:
+        assert torch.equal(checkpoint["model_state"][key], expected_model_state[key])
+    assert checkpoint["trainer_state"] == {"step": 1}
+
+    # Assert that aliases reference the same checkpoint
+    for alias_name in ["checkpoint-best.pt", "checkpoint-1.pt"]:
+        alias_path = os.path.join(output_dir, alias_name)
+        assert os.path.exists(alias_path)
+        assert os.path.samefile(alias_path, checkpoint_path)
+    assert not any(file_name.endswith(".tmp") for file_name in os.listdir(output_dir))
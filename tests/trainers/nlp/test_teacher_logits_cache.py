@@ -0,0 +1,91 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from transformers import GPT2Config, GPT2LMHeadModel, default_data_collator
+
+from archai.trainers.nlp.hf_trainer import HfDistillerTrainer
+from archai.trainers.nlp.hf_training_args import DistillerTrainingArguments
+from archai.trainers.nlp.teacher_logits_cache import (
+    TeacherLogitsCache,
+    get_teacher_logits_fingerprint,
+    sparse_kd_loss,
+)
+
+
+class _Dataset(torch.utils.data.Dataset):
+    def __init__(self, n_samples: int, seq_len: int, vocab_size: int) -> None:
+        self.input_ids = torch.randint(0, vocab_size, (n_samples, seq_len), generator=torch.Generator().manual_seed(0))
+
+    def __len__(self) -> int:
+        return self.input_ids.shape[0]
+
+    def __getitem__(self, idx: int) -> dict:
+        return {"input_ids": self.input_ids[idx], "labels": self.input_ids[idx]}
+
+
+def test_sparse_kd_loss():
+    student_logits = torch.randn(2, 8, 16)
+    teacher_logits = torch.randn(2, 8, 16)
+
+    # Assert that the loss matches the dense KD loss when all logits are used
+    kl_loss = nn.KLDivLoss(reduction="batchmean")
+    expected_loss = 4.0 * kl_loss(F.log_softmax(student_logits / 2.0, dim=-1), F.softmax(teacher_logits / 2.0, dim=-1))
+
+    top_k_values, top_k_indices = torch.topk(teacher_logits, 16, dim=-1)
+    loss = sparse_kd_loss(student_logits, top_k_values, top_k_indices, temperature=2.0)
+    assert torch.allclose(loss, expected_loss, atol=1e-5)
+
+
+def test_hf_distiller_trainer_teacher_logits_cache(tmp_path):
+    config = GPT2Config(vocab_size=32, n_positions=16, n_embd=16, n_layer=1, n_head=2)
+    student_model = GPT2LMHeadModel(config)
+    teacher_model = GPT2LMHeadModel(config)
+
+    args = DistillerTrainingArguments(
+        str(tmp_path / "output"),
+        max_steps=2,
+        per_device_train_batch_size=2,
+        per_device_eval_batch_size=3,
+        report_to="none",
+        no_cuda=True,
+        teacher_logits_cache_dir=str(tmp_path / "cache"),
+        teacher_logits_top_k=4,
+    )
+    trainer = HfDistillerTrainer(
+        teacher_model,
+        model=student_model,
+        args=args,
+        train_dataset=_Dataset(7, 8, 32),
+        data_collator=default_data_collator,
+    )
+
+    # Assert that the cache holds the top-k teacher logits of every token
+    cache = trainer.cache_teacher_logits()
+    assert len(cache) == 7
+    assert cache.values.shape == (7, 8, 4)
+
+    with torch.no_grad():
+        logits = teacher_model(trainer.train_dataset.dataset.input_ids)["logits"]
+    top_k_values, top_k_indices = torch.topk(logits, 4, dim=-1)
+    assert torch.allclose(torch.from_numpy(cache.values.astype("float32")), top_k_values, atol=1e-2)
+    assert torch.equal(torch.from_numpy(cache.indices.astype("int64")), top_k_indices)
+
+    # Assert that the cache is only reused with the same teacher, dataset and top-k
+    fingerprint = get_teacher_logits_fingerprint(teacher_model, trainer.train_dataset.dataset)
+    assert TeacherLogitsCache.exists(tmp_path / "cache", n_samples=7, top_k=4, fingerprint=fingerprint)
+    assert not TeacherLogitsCache.exists(tmp_path / "cache", top_k=8)
+    assert not TeacherLogitsCache.exists(
+        tmp_path / "cache", fingerprint=get_teacher_logits_fingerprint(GPT2LMHeadModel(config), _Dataset(7, 8, 32))
+    )
+    assert not TeacherLogitsCache.exists(
+        tmp_path / "cache", fingerprint=get_teacher_logits_fingerprint(teacher_model, _Dataset(6, 8, 32))
+    )
+
+    # Assert that the teacher is not used when training with the cache
+    trainer.teacher_model = None
+    trainer.train()
+
+    assert TeacherLogitsCache.exists(tmp_path / "cache")